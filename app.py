@@ -29,7 +29,10 @@ def init_components():
     """Inicializa componentes da aplicação"""
     try:
         # Inicializar apenas componentes que funcionam sem APIs externas
-        normalizer = DataNormalizer()
+        normalizer = DataNormalizer(
+            near_duplicates=Config.NEAR_DUPLICATES,
+            near_duplicate_threshold=Config.NEAR_DUPLICATE_THRESHOLD
+        )
         qa_system = QASystem()
         
         # Tentar inicializar outros componentes, mas não falhar se não funcionarem
@@ -53,6 +56,13 @@ def init_components():
         except Exception:
             st.warning("⚠️ Indexador semântico não disponível - modo demo")
         
+        # Reutilizar índice guardado (mmap partilhado entre processos)
+        if indexer and Config.INDEX_PATH:
+            try:
+                indexer.load(Config.INDEX_PATH, mmap=Config.INDEX_MMAP)
+            except Exception:
+                st.warning("⚠️ Não foi possível carregar o índice guardado - reindexe os dados")
+        
         try:
             audit_logger = AuditLogger()
         except Exception:
@@ -194,21 +204,24 @@ def update_data(components: Dict[str, Any]):
                 # Ler dados da sheet
                 candidates = components['sheets'].read_rows(Config.CANDIDATES_WORKSHEET)
                 
-                # Normalizar dados
-                normalized_candidates = components['normalizer'].normalize_all(candidates)
-                
-                # Escrever dados normalizados de volta
-                components['sheets'].write_rows(
-                    Config.CANDIDATES_WORKSHEET, 
-                    normalized_candidates, 
-                    clear_first=True
+                # Normalizar apenas linhas novas ou alteradas (content_hash)
+                normalized_candidates, changed_positions = components['normalizer'].normalize_incremental(
+                    candidates,
+                    workers=Config.NORMALIZER_WORKERS or None
                 )
                 
+                near_duplicates = components['normalizer'].near_duplicate_report
+                if near_duplicates:
+                    st.info(f"🔗 {len(near_duplicates)} grupos de candidatos quase duplicados foram juntados")
+                
+                # Escrever de volta só as células que mudaram, sem limpar a sheet
+                components['sheets'].sync_rows(Config.CANDIDATES_WORKSHEET, normalized_candidates)
+                
                 # Registo de auditoria
                 if components['audit']:
                     components['audit'].log_data_update(
-                        new_rows=len(normalized_candidates),
-                        removed_rows=0,
+                        new_rows=len(changed_positions),
+                        removed_rows=len(candidates) - len(normalized_candidates),
                         total_rows=len(normalized_candidates)
                     )
                 
@@ -253,10 +266,19 @@ def reindex_data(components: Dict[str, Any]):
                 st.warning("⚠️ Nenhum candidato encontrado. Actualize os dados primeiro.")
                 return
             
-            # Construir índice
-            success = components['indexer'].build(candidates)
+            # Construir índice, mostrando o progresso real dos embeddings
+            progress_bar = st.progress(0.0, text="🔍 A obter embeddings...")
+            
+            def show_progress(done: int, total: int):
+                progress_bar.progress(done / total if total else 1.0, text=f"🔍 Embeddings {done}/{total}")
+            
+            success = components['indexer'].build(candidates, progress_callback=show_progress)
+            progress_bar.empty()
             
             if success:
+                if Config.INDEX_PATH:
+                    components['indexer'].save(Config.INDEX_PATH)
+                
                 st.success(f"✅ Índice construído com {len(candidates)} candidatos")
                 
                 # Registo de auditoria
@@ -296,7 +318,15 @@ def display_metrics(components: Dict[str, Any]):
             st.write("**Actividade recente:**")
             for action, count in list(audit_stats.items())[:3]:
                 st.write(f"- {action}: {count}")
-                
+
+        # Pedidos à Google Sheets API (executor partilhado)
+        if components['sheets']:
+            sheets_stats = components['sheets'].executor.stats
+            st.caption(
+                f"Sheets API: {sheets_stats['requests']} pedidos, {sheets_stats['throttled']} em espera, "
+                f"{sheets_stats['retries']} repetidos ({sheets_stats['rate_limited']} por quota)"
+            )
+
     except Exception as e:
         st.write("Métricas não disponíveis")
 
@@ -375,8 +405,9 @@ def search_candidates(components: Dict[str, Any], question: str):
                 sources = hits
                 
             else:
-                # Usar indexer real se disponível
-                if not st.session_state.get('index_built', False):
+                # Usar indexer real se disponível (construído nesta sessão ou carregado do disco)
+                index_ready = components['indexer'].get_index_stats().get('index_built', False)
+                if not st.session_state.get('index_built', False) and not index_ready:
                     st.warning("⚠️ Índice não construído. Clique em 'Reindexar' primeiro.")
                     return
                 
@@ -465,8 +496,9 @@ def remove_candidate(components: Dict[str, Any], linkedin_url: str):
             success = components['sheets'].delete_by_url(Config.CANDIDATES_WORKSHEET, linkedin_url)
             
             if success:
-                # Remover do índice
-                components['indexer'].remove_candidate(linkedin_url)
+                # Remover do índice e registar a remoção (sem reescrever o índice guardado)
+                if components['indexer'].remove_candidate(linkedin_url) and Config.INDEX_PATH:
+                    components['indexer'].append_removals(Config.INDEX_PATH)
                 
                 st.success("✅ Candidato removido com sucesso")
                 
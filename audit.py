@@ -4,13 +4,15 @@ Módulo para sistema de auditoria
 from datetime import datetime
 from typing import Dict, Any, List
 from sheets_client import GoogleSheetsClient
+from sheets_executor import BACKGROUND
 from config import Config
 
 class AuditLogger:
     """Sistema de auditoria para registar ações"""
     
     def __init__(self):
-        self.sheets_client = GoogleSheetsClient()
+        # Escritas de auditoria cedem a vez aos pedidos interativos
+        self.sheets_client = GoogleSheetsClient(priority=BACKGROUND)
         self.audit_worksheet = Config.AUDIT_WORKSHEET
     
     def log(self, action: str, details: Dict[str, Any], user: str = "system") -> bool:
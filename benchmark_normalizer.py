@@ -0,0 +1,170 @@
+"""
+Benchmark do pipeline de normalização: sequencial vs processos paralelos
+"""
+import argparse
+import random
+import re
+import time
+
+from normalizer import DataNormalizer, clear_clean_cache
+
+# Sílabas e vocabulário para gerar valores quase todos distintos, como numa exportação real
+SYLLABLES = ['ma', 'ri', 'jo', 'ão', 'sil', 'va', 'co', 'sta', 'pe', 'dro', 'an', 'lu', 'cí', 'go', 'mez',
+             'fer', 'nan', 'des', 'ra', 'mi', 'rez', 'to', 'rres', 'her', 'bert', 'fro', 'za', 'pa', 'ta']
+VOCABULARY = ['analyst', 'financial', 'senior', 'manager', 'marketing', 'digital', 'engineer', 'software',
+              'data', 'sales', 'head', 'of', 'and', 'e', 'em', 'de', 'y', 'lead', 'specialist', 'recruiter',
+              'hr', 'business', 'partner', 'python', 'sql', 'operations', 'supply', 'chain', 'logística',
+              'finanças', 'contabilidade', 'gestão', 'projetos', 'ux/ui', 'design', 'branding', 'ventas']
+COMPANY_SUFFIXES = ['SA', 'SpA', 'Ltda', 'Group', 'Consulting', '']
+DEGREES = ['', 'Bachelor of Science', 'MBA', 'Ingeniería Comercial', 'Mestrado em Finanças']
+
+
+def generate_rows(count: int, duplicate_ratio: float = 0.05, seed: int = 42):
+    """
+    Gera perfis sintéticos no formato das exportações do PhantomBuster
+
+    Nomes, headlines, empresas e descrições são quase todos distintos e há
+    muitas células vazias, como nos dados reais: o cache de clean_text só
+    ajuda nas colunas que se repetem (graus, localizações vazias).
+    """
+    rng = random.Random(seed)
+
+    def word():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    def phrase(words: int) -> str:
+        return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+    rows = []
+    for i in range(count):
+        # Reutilizar URLs anteriores para exercitar a deduplicação
+        profile_id = rng.randrange(i) if i and rng.random() < duplicate_ratio else i
+        first, last = word().capitalize(), word().title()
+        company = f"{word().capitalize()} {rng.choice(COMPANY_SUFFIXES)}"
+        rows.append({
+            'linkedin_url': f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{profile_id}/",
+            'name': f"  {first}   {last} ",
+            'first_name': first,
+            'last_name': last,
+            'headline': f"{phrase(3).title()} at {company} | {phrase(rng.randint(2, 6))}",
+            'location': rng.choice(['', f"{word().capitalize()}, Chile", f"{word().capitalize()} Metropolitan Area"]),
+            'current_company': company,
+            'job_description': rng.choice(['', f"{phrase(8)}.  {phrase(10)}! {phrase(6)}"]),
+            'education': rng.choice(['', f"Universidad de {word().capitalize()}"]),
+            'degree': rng.choice(DEGREES),
+            'connection_degree': rng.choice(['2nd', '3rd', '']),
+            'followers': str(rng.randrange(5000)),
+            'error': '',
+        })
+
+    return rows
+
+
+def without_timestamps(rows):
+    """ingested_at depende do instante de execução e fica fora da comparação"""
+    return [[(key, value) for key, value in row.items() if key != 'ingested_at'] for row in rows]
+
+
+def legacy_clean_row(row):
+    """Limpeza original (re.sub + re.split por célula), como referência do microbenchmark"""
+    cleaned_row = {}
+
+    for key, value in row.items():
+        if isinstance(value, str):
+            cleaned_value = re.sub(r'\s+', ' ', value.strip())
+            sentences = re.split(r'([.!?]\s*)', cleaned_value)
+            cleaned_row[key] = ''.join(s.capitalize() if s.strip() else s for s in sentences)
+        else:
+            cleaned_row[key] = value
+
+    cleaned_row.setdefault('source', 'phantombuster')
+    cleaned_row.setdefault('ingested_at', '')
+    return cleaned_row
+
+
+def run_clean_benchmark(count: int, repeat: int):
+    """
+    Microbenchmark da etapa clean: referência vs cópia vs in place
+
+    Cada variante é medida com o cache de valores frio (esvaziado antes de
+    cada repetição) e quente (segunda passagem sobre os mesmos dados), e
+    também sobre linhas já limpas, como as que são lidas de volta da sheet.
+    """
+    rows = generate_rows(count)
+    normalizer = DataNormalizer()
+    already_clean = normalizer.clean(rows)
+    print(f"Limpando {count} linhas ({repeat} repetições)...")
+
+    def timed(clean, data, warm: bool):
+        timings = []
+        for _ in range(repeat):
+            batch = [dict(row) for row in data]
+            clear_clean_cache()
+            if warm:
+                clean([dict(row) for row in data])
+            start = time.perf_counter()
+            output = clean(batch)
+            timings.append(time.perf_counter() - start)
+        return min(timings), output
+
+    legacy_time, reference = timed(lambda data: [legacy_clean_row(row) for row in data], rows, False)
+    print(f"  {'referência':<34} {legacy_time:.3f}s")
+
+    identical = True
+    variants = {
+        'cópia': normalizer.clean,
+        'in place': lambda data: normalizer.clean(data, in_place=True),
+    }
+    for name, clean in variants.items():
+        for label, data, expected in (('', rows, reference), (' (já limpas)', already_clean, None)):
+            for warm in (False, True):
+                best, output = timed(clean, data, warm)
+                if expected is not None:
+                    identical &= without_timestamps(output) == without_timestamps(expected)
+                title = f"{name}{label}, cache {'quente' if warm else 'frio'}"
+                print(f"  {title:<34} {best:.3f}s  ({legacy_time / best:.1f}x)")
+    print(f"Resultados idênticos: {'SIM' if identical else 'NÃO'}")
+
+    return identical
+
+
+def run_benchmark(count: int, repeat: int, workers: int = 0):
+    rows = generate_rows(count)
+    normalizer = DataNormalizer()
+    backends = {'linha a linha': normalizer.normalize_all}
+
+    if workers:
+        backends[f'linhas x{workers}'] = lambda data: normalizer.normalize_parallel(data, workers)
+
+    print(f"Normalizando {count} linhas ({repeat} repetições)...")
+    results = {}
+
+    for name, normalize in backends.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = normalize(rows)
+            timings.append(time.perf_counter() - start)
+
+        results[name] = output
+        best = min(timings)
+        print(f"  {name:<14} melhor {best:.3f}s  ({count / best:,.0f} linhas/s)")
+
+    reference = without_timestamps(results.pop('linha a linha'))
+    identical = all(without_timestamps(output) == reference for output in results.values())
+    print(f"Linhas de saída: {len(reference)}  Resultados idênticos: {'SIM' if identical else 'NÃO'}")
+
+    return identical
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=0, help="Também mede o modo paralelo com N processos")
+    parser.add_argument('--clean', action='store_true', help="Mede apenas a etapa clean (microbenchmark)")
+    args = parser.parse_args()
+
+    if args.clean:
+        raise SystemExit(0 if run_clean_benchmark(args.rows, args.repeat) else 1)
+    raise SystemExit(0 if run_benchmark(args.rows, args.repeat, args.workers) else 1)
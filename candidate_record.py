@@ -0,0 +1,162 @@
+"""
+Registo compacto de candidato: valores num tuplo partilhado e esquema de campos comum
+"""
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Campos lidos em cada pesquisa, renderização e prompt
+HOT_FIELDS = ('name', 'headline', 'education', 'current_company', 'location', 'skills_tags', 'summary', 'linkedin_url')
+
+_MISSING = object()
+
+# Criação sem passar por __init__ (copy() corre por cada resultado de pesquisa)
+_new_record = object.__new__
+
+
+class RecordSchema:
+    """Ordem dos campos (nomes internados) partilhada por todos os registos com as mesmas colunas"""
+
+    __slots__ = ('fields', 'positions')
+
+    _cache: Dict[Tuple[str, ...], 'RecordSchema'] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = tuple(sys.intern(field) for field in fields)
+        self.positions = {field: position for position, field in enumerate(self.fields)}
+
+    @classmethod
+    def for_fields(cls, fields: Tuple[str, ...]) -> 'RecordSchema':
+        """Esquema partilhado para esta sequência de campos (criado uma vez por combinação)"""
+        schema = cls._cache.get(fields)
+        if schema is None:
+            with cls._lock:
+                schema = cls._cache.setdefault(fields, cls(fields))
+        return schema
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+
+class CandidateRecord(Mapping):
+    """
+    Candidato com a interface de um dicionário
+
+    Os valores vivem num tuplo alinhado com um RecordSchema partilhado, por isso
+    cada registo custa um objeto com três slots em vez de uma tabela de hash
+    com 40+ entradas. Atribuições (scores, rank) vão para uma camada de extras
+    do próprio registo, e copy() partilha o tuplo de valores em vez de o copiar.
+    """
+
+    __slots__ = ('_schema', '_values', '_extras')
+
+    def __init__(self, schema: RecordSchema, values: Tuple[Any, ...], extras: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            schema: Esquema partilhado (ordem dos campos)
+            values: Valores pela ordem do esquema
+            extras: Campos adicionais ou substituídos só neste registo
+        """
+        self._schema = schema
+        self._values = values
+        self._extras = extras
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> 'CandidateRecord':
+        """
+        Converte um dicionário (linha da sheet, JSON do índice) num registo
+
+        Args:
+            data: Dados do candidato
+
+        Returns:
+            Registo com os mesmos campos, pela mesma ordem
+        """
+        if isinstance(data, CandidateRecord):
+            return data
+        return cls(RecordSchema.for_fields(tuple(data)), tuple(data.values()))
+
+    def __getitem__(self, key: str) -> Any:
+        extras = self._extras
+        if extras is not None and key in extras:
+            return extras[key]
+        position = self._schema.positions.get(key)
+        if position is None:
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        extras = self._extras
+        if extras is not None:
+            value = extras.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        position = self._schema.positions.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._schema.positions or (self._extras is not None and key in self._extras)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._schema.fields
+        if self._extras:
+            positions = self._schema.positions
+            yield from (key for key in self._extras if key not in positions)
+
+    def __len__(self) -> int:
+        if not self._extras:
+            return len(self._schema)
+        positions = self._schema.positions
+        return len(self._schema) + sum(1 for key in self._extras if key not in positions)
+
+    def __setitem__(self, key: str, value: Any):
+        if self._extras is None:
+            self._extras = {}
+        self._extras[key] = value
+
+    def __repr__(self) -> str:
+        return f"CandidateRecord({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Ao reconstruir (pickle, multiprocessing) o esquema volta a ser o partilhado
+        return (_restore, (self._schema.fields, self._values, self._extras))
+
+    def copy(self) -> 'CandidateRecord':
+        """Cópia que partilha os valores base; só os extras são duplicados"""
+        clone = _new_record(CandidateRecord)
+        clone._schema = self._schema
+        clone._values = self._values
+        clone._extras = dict(self._extras) if self._extras else None
+        return clone
+
+    def view(self, fields: Tuple[str, ...] = HOT_FIELDS) -> Tuple[Any, ...]:
+        """
+        Valores de vários campos numa só passagem
+
+        Args:
+            fields: Campos pretendidos
+
+        Returns:
+            Tuplo com os valores (None para campos inexistentes)
+        """
+        return tuple(self.get(field) for field in fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dicionário independente (JSON, DataFrames, escrita na sheet)"""
+        data = dict(zip(self._schema.fields, self._values))
+        if self._extras:
+            data.update(self._extras)
+        return data
+
+
+def _restore(fields: Tuple[str, ...], values: Tuple[Any, ...], extras: Optional[Dict[str, Any]]) -> CandidateRecord:
+    return CandidateRecord(RecordSchema.for_fields(fields), values, extras)
+
+
+def to_plain(value: Any) -> Any:
+    """Hook de json.dump: registos viram dicionários, o resto texto"""
+    if isinstance(value, CandidateRecord):
+        return value.to_dict()
+    return str(value)
@@ -27,6 +27,59 @@ class Config:
     TOP_K_RESULTS: int = int(os.getenv("TOP_K_RESULTS", "5"))
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
     
+    # Batching de embeddings (limites da API: 2048 inputs e ~300k tokens por pedido)
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "1024"))
+    EMBEDDING_BATCH_MAX_TOKENS: int = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "250000"))
+    
+    # Pedidos de embeddings em paralelo (limites da conta OpenAI por minuto)
+    EMBEDDING_MAX_CONCURRENCY: int = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+    EMBEDDING_RPM_LIMIT: int = int(os.getenv("EMBEDDING_RPM_LIMIT", "3000"))
+    EMBEDDING_TPM_LIMIT: int = int(os.getenv("EMBEDDING_TPM_LIMIT", "1000000"))
+    
+    # Cache persistente de embeddings (caminho vazio desativa)
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    
+    # Caches em memória (LRU) de embeddings de queries e de resultados
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    SEARCH_RESULTS_CACHE_SIZE: int = int(os.getenv("SEARCH_RESULTS_CACHE_SIZE", "256"))
+    
+    # Índice semântico persistido entre reinícios (caminho vazio desativa)
+    INDEX_PATH: str = os.getenv("INDEX_PATH", ".cache/semantic_index")
+    INDEX_MMAP: bool = os.getenv("INDEX_MMAP", "true").lower() == "true"
+    
+    # Tipo de índice FAISS: flat (exato), hnsw, ivf_flat ou ivf_pq
+    INDEX_TYPE: str = os.getenv("INDEX_TYPE", "flat").lower()
+    INDEX_HNSW_M: int = int(os.getenv("INDEX_HNSW_M", "32"))
+    INDEX_HNSW_EF_CONSTRUCTION: int = int(os.getenv("INDEX_HNSW_EF_CONSTRUCTION", "200"))
+    INDEX_EF_SEARCH: int = int(os.getenv("INDEX_EF_SEARCH", "64"))
+    INDEX_IVF_NLIST: int = int(os.getenv("INDEX_IVF_NLIST", "0"))  # 0 = automático (4 * sqrt(n))
+    INDEX_NPROBE: int = int(os.getenv("INDEX_NPROBE", "16"))
+    INDEX_PQ_M: int = int(os.getenv("INDEX_PQ_M", "64"))
+    INDEX_TRAIN_SAMPLE: int = int(os.getenv("INDEX_TRAIN_SAMPLE", "50000"))
+    
+    # Modo de pesquisa: vector, lexical (BM25, sem rede) ou hybrid
+    SEARCH_MODE: str = os.getenv("SEARCH_MODE", "vector").lower()
+    SEARCH_FUSION: str = os.getenv("SEARCH_FUSION", "rrf").lower()  # rrf ou weighted
+    SEARCH_HYBRID_ALPHA: float = float(os.getenv("SEARCH_HYBRID_ALPHA", "0.5"))  # peso do vetor em weighted
+    SEARCH_RRF_K: int = int(os.getenv("SEARCH_RRF_K", "60"))
+    SEARCH_BM25_SATURATION: float = float(os.getenv("SEARCH_BM25_SATURATION", "5.0"))  # BM25 com score 0.5 só com BM25
+    
+    # Processos da normalização em paralelo (importações grandes)
+    NORMALIZER_WORKERS: int = int(os.getenv("NORMALIZER_WORKERS", "0"))  # 0 = todos os cores
+    
+    # Agrupar candidatos quase duplicados (MinHash/LSH sobre nome, headline, empresa e escola)
+    NEAR_DUPLICATES: bool = os.getenv("NEAR_DUPLICATES", "false").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+    
+    # Segundos durante os quais os metadados da spreadsheet (worksheets, sheetId) ficam em cache
+    SHEETS_METADATA_TTL: float = float(os.getenv("SHEETS_METADATA_TTL", "300"))
+    
+    # Quotas da Google Sheets API por minuto (por utilizador/conta de serviço) e repetições de erros 429/5xx
+    SHEETS_READS_PER_MINUTE: int = int(os.getenv("SHEETS_READS_PER_MINUTE", "60"))
+    SHEETS_WRITES_PER_MINUTE: int = int(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+    SHEETS_MAX_RETRIES: int = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+    
     # Sheets worksheets
     CANDIDATES_WORKSHEET = "candidatos"
     AUDIT_WORKSHEET = "auditoria"
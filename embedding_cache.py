@@ -0,0 +1,184 @@
+"""
+Cache persistente de embeddings endereçado por conteúdo
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence
+
+
+def text_hash(text: str) -> str:
+    """Hash SHA-256 do texto preparado para embedding"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    """Normaliza a query para chave de cache (minúsculas, espaços colapsados)"""
+    return " ".join(query.lower().split())
+
+
+class LRUCache:
+    """Cache em memória com política LRU e tamanho máximo, segura entre threads"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Obtém valor e marca-o como usado recentemente"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Guarda valor, despejando o menos usado se necessário"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Limpa o cache"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class EmbeddingCache:
+    """Cache em disco (SQLite) de embeddings, com chave (modelo, hash do texto)"""
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # A mesma instância é partilhada entre threads do Streamlit
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Obtém embeddings em cache para uma lista de textos
+
+        Args:
+            model: Modelo de embeddings
+            texts: Textos preparados
+
+        Returns:
+            Lista alinhada com os textos, com o vetor (float32 em bytes) ou None
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            # Consultar em blocos para respeitar o limite de parâmetros do SQLite
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                )
+                found.update(cursor.fetchall())
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found]
+                )
+                self._conn.commit()
+
+        return [found.get(h) for h in hashes]
+
+    def get(self, model: str, text: str) -> Optional[bytes]:
+        """Obtém o embedding em cache de um único texto"""
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[bytes]):
+        """
+        Guarda embeddings em cache
+
+        Args:
+            model: Modelo de embeddings
+            texts: Textos preparados
+            vectors: Vetores float32 serializados em bytes, alinhados com os textos
+        """
+        now = time.time()
+        rows = [(model, text_hash(text), vector, now) for text, vector in zip(texts, vectors)]
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def put(self, model: str, text: str, vector: bytes):
+        """Guarda o embedding de um único texto"""
+        self.put_many(model, [text], [vector])
+
+    def _evict(self):
+        """Remove as entradas menos usadas quando o limite é ultrapassado"""
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        if count <= self.max_entries:
+            return
+
+        # Libertar 10% abaixo do limite para não despejar a cada escrita
+        to_remove = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE rowid IN (
+                SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?
+            )
+            """,
+            (to_remove,)
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self):
+        """Limpa todo o cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
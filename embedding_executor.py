@@ -0,0 +1,220 @@
+"""
+Executor assíncrono de pedidos de embeddings com controlo de rate limits
+"""
+import asyncio
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Converte durações dos headers do OpenAI ("1s", "6m0s", "20ms") em segundos
+
+    Args:
+        value: Valor do header
+
+    Returns:
+        Segundos, ou None se não for possível interpretar
+    """
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_delay_from_headers(headers: Any) -> Optional[float]:
+    """Obtém o tempo de espera sugerido pelos headers de uma resposta 429"""
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    delays = [
+        parse_reset_duration(headers.get(name))
+        for name in ('retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens')
+    ]
+    delays = [delay for delay in delays if delay is not None]
+
+    return max(delays) if delays else None
+
+
+class RateLimiter:
+    """Janela deslizante de 60s para pedidos e tokens por minuto"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.events = deque()  # (instante, tokens)
+        self.tokens_in_window = 0
+        self.pause_until = 0.0
+
+    def _expire(self, now: float):
+        while self.events and now - self.events[0][0] >= 60:
+            _, tokens = self.events.popleft()
+            self.tokens_in_window -= tokens
+
+    async def acquire(self, tokens: int):
+        """Espera até haver quota para um pedido com o número de tokens indicado"""
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+            wait = self.pause_until - now
+
+            if wait <= 0:
+                within_requests = len(self.events) < self.requests_per_minute
+                # Um pedido maior que o limite passa sozinho numa janela vazia
+                within_tokens = self.tokens_in_window + tokens <= self.tokens_per_minute or not self.events
+
+                if within_requests and within_tokens:
+                    self.events.append((now, tokens))
+                    self.tokens_in_window += tokens
+                    return
+
+                wait = 60 - (now - self.events[0][0])
+
+            await asyncio.sleep(max(wait, 0.01))
+
+    def pause(self, seconds: float):
+        """Suspende todos os pedidos durante o tempo indicado"""
+        self.pause_until = max(self.pause_until, time.monotonic() + seconds)
+
+
+class AsyncEmbeddingExecutor:
+    """Mantém vários pedidos de embeddings em paralelo respeitando RPM/TPM"""
+
+    def __init__(self, api_key: str, model: str, max_concurrency: int = 4,
+                 requests_per_minute: int = 3000, tokens_per_minute: int = 1000000,
+                 max_retries: int = 6):
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.stats = {'requests': 0, 'tokens': 0, 'retries': 0, 'rate_limited': 0}
+
+    def run(self, texts: Sequence[str], batches: List[Tuple[int, int, int]],
+            on_batch: Callable[[int, List[Any]], None],
+            progress_callback: Optional[Callable[[int, int], None]] = None):
+        """
+        Executa os lotes em paralelo (API síncrona para o resto da aplicação)
+
+        Args:
+            texts: Textos a embedar
+            batches: Lista de (início, fim, tokens estimados) de cada lote
+            on_batch: Chamado com (início, response.data) quando um lote termina
+            progress_callback: Chamado com (textos concluídos, total de textos)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._run(texts, batches, on_batch, progress_callback))
+            return
+
+        # Já existe um event loop nesta thread: executar numa thread própria. O
+        # progresso volta para esta thread, porque callbacks de UI (ex: st.progress)
+        # só funcionam na thread do script que os registou.
+        errors = []
+        updates = queue.Queue()
+        report = (lambda done, total: updates.put((done, total))) if progress_callback else None
+        coroutine = self._run(texts, batches, on_batch, report)
+
+        def runner():
+            try:
+                asyncio.run(coroutine)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=runner)
+        thread.start()
+
+        while progress_callback and (thread.is_alive() or not updates.empty()):
+            try:
+                progress_callback(*updates.get(timeout=0.1))
+            except queue.Empty:
+                pass
+
+        thread.join()
+
+        if errors:
+            raise errors[0]
+
+    async def _run(self, texts, batches, on_batch, progress_callback):
+        limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total = sum(end - start for start, end, _ in batches)
+        done = 0
+
+        # Sem retries do SDK: 429 e erros temporários passam por _embed_with_retry e pelo limitador
+        async with AsyncOpenAI(api_key=self.api_key, max_retries=0) as client:
+
+            async def process(start: int, end: int, tokens: int):
+                nonlocal done
+                async with semaphore:
+                    data = await self._embed_with_retry(client, limiter, texts[start:end], tokens)
+
+                on_batch(start, data)
+                done += end - start
+                if progress_callback:
+                    progress_callback(done, total)
+
+            tasks = [asyncio.create_task(process(*batch)) for batch in batches]
+            try:
+                await asyncio.gather(*tasks)
+            except Exception:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+    async def _embed_with_retry(self, client, limiter: RateLimiter, inputs: List[str], tokens: int) -> List[Any]:
+        """Envia um lote, com backoff exponencial e pausa global em caso de 429"""
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire(tokens)
+
+            try:
+                response = await client.embeddings.create(model=self.model, input=inputs)
+                self.stats['requests'] += 1
+                self.stats['tokens'] += tokens
+                return response.data
+
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats['rate_limited'] += 1
+                self.stats['retries'] += 1
+
+                # Preferir o tempo indicado pelos headers; senão backoff exponencial
+                headers = getattr(getattr(e, 'response', None), 'headers', None)
+                delay = retry_delay_from_headers(headers) or min(60.0, 2 ** attempt)
+                limiter.pause(delay * (1 + random.random() * 0.25))
+
+            except (APIConnectionError, APITimeoutError, InternalServerError):
+                if attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(min(30.0, 2 ** attempt) * (0.5 + random.random()))
+
+        raise RuntimeError("Número máximo de tentativas de embeddings excedido")
@@ -0,0 +1,109 @@
+"""
+Resolução de campos canónicos para as colunas físicas de cada conjunto de dados
+"""
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from profile_keys import PROFILE_URL_FIELDS
+
+# Campo canónico -> colunas alternativas por ordem de preferência
+# (app normalizada, exportação CSV do PhantomBuster, JSON da API do PhantomBuster).
+# Única tabela de colunas: resumos, escrita na sheet e pesquisa por palavras-chave.
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'profile_url': PROFILE_URL_FIELDS,
+    'first_name': ('firstName', 'First Name'),
+    'last_name': ('lastName', 'Last Name'),
+    'full_name': ('fullName', 'name', 'Full Name', 'Scraper Full Name'),
+    'headline': ('linkedinHeadline', 'headline', 'Linkedin Headline'),
+    'job_title': ('linkedinJobTitle', 'jobTitle', 'Linkedin Job Title'),
+    'company': ('companyName', 'Company Name', 'current_company', 'company', 'Linkedin Company Name'),
+    'skills': ('linkedinSkillsLabel', 'Linkedin Skills Label', 'skills_tags'),
+    'description': ('linkedinDescription', 'Linkedin Description', 'summary',
+                    'linkedinJobDescription', 'Linkedin Job Description'),
+    'education': ('linkedinSchoolDegree', 'Linkedin School Degree', 'education',
+                  'linkedinSchoolName', 'Linkedin School Name'),
+    'location': ('location', 'Location', 'linkedinJobLocation', 'Linkedin Job Location'),
+}
+
+
+class FieldSchema:
+    """
+    Mapa campo canónico -> colunas presentes, calculado uma vez por cabeçalho
+
+    Em vez de testar todos os nomes alternativos de um campo em cada acesso,
+    só as colunas que existem no conjunto de dados são consultadas (quase
+    sempre uma).
+    """
+
+    def __init__(self, columns: Iterable[str], aliases: Mapping[str, Sequence[str]] = FIELD_ALIASES):
+        """
+        Args:
+            columns: Colunas do conjunto de dados (cabeçalho da sheet, colunas do DataFrame)
+            aliases: Campo canónico -> colunas alternativas
+        """
+        self.columns = tuple(columns)
+        self.fields = self.resolve(aliases)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]],
+                  aliases: Mapping[str, Sequence[str]] = FIELD_ALIASES) -> 'FieldSchema':
+        """
+        Esquema para uma lista de linhas (união das chaves, pela ordem em que aparecem)
+
+        Args:
+            rows: Linhas do conjunto de dados
+            aliases: Campo canónico -> colunas alternativas
+
+        Returns:
+            Esquema resolvido
+        """
+        columns: Dict[str, None] = {}
+        signatures = set()
+
+        for row in rows:
+            # Linhas da mesma fonte partilham as chaves; cada combinação só é percorrida uma vez
+            signature = tuple(row)
+            if signature not in signatures:
+                signatures.add(signature)
+                columns.update(dict.fromkeys(signature))
+
+        return cls(columns, aliases)
+
+    def resolve(self, mapping: Mapping[str, Sequence[str]]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Restringe um mapa categoria -> colunas às colunas presentes
+
+        Args:
+            mapping: Categoria -> colunas alternativas (ordem preservada)
+
+        Returns:
+            Categoria -> colunas presentes (tuplo vazio se nenhuma existir)
+        """
+        present = set(self.columns)
+        return {field: tuple(column for column in columns if column in present) for field, columns in mapping.items()}
+
+    def columns_for(self, field: str) -> Tuple[str, ...]:
+        """Colunas presentes de um campo canónico, por ordem de preferência"""
+        return self.fields.get(field, ())
+
+    def column(self, field: str) -> Optional[str]:
+        """Coluna preferida de um campo canónico (None se não existir)"""
+        columns = self.fields.get(field)
+        return columns[0] if columns else None
+
+    def get(self, row: Mapping[str, Any], field: str, default: Any = None) -> Any:
+        """
+        Primeiro valor preenchido de um campo canónico numa linha
+
+        Args:
+            row: Dados da linha
+            field: Campo canónico
+            default: Valor se nenhuma coluna do campo estiver preenchida
+
+        Returns:
+            Valor da linha ou default
+        """
+        for column in self.fields.get(field, ()):
+            value = row.get(column)
+            if value:
+                return value
+        return default
@@ -1,11 +1,94 @@
 """
 Módulo para indexação semântica e pesquisa
 """
+import hashlib
+import json
+import os
+import time
 import numpy as np
 import faiss
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterator, Callable, Optional
 from openai import OpenAI
 from config import Config
+from embedding_cache import EmbeddingCache, LRUCache, normalize_query
+from embedding_executor import AsyncEmbeddingExecutor
+from lexical_index import BM25Index
+from profile_keys import profile_key
+from candidate_record import CandidateRecord, to_plain
+
+# Limites da API de embeddings do OpenAI
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_INPUT = 8191
+
+# Callback de progresso: (textos concluídos, total de textos)
+ProgressCallback = Callable[[int, int], None]
+
+# Ficheiros do índice persistido
+INDEX_FILENAME = "index.faiss"
+METADATA_FILENAME = "metadata.json"
+# Registo só de acréscimo com os IDs removidos desde o último save() (um por linha)
+REMOVALS_FILENAME = "removed.log"
+
+# Esquema dos IDs do mapa do FAISS; índices guardados com outro esquema são ignorados
+ID_SCHEME = "profile_key"
+
+# Tipos de índice e modos de pesquisa suportados
+INDEX_TYPES = ('flat', 'hnsw', 'ivf_flat', 'ivf_pq')
+SEARCH_MODES = ('vector', 'lexical', 'hybrid')
+
+# Campos usados no índice lexical
+LEXICAL_FIELDS = ('name', 'headline', 'education', 'current_company', 'location', 'skills_tags', 'summary')
+
+# Fração de posições removidas do HNSW a partir da qual o grafo é compactado
+TOMBSTONE_COMPACT_RATIO = 0.25
+
+
+def mmap_io_flags(index_type: str) -> int:
+    """
+    Flags de faiss.read_index para mapear em memória um índice deste tipo
+    
+    IO_FLAG_MMAP só mapeia as listas invertidas dos IVF; os vetores de
+    IndexFlat e do armazenamento do HNSW precisam de IO_FLAG_MMAP_IFC
+    (faiss >= 1.8).
+    
+    Args:
+        index_type: Tipo do índice guardado
+        
+    Returns:
+        Flags de leitura, ou 0 se esta versão do faiss não mapear este tipo
+    """
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    
+    mmap_ifc = getattr(faiss, 'IO_FLAG_MMAP_IFC', None)
+    return mmap_ifc | faiss.IO_FLAG_READ_ONLY if mmap_ifc is not None else 0
+
+
+def calibrate_bm25(score: float) -> float:
+    """
+    Converte um score BM25 em [0, 1) sem depender dos outros resultados
+    
+    bm25 / (bm25 + SEARCH_BM25_SATURATION): o mesmo score dá sempre o mesmo
+    valor, e o primeiro resultado só fica perto de 1 se for mesmo forte.
+    
+    Args:
+        score: Score BM25 (>= 0)
+        
+    Returns:
+        Score calibrado
+    """
+    return score / (score + Config.SEARCH_BM25_SATURATION) if score > 0 else 0.0
+
+
+def _in_memory_invlists(invlists):
+    """Copia listas invertidas (ex: mapeadas do disco, só de leitura) para ArrayInvertedLists"""
+    copy = faiss.ArrayInvertedLists(invlists.nlist, invlists.code_size)
+    for list_no in range(invlists.nlist):
+        size = invlists.list_size(list_no)
+        if size:
+            # Mesma ordem por lista: o mapa direto (id -> lista, posição) continua válido
+            copy.add_entries(list_no, size, invlists.get_ids(list_no), invlists.get_codes(list_no))
+    return copy
 
 class SemanticIndexer:
     """Classe para indexação semântica e pesquisa de candidatos"""
@@ -14,8 +97,44 @@ class SemanticIndexer:
         self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
         self.embedding_model = Config.EMBEDDING_MODEL
         self.index = None
-        self.candidates_data = []
+        self.candidates_by_id: Dict[int, CandidateRecord] = {}
+        self.mmapped = False
         self.dimension = 1536  # Dimensão dos embeddings do OpenAI ada-002
+        self.index_type = Config.INDEX_TYPE if Config.INDEX_TYPE in INDEX_TYPES else 'flat'
+        self.active_index_type = None
+        self.nprobe = Config.INDEX_NPROBE
+        self.ef_search = Config.INDEX_EF_SEARCH
+        self.lexical_index = BM25Index()
+        self.search_mode = Config.SEARCH_MODE if Config.SEARCH_MODE in SEARCH_MODES else 'vector'
+        self.batch_size = min(Config.EMBEDDING_BATCH_SIZE, MAX_INPUTS_PER_REQUEST)
+        self.batch_max_tokens = Config.EMBEDDING_BATCH_MAX_TOKENS
+        self.embedding_cache = self._init_embedding_cache()
+        self.query_cache = LRUCache(Config.QUERY_CACHE_SIZE)
+        self.results_cache = LRUCache(Config.SEARCH_RESULTS_CACHE_SIZE)
+        self.index_version = 0
+        # Posições internas do HNSW removidas mas ainda no grafo (filtradas até compactar)
+        self.tombstones = set()
+        self._id_map_cache = None
+        # IDs removidos ainda não escritos no registo de remoções
+        self.pending_removals: List[int] = []
+        self.embedding_executor = AsyncEmbeddingExecutor(
+            api_key=Config.OPENAI_API_KEY,
+            model=self.embedding_model,
+            max_concurrency=Config.EMBEDDING_MAX_CONCURRENCY,
+            requests_per_minute=Config.EMBEDDING_RPM_LIMIT,
+            tokens_per_minute=Config.EMBEDDING_TPM_LIMIT
+        )
+    
+    def _init_embedding_cache(self):
+        """Abre o cache persistente de embeddings, se configurado"""
+        if not Config.EMBEDDING_CACHE_PATH:
+            return None
+        
+        try:
+            return EmbeddingCache(Config.EMBEDDING_CACHE_PATH, Config.EMBEDDING_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            print(f"Aviso: Cache de embeddings indisponível ({Config.EMBEDDING_CACHE_PATH}): {e}")
+            return None
     
     def _get_embedding(self, text: str) -> List[float]:
         """
@@ -36,6 +155,140 @@ class SemanticIndexer:
         except Exception as e:
             raise Exception(f"Erro ao obter embedding: {e}")
     
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimativa conservadora de tokens (~3 caracteres por token em PT/ES)"""
+        return min(len(text) // 3 + 1, MAX_TOKENS_PER_INPUT)
+    
+    def _iter_batches(self, texts: List[str]) -> Iterator[Tuple[int, int, int]]:
+        """
+        Divide os textos em lotes respeitando os limites de inputs e tokens
+        
+        Args:
+            texts: Lista de textos
+            
+        Returns:
+            Iterador de tuplos (início, fim, tokens estimados) de cada lote
+        """
+        start = 0
+        batch_tokens = 0
+        
+        for i, text in enumerate(texts):
+            tokens = self._estimate_tokens(text)
+            
+            if i > start and (i - start >= self.batch_size or batch_tokens + tokens > self.batch_max_tokens):
+                yield start, i, batch_tokens
+                start = i
+                batch_tokens = 0
+            
+            batch_tokens += tokens
+        
+        if start < len(texts):
+            yield start, len(texts), batch_tokens
+    
+    def _embed_batch_into(self, texts: List[str], out: np.ndarray, progress_callback: Optional[ProgressCallback] = None):
+        """
+        Obtém embeddings em lote e escreve-os diretamente na matriz de saída
+        
+        Com vários lotes, os pedidos seguem em paralelo pelo executor assíncrono,
+        que respeita os limites de pedidos e tokens por minuto.
+        
+        Args:
+            texts: Lista de textos para embedar
+            out: Matriz float32 (len(texts) x dimension) a preencher
+            progress_callback: Chamado com (textos concluídos, total)
+        """
+        batches = list(self._iter_batches(texts))
+        
+        def store(start: int, data: List[Any]):
+            # A API indica a posição de cada embedding no lote
+            for item in data:
+                out[start + item.index] = item.embedding
+        
+        if len(batches) > 1 and self.embedding_executor.max_concurrency > 1:
+            try:
+                self.embedding_executor.run(texts, batches, store, progress_callback)
+            except Exception as e:
+                raise Exception(f"Erro ao obter embeddings em lote: {e}")
+            return
+        
+        done = 0
+        for start, end, _ in batches:
+            try:
+                response = self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts[start:end]
+                )
+            except Exception as e:
+                raise Exception(f"Erro ao obter embeddings em lote ({start}-{end}): {e}")
+            
+            store(start, response.data)
+            done += end - start
+            if progress_callback:
+                progress_callback(done, len(texts))
+    
+    def _embed_texts(self, texts: List[str], progress_callback: Optional[ProgressCallback] = None) -> np.ndarray:
+        """
+        Obtém embeddings para uma lista de textos, consultando o cache primeiro
+        
+        Args:
+            texts: Textos preparados
+            progress_callback: Chamado com (textos concluídos, total) durante os pedidos
+            
+        Returns:
+            Matriz float32 (len(texts) x dimension)
+        """
+        embeddings_array = np.empty((len(texts), self.dimension), dtype='float32')
+        
+        if self.embedding_cache is None:
+            self._embed_batch_into(texts, embeddings_array, progress_callback)
+            return embeddings_array
+        
+        cached = self.embedding_cache.get_many(self.embedding_model, texts)
+        missing = []
+        
+        for i, vector in enumerate(cached):
+            if vector is None:
+                missing.append(i)
+            else:
+                embeddings_array[i] = np.frombuffer(vector, dtype='float32')
+        
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            missing_array = np.empty((len(missing), self.dimension), dtype='float32')
+            self._embed_batch_into(missing_texts, missing_array, progress_callback)
+            
+            embeddings_array[missing] = missing_array
+            self.embedding_cache.put_many(
+                self.embedding_model,
+                missing_texts,
+                [row.tobytes() for row in missing_array]
+            )
+        
+        return embeddings_array
+    
+    def _cached_candidate_embeddings(self, candidates: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Embeddings normalizados dos candidatos lidos só do cache (sem pedidos à API)
+        
+        Args:
+            candidates: Candidatos indexados
+            
+        Returns:
+            Matriz float32, ou None se o cache estiver desativado ou faltar algum vetor
+        """
+        if self.embedding_cache is None:
+            return None
+        
+        texts = [self._prepare_text_for_embedding(candidate) for candidate in candidates]
+        cached = self.embedding_cache.get_many(self.embedding_model, texts)
+        if any(vector is None for vector in cached):
+            return None
+        
+        embeddings_array = np.vstack([np.frombuffer(vector, dtype='float32') for vector in cached])
+        faiss.normalize_L2(embeddings_array)
+        return embeddings_array
+    
     def _prepare_text_for_embedding(self, candidate: Dict[str, Any]) -> str:
         """
         Prepara texto do candidato para embedding
@@ -79,97 +332,476 @@ class SemanticIndexer:
         
         return " | ".join(text_parts)
     
-    def build(self, candidates: List[Dict[str, Any]]) -> bool:
+    def _prepare_text_for_lexical(self, candidate: Dict[str, Any]) -> str:
+        """Concatena os valores dos campos pesquisáveis (sem rótulos) para o BM25"""
+        parts = []
+        
+        for field in LEXICAL_FIELDS:
+            value = candidate.get(field)
+            if not value:
+                continue
+            parts.append(" ".join(map(str, value)) if isinstance(value, list) else str(value))
+        
+        return " ".join(parts)
+    
+    def _rebuild_lexical_index(self):
+        """Reconstrói o índice BM25 a partir dos candidatos (sem chamadas de rede)"""
+        self.lexical_index.clear()
+        
+        for candidate_id, candidate in self.candidates_by_id.items():
+            self.lexical_index.add(candidate_id, self._prepare_text_for_lexical(candidate))
+    
+    @staticmethod
+    def _candidate_id(candidate: Dict[str, Any]) -> int:
+        """
+        Obtém ID estável (int64 positivo) do candidato a partir da chave canónica do perfil
+        
+        Args:
+            candidate: Dados do candidato
+            
+        Returns:
+            ID para o mapa de IDs do FAISS
+        """
+        # Variantes do mesmo URL (www, subdomínio, query, barra final) dão o mesmo ID
+        key = profile_key(candidate)
+        
+        if not key:
+            # Sem URL, o ID deriva do próprio conteúdo do candidato
+            key = repr(sorted((str(k), str(v)) for k, v in candidate.items()))
+        
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') & 0x7FFFFFFFFFFFFFFF
+    
+    def _new_index(self, train_vectors: np.ndarray = None):
+        """
+        Cria índice FAISS vazio com IDs estáveis por candidato
+        
+        Todos os tipos usam Inner Product (cosine similarity com vetores normalizados).
+        Os tipos IVF precisam de treino; sem vetores suficientes usa-se o índice exato.
+        
+        Args:
+            train_vectors: Vetores normalizados para treinar índices IVF
+            
+        Returns:
+            Índice FAISS pronto a receber add_with_ids
+        """
+        index_type = self.index_type
+        n_train = 0 if train_vectors is None else len(train_vectors)
+        
+        if index_type in ('ivf_flat', 'ivf_pq'):
+            nlist = Config.INDEX_IVF_NLIST or max(1, int(4 * np.sqrt(max(n_train, 1))))
+            min_train = max(nlist, 256) if index_type == 'ivf_pq' else nlist
+            
+            if index_type == 'ivf_pq' and self.dimension % Config.INDEX_PQ_M != 0:
+                print(f"Aviso: INDEX_PQ_M={Config.INDEX_PQ_M} não divide a dimensão {self.dimension}, a usar ivf_flat")
+                index_type = 'ivf_flat'
+                min_train = nlist
+            
+            if n_train < min_train:
+                print(f"Aviso: {n_train} vetores insuficientes para treinar {index_type} (mínimo {min_train}), a usar flat")
+                index_type = 'flat'
+        
+        if index_type == 'hnsw':
+            hnsw = faiss.IndexHNSWFlat(self.dimension, Config.INDEX_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            hnsw.hnsw.efConstruction = Config.INDEX_HNSW_EF_CONSTRUCTION
+            index = faiss.IndexIDMap2(hnsw)
+        elif index_type in ('ivf_flat', 'ivf_pq'):
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            if index_type == 'ivf_pq':
+                index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, Config.INDEX_PQ_M, 8, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            
+            # Treinar numa amostra aleatória
+            if n_train > Config.INDEX_TRAIN_SAMPLE:
+                sample = np.random.default_rng(0).choice(n_train, Config.INDEX_TRAIN_SAMPLE, replace=False)
+                train_vectors = train_vectors[sample]
+            index.train(train_vectors)
+            
+            # IVF suporta IDs nativamente; o mapa direto permite remove_ids e reconstruct
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+        
+        self.active_index_type = index_type
+        self._apply_search_params(index)
+        return index
+    
+    def _apply_search_params(self, index=None):
+        """Aplica nprobe/efSearch ao índice ativo"""
+        index = index if index is not None else self.index
+        
+        if index is None:
+            return
+        
+        if self.active_index_type == 'hnsw':
+            faiss.downcast_index(index.index).hnsw.efSearch = self.ef_search
+        elif self.active_index_type in ('ivf_flat', 'ivf_pq'):
+            index.nprobe = self.nprobe
+    
+    def set_search_params(self, nprobe: int = None, ef_search: int = None):
+        """
+        Ajusta parâmetros de pesquisa (compromisso recall vs latência)
+        
+        Args:
+            nprobe: Número de listas IVF visitadas por query
+            ef_search: Tamanho da lista de candidatos do HNSW
+        """
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+        
+        self._apply_search_params()
+        self._index_changed()
+    
+    def _id_map(self) -> np.ndarray:
+        """IDs do IndexIDMap2 por posição interna (em cache até o índice mudar)"""
+        if self._id_map_cache is None:
+            self._id_map_cache = faiss.vector_to_array(self.index.id_map)
+        return self._id_map_cache
+    
+    def _remove_ids(self, ids: List[int]):
+        """
+        Remove vetores do índice pelos seus IDs
+        
+        HNSW não suporta remoção: as posições ficam marcadas (tombstones) e são
+        filtradas na pesquisa; o grafo só é reconstruído ao compactar, quando os
+        removidos passam TOMBSTONE_COMPACT_RATIO do índice ou na reindexação.
+        """
+        if self.active_index_type != 'hnsw':
+            self._ensure_writable()
+            self.index.remove_ids(np.array(ids, dtype='int64'))
+            return
+        
+        # Marca-se a posição, não o ID: uma atualização volta a adicionar o mesmo ID
+        positions = np.flatnonzero(np.isin(self._id_map(), np.array(ids, dtype='int64')))
+        self.tombstones.update(positions.tolist())
+        
+        if len(self.tombstones) > TOMBSTONE_COMPACT_RATIO * self.index.ntotal:
+            self.compact()
+    
+    def compact(self):
+        """Reconstrói o grafo HNSW só com os vetores não removidos"""
+        if not self.tombstones:
+            return
+        
+        id_map = self._id_map()
+        live = np.ones(len(id_map), dtype=bool)
+        live[list(self.tombstones)] = False
+        hnsw = faiss.downcast_index(self.index.index)
+        vectors = hnsw.reconstruct_n(0, hnsw.ntotal)
+        
+        index = self._new_index()
+        index.add_with_ids(vectors[live], id_map[live])
+        self.index = index
+        self.mmapped = False
+        self.tombstones = set()
+        self._id_map_cache = None
+    
+    @property
+    def candidates_data(self) -> List[CandidateRecord]:
+        """Candidatos indexados, pela ordem de inserção"""
+        return list(self.candidates_by_id.values())
+    
+    def _embed_candidates(self, candidates: List[Dict[str, Any]],
+                          progress_callback: Optional[ProgressCallback] = None) -> np.ndarray:
+        """Obtém embeddings normalizados (cosine similarity) para os candidatos"""
+        texts = [self._prepare_text_for_embedding(candidate) for candidate in candidates]
+        
+        # Obter embeddings (cache + pedidos em lote para os restantes)
+        embeddings_array = self._embed_texts(texts, progress_callback)
+        
+        # Normalizar embeddings para cosine similarity
+        faiss.normalize_L2(embeddings_array)
+        
+        return embeddings_array
+    
+    def _unique_by_id(self, candidates: List[Dict[str, Any]]) -> Dict[int, CandidateRecord]:
+        """Agrupa candidatos por ID, mantendo a primeira ocorrência, como registos compactos"""
+        by_id = {}
+        
+        for candidate in candidates:
+            candidate_id = self._candidate_id(candidate)
+            if candidate_id not in by_id:
+                by_id[candidate_id] = CandidateRecord.from_mapping(candidate)
+        
+        return by_id
+    
+    def build(self, candidates: List[Dict[str, Any]], progress_callback: Optional[ProgressCallback] = None) -> bool:
         """
         Constrói índice semântico a partir dos candidatos
         
         Args:
             candidates: Lista de candidatos para indexar
+            progress_callback: Chamado com (embeddings obtidos, total a obter)
             
         Returns:
             True se sucesso
         """
         try:
             if not candidates:
-                self.index = None
-                self.candidates_data = []
+                self.clear()
                 return True
             
-            # Preparar textos
-            texts = []
-            for candidate in candidates:
-                text = self._prepare_text_for_embedding(candidate)
-                texts.append(text)
+            by_id = self._unique_by_id(candidates)
+            embeddings_array = self._embed_candidates(list(by_id.values()), progress_callback)
             
-            # Obter embeddings
-            embeddings = []
-            for i, text in enumerate(texts):
-                embedding = self._get_embedding(text)
-                embeddings.append(embedding)
+            # Criar índice FAISS (treinado nos próprios vetores, se IVF) e adicionar com IDs
+            index = self._new_index(embeddings_array)
+            index.add_with_ids(embeddings_array, np.fromiter(by_id.keys(), dtype='int64', count=len(by_id)))
             
-            # Converter para numpy array
-            embeddings_array = np.array(embeddings).astype('float32')
+            # Guardar dados dos candidatos
+            self.index = index
+            self.candidates_by_id = by_id
+            self.tombstones = set()
+            self.pending_removals = []
+            self.mmapped = False
+            self._rebuild_lexical_index()
+            self._index_changed()
+            
+            return True
             
-            # Criar índice FAISS
-            self.index = faiss.IndexFlatIP(self.dimension)  # Inner Product (cosine similarity)
+        except Exception as e:
+            raise Exception(f"Erro ao construir índice: {e}")
+    
+    def add_candidates(self, candidates: List[Dict[str, Any]],
+                       progress_callback: Optional[ProgressCallback] = None) -> int:
+        """
+        Adiciona (ou substitui) candidatos no índice sem o reconstruir
+        
+        Args:
+            candidates: Lista de candidatos a adicionar
+            progress_callback: Chamado com (embeddings obtidos, total a obter)
             
-            # Normalizar embeddings para cosine similarity
-            faiss.normalize_L2(embeddings_array)
+        Returns:
+            Número de candidatos adicionados ou atualizados
+        """
+        try:
+            if not candidates:
+                return 0
             
-            # Adicionar ao índice
-            self.index.add(embeddings_array)
+            by_id = self._unique_by_id(candidates)
+            ids = np.fromiter(by_id.keys(), dtype='int64', count=len(by_id))
+            embeddings_array = self._embed_candidates(list(by_id.values()), progress_callback)
             
-            # Guardar dados dos candidatos
-            self.candidates_data = candidates.copy()
+            if self.index is None:
+                self.index = self._new_index(embeddings_array)
+            else:
+                self._ensure_writable()
             
-            return True
+            # Remover versões anteriores dos mesmos candidatos
+            existing = [candidate_id for candidate_id in by_id if candidate_id in self.candidates_by_id]
+            if existing:
+                self._remove_ids(existing)
+            
+            self.index.add_with_ids(embeddings_array, ids)
+            self.candidates_by_id.update(by_id)
+            if self.pending_removals:
+                self.pending_removals = [candidate_id for candidate_id in self.pending_removals if candidate_id not in by_id]
+            
+            for candidate_id, candidate in by_id.items():
+                self.lexical_index.add(candidate_id, self._prepare_text_for_lexical(candidate))
+            
+            self._index_changed()
+            
+            return len(by_id)
             
         except Exception as e:
-            raise Exception(f"Erro ao construir índice: {e}")
+            raise Exception(f"Erro ao adicionar candidatos: {e}")
     
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+    def update_candidate(self, candidate: Dict[str, Any]) -> bool:
         """
-        Pesquisa candidatos usando query semântica
+        Atualiza o vetor e os dados de um candidato
+        
+        Args:
+            candidate: Dados atualizados do candidato
+            
+        Returns:
+            True se atualizado
+        """
+        return self.add_candidates([candidate]) == 1
+    
+    def _query_vector(self, query: str) -> np.ndarray:
+        """Obtém embedding normalizado da query (matriz 1 x dimension), via LRU em memória"""
+        normalized = normalize_query(query)
+        cache_key = (self.embedding_model, normalized)
+        
+        query_array = self.query_cache.get(cache_key)
+        if query_array is None:
+            # Sem hit em memória, _embed_texts ainda consulta o cache em disco
+            query_array = self._embed_texts([normalized])
+            
+            # Normalizar para cosine similarity
+            faiss.normalize_L2(query_array)
+            self.query_cache.put(cache_key, query_array)
+        
+        return query_array
+    
+    def _ann_search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pesquisa no índice FAISS (várias queries), sem as posições removidas do HNSW
+        
+        Args:
+            queries: Matriz de queries normalizadas
+            k: Número de vizinhos por query
+            
+        Returns:
+            (scores, ids) como em faiss.Index.search (-1 onde faltam resultados)
+        """
+        if not self.tombstones:
+            return self.index.search(queries, k)
+        
+        # Pedir mais vizinhos ao grafo para compensar os removidos
+        hnsw = faiss.downcast_index(self.index.index)
+        scores, positions = hnsw.search(queries, min(hnsw.ntotal, k + len(self.tombstones)))
+        live = (positions >= 0) & ~np.isin(positions, np.fromiter(self.tombstones, dtype='int64'))
+        id_map = self._id_map()
+        
+        out_scores = np.full((len(queries), k), -np.inf, dtype='float32')
+        out_ids = np.full((len(queries), k), -1, dtype='int64')
+        for row in range(len(queries)):
+            kept = positions[row][live[row]][:k]
+            out_scores[row, :len(kept)] = scores[row][live[row]][:k]
+            out_ids[row, :len(kept)] = id_map[kept]
+        
+        return out_scores, out_ids
+    
+    def _vector_search(self, query_array: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Pesquisa no índice FAISS, devolvendo (id, score)"""
+        scores, ids = self._ann_search(query_array, min(k, len(self.candidates_by_id)))
+        return [(int(candidate_id), float(score)) for score, candidate_id in zip(scores[0], ids[0]) if candidate_id >= 0]
+    
+    def _fuse(self, vector_hits: List[Tuple[int, float]], lexical_hits: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """
+        Combina rankings vetorial e lexical
+        
+        Args:
+            vector_hits: Lista de (id, cosine) por ordem decrescente
+            lexical_hits: Lista de (id, bm25) por ordem decrescente
+            
+        Returns:
+            Lista de (id, score combinado) por ordem decrescente
+        """
+        fused: Dict[int, float] = {}
+        
+        if Config.SEARCH_FUSION == 'weighted':
+            alpha = Config.SEARCH_HYBRID_ALPHA
+            for weight, hits in ((alpha, vector_hits), (1 - alpha, lexical_hits)):
+                if not hits:
+                    continue
+                # Normalização min-max para tornar os scores comparáveis
+                high, low = hits[0][1], hits[-1][1]
+                span = (high - low) or 1.0
+                for candidate_id, score in hits:
+                    fused[candidate_id] = fused.get(candidate_id, 0.0) + weight * (score - low) / span
+        else:
+            # Reciprocal Rank Fusion
+            for hits in (vector_hits, lexical_hits):
+                for rank, (candidate_id, _) in enumerate(hits, 1):
+                    fused[candidate_id] = fused.get(candidate_id, 0.0) + 1.0 / (Config.SEARCH_RRF_K + rank)
+        
+        return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    
+    def _cosine_scores(self, query_array: np.ndarray, candidate_ids: List[int]) -> Dict[int, float]:
+        """Calcula o cosine da query com vetores já indexados"""
+        if not candidate_ids:
+            return {}
+        
+        vectors = np.vstack([self.index.reconstruct(candidate_id) for candidate_id in candidate_ids])
+        return dict(zip(candidate_ids, (vectors @ query_array[0]).tolist()))
+    
+    def search(self, query: str, k: int = 5, mode: str = None) -> List[CandidateRecord]:
+        """
+        Pesquisa candidatos usando query semântica, lexical (BM25) ou híbrida
         
         Args:
             query: Query de pesquisa
             k: Número de resultados a retornar
+            mode: vector, lexical ou hybrid (por defeito Config.SEARCH_MODE)
             
         Returns:
-            Lista de candidatos com scores
+            Lista de candidatos com scores (registos com a interface de um dicionário)
         """
         try:
-            if self.index is None or len(self.candidates_data) == 0:
+            if self.index is None or len(self.candidates_by_id) == 0:
                 return []
             
-            # Obter embedding da query
-            query_embedding = self._get_embedding(query)
-            query_array = np.array([query_embedding]).astype('float32')
+            mode = mode or self.search_mode
+            cache_key = (normalize_query(query), k, mode, self.index_version)
             
-            # Normalizar para cosine similarity
-            faiss.normalize_L2(query_array)
+            cached = self.results_cache.get(cache_key)
+            if cached is not None:
+                return [candidate.copy() for candidate in cached]
             
-            # Pesquisar
-            scores, indices = self.index.search(query_array, min(k, len(self.candidates_data)))
+            lexical_scores: Dict[int, float] = {}
+            fusion_scores: Dict[int, float] = {}
+            degraded = False
+            
+            if mode == 'vector':
+                ranked = self._vector_search(self._query_vector(query), k)
+                similarity = dict(ranked)
+            else:
+                # Recolher mais candidatos de cada lado antes de combinar
+                pool = k if mode == 'lexical' else max(k * 4, 20)
+                lexical_hits = self.lexical_index.search(query, pool)
+                lexical_scores = dict(lexical_hits)
+                query_array = None
+                
+                if mode == 'hybrid':
+                    try:
+                        query_array = self._query_vector(query)
+                    except Exception as e:
+                        # O lado lexical não depende do OpenAI
+                        print(f"Aviso: Embedding da query indisponível, a usar apenas BM25: {e}")
+                
+                if query_array is None:
+                    degraded = mode == 'hybrid'
+                    ranked = lexical_hits[:k]
+                    similarity = {candidate_id: calibrate_bm25(score) for candidate_id, score in ranked}
+                else:
+                    vector_hits = self._vector_search(query_array, pool)
+                    ranked = self._fuse(vector_hits, lexical_hits)[:k]
+                    fusion_scores = dict(ranked)
+                    similarity = dict(vector_hits)
+                    
+                    # Candidatos vindos só do BM25 também recebem o cosine real
+                    missing = [candidate_id for candidate_id, _ in ranked if candidate_id not in similarity]
+                    similarity.update(self._cosine_scores(query_array, missing))
             
             # Preparar resultados
             results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.candidates_data):
-                    candidate = self.candidates_data[idx].copy()
-                    candidate['similarity_score'] = float(score)
-                    candidate['rank'] = i + 1
-                    results.append(candidate)
+            for candidate_id, _ in ranked:
+                candidate_data = self.candidates_by_id.get(candidate_id)
+                if candidate_data is None:
+                    continue
+                
+                # Cópia O(1): os scores ficam nos extras, os campos base são partilhados
+                candidate = candidate_data.copy()
+                candidate['similarity_score'] = float(similarity.get(candidate_id, 0.0))
+                if candidate_id in lexical_scores:
+                    candidate['lexical_score'] = lexical_scores[candidate_id]
+                if candidate_id in fusion_scores:
+                    candidate['fusion_score'] = fusion_scores[candidate_id]
+                candidate['rank'] = len(results) + 1
+                results.append(candidate)
+            
+            # Resultados só com BM25 por falha do OpenAI não ficam em cache
+            if not degraded:
+                self.results_cache.put(cache_key, [candidate.copy() for candidate in results])
             
             return results
             
         except Exception as e:
             raise Exception(f"Erro na pesquisa: {e}")
     
-    def get_index_stats(self) -> Dict[str, Any]:
+    def get_index_stats(self, include_recall: bool = False) -> Dict[str, Any]:
         """
         Obtém estatísticas do índice
         
+        Args:
+            include_recall: Se deve medir recall e latência face à pesquisa exata
+            
         Returns:
             Dict com estatísticas
         """
@@ -180,21 +812,301 @@ class SemanticIndexer:
                 'dimension': self.dimension
             }
         
-        return {
-            'total_candidates': len(self.candidates_data),
+        stats = {
+            'total_candidates': len(self.candidates_by_id),
             'index_built': True,
             'dimension': self.dimension,
-            'index_type': 'FAISS IndexFlatIP'
+            'index_type': self.active_index_type,
+            'search_mode': self.search_mode,
+            'lexical_terms': len(self.lexical_index.postings),
+            'index_version': self.index_version,
+            'query_cache': {'size': len(self.query_cache), 'hits': self.query_cache.hits, 'misses': self.query_cache.misses},
+            'results_cache': {'size': len(self.results_cache), 'hits': self.results_cache.hits, 'misses': self.results_cache.misses}
+        }
+        
+        if self.active_index_type == 'hnsw':
+            stats['ef_search'] = self.ef_search
+            stats['tombstones'] = len(self.tombstones)
+        elif self.active_index_type in ('ivf_flat', 'ivf_pq'):
+            stats['nprobe'] = self.nprobe
+            stats['nlist'] = self.index.nlist
+        
+        if include_recall:
+            stats['recall_report'] = self.evaluate_recall()
+        
+        return stats
+    
+    def evaluate_recall(self, sample_size: int = 100, k: int = 10) -> Dict[str, Any]:
+        """
+        Mede recall@k e latência do índice aproximado face à pesquisa exata
+        
+        Usa como queries uma amostra dos vetores dos candidatos; a referência é
+        um IndexFlatIP sobre todos esses vetores. Para ivf_pq os códigos PQ só
+        guardam aproximações, por isso os vetores originais vêm do cache de
+        embeddings, sem pedidos à API. Se o cache estiver desativado ou
+        incompleto usam-se os vetores descodificados do PQ: o recall passa a
+        medir só a perda do IVF (nprobe), não a da quantização.
+        
+        Args:
+            sample_size: Número de queries de teste
+            k: Número de vizinhos comparados
+            
+        Returns:
+            Dict com recall@k, latências médias por query (ms) e a origem dos
+            vetores de referência ('index', 'embedding_cache' ou 'pq_decoded')
+        """
+        if self.index is None or not self.candidates_by_id:
+            return {}
+        
+        ids = np.fromiter(self.candidates_by_id.keys(), dtype='int64', count=len(self.candidates_by_id))
+        vectors = None
+        reference = 'index'
+        if self.active_index_type == 'ivf_pq':
+            vectors = self._cached_candidate_embeddings(list(self.candidates_by_id.values()))
+            if vectors is not None:
+                reference = 'embedding_cache'
+            else:
+                reference = 'pq_decoded'
+                print("Aviso: Embeddings originais fora do cache, recall medido sobre os vetores do PQ")
+        if vectors is None:
+            vectors = self.index.reconstruct_batch(ids)
+        
+        queries = vectors[np.random.default_rng(0).choice(len(ids), min(sample_size, len(ids)), replace=False)]
+        k = min(k, len(ids))
+        
+        start = time.perf_counter()
+        _, ann_ids = self._ann_search(queries, k)
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        # Verdade de referência: pesquisa exaustiva sobre os vetores completos
+        exact_index = faiss.IndexFlatIP(vectors.shape[1])
+        exact_index.add(vectors)
+        start = time.perf_counter()
+        _, positions = exact_index.search(queries, k)
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        exact_ids = ids[positions]
+        
+        hits = sum(
+            len(set(ann_row[ann_row >= 0]) & set(exact_row[exact_row >= 0]))
+            for ann_row, exact_row in zip(ann_ids, exact_ids)
+        )
+        
+        return {
+            'sample_size': len(queries),
+            'k': k,
+            'recall_at_k': hits / (len(queries) * k),
+            'ann_latency_ms': ann_ms,
+            'exact_latency_ms': exact_ms,
+            'reference': reference
         }
     
     def clear(self):
         """Limpa o índice"""
         self.index = None
-        self.candidates_data = []
+        self.candidates_by_id = {}
+        self.mmapped = False
+        self.active_index_type = None
+        self.tombstones = set()
+        self.lexical_index.clear()
+        self._index_changed()
+    
+    def _index_changed(self):
+        """Nova versão do índice: resultados em cache deixam de ser válidos"""
+        self.index_version += 1
+        self._id_map_cache = None
+        self.results_cache.clear()
+    
+    def _ensure_writable(self):
+        """
+        Passa para memória própria um índice carregado por mmap antes de o alterar
+        
+        faiss.clone_index não serve: falha com as listas invertidas mapeadas dos
+        IVF, e nos restantes a cópia continua a apontar para o ficheiro mapeado.
+        """
+        if not self.mmapped:
+            return
+        
+        if self.active_index_type in ('ivf_flat', 'ivf_pq'):
+            # Quantizador e mapa direto já estão em memória; só as listas vêm do disco
+            invlists = _in_memory_invlists(self.index.invlists)
+            # O índice passa a ser dono das listas (o Python não as liberta)
+            invlists.this.disown()
+            self.index.replace_invlists(invlists, True)
+        else:
+            self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+        
+        self.mmapped = False
+        self._apply_search_params()
+    
+    def save(self, path: str) -> bool:
+        """
+        Guarda o índice, o mapa de IDs e os dados dos candidatos em disco
+        
+        Args:
+            path: Diretório de destino
+            
+        Returns:
+            True se sucesso
+        """
+        try:
+            os.makedirs(path, exist_ok=True)
+            index_file = os.path.join(path, INDEX_FILENAME)
+            metadata_file = os.path.join(path, METADATA_FILENAME)
+            
+            removals_file = os.path.join(path, REMOVALS_FILENAME)
+            self.pending_removals = []
+            
+            if self.index is None:
+                # Índice vazio: remover ficheiros antigos
+                for file_path in (index_file, metadata_file, removals_file):
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                return True
+            
+            metadata = {
+                'embedding_model': self.embedding_model,
+                'dimension': self.dimension,
+                'index_type': self.active_index_type,
+                'id_scheme': ID_SCHEME,
+                'ids': [str(candidate_id) for candidate_id in self.candidates_by_id],
+                'candidates': list(self.candidates_by_id.values()),
+                'tombstones': sorted(self.tombstones)
+            }
+            
+            # Escrever para ficheiros temporários e substituir atomicamente
+            faiss.write_index(self.index, index_file + ".tmp")
+            with open(metadata_file + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, separators=(',', ':'), default=to_plain)
+            
+            os.replace(index_file + ".tmp", index_file)
+            os.replace(metadata_file + ".tmp", metadata_file)
+            
+            # As remoções registadas já estão no snapshot
+            if os.path.exists(removals_file):
+                os.remove(removals_file)
+            
+            return True
+            
+        except Exception as e:
+            raise Exception(f"Erro ao guardar índice: {e}")
+    
+    def load(self, path: str, mmap: bool = True) -> bool:
+        """
+        Carrega índice guardado com save()
+        
+        Args:
+            path: Diretório com o índice
+            mmap: Se deve mapear o índice em memória (páginas partilhadas entre processos)
+            
+        Returns:
+            True se carregado, False se não existir índice guardado
+        """
+        index_file = os.path.join(path, INDEX_FILENAME)
+        metadata_file = os.path.join(path, METADATA_FILENAME)
+        
+        if not (os.path.exists(index_file) and os.path.exists(metadata_file)):
+            return False
+        
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            
+            if metadata.get('embedding_model') != self.embedding_model:
+                # Vetores de outro modelo não são comparáveis com as queries
+                print(f"Aviso: Índice guardado usa o modelo {metadata.get('embedding_model')}, a ignorar")
+                return False
+            
+            if metadata.get('id_scheme') != ID_SCHEME:
+                # IDs calculados de outra forma não correspondem aos de _candidate_id
+                print("Aviso: Índice guardado usa outro esquema de IDs, a ignorar")
+                return False
+            
+            index_type = metadata.get('index_type', 'flat')
+            io_flags = mmap_io_flags(index_type) if mmap else 0
+            mmap = bool(io_flags)
+            
+            try:
+                self.index = faiss.read_index(index_file, io_flags)
+            except RuntimeError:
+                # Nem todas as versões do faiss suportam mmap para este tipo
+                mmap = False
+                self.index = faiss.read_index(index_file)
+            
+            self.active_index_type = index_type
+            self._apply_search_params()
+            self.dimension = metadata.get('dimension', self.dimension)
+            self.candidates_by_id = {
+                int(candidate_id): CandidateRecord.from_mapping(candidate)
+                for candidate_id, candidate in zip(metadata['ids'], metadata['candidates'])
+            }
+            self.mmapped = mmap
+            self.tombstones = set(metadata.get('tombstones', []))
+            self._id_map_cache = None
+            self.pending_removals = []
+            self._replay_removals(os.path.join(path, REMOVALS_FILENAME))
+            self._rebuild_lexical_index()
+            self._index_changed()
+            
+            return True
+            
+        except Exception as e:
+            raise Exception(f"Erro ao carregar índice: {e}")
+    
+    def _replay_removals(self, removals_file: str):
+        """Aplica ao índice carregado as remoções registadas depois do último save()"""
+        if not os.path.exists(removals_file):
+            return
+        
+        with open(removals_file, 'r', encoding='utf-8') as f:
+            removed = {int(line) for line in f if line.strip()}
+        
+        removed = [candidate_id for candidate_id in removed if candidate_id in self.candidates_by_id]
+        if not removed:
+            return
+        
+        self._remove_ids(removed)
+        for candidate_id in removed:
+            del self.candidates_by_id[candidate_id]
+        
+        if not self.candidates_by_id:
+            self.index = None
+            self.active_index_type = None
+            self.mmapped = False
+            self.tombstones = set()
+    
+    def append_removals(self, path: str) -> int:
+        """
+        Acrescenta ao registo de remoções os candidatos removidos desde a última escrita
+        
+        Custa O(removidos) em vez de reescrever o índice e os metadados como o
+        save(); o load() volta a aplicar o registo e o save() seguinte apaga-o.
+        
+        Args:
+            path: Diretório do índice guardado
+            
+        Returns:
+            Número de remoções escritas
+        """
+        if not self.pending_removals:
+            return 0
+        
+        try:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, REMOVALS_FILENAME), 'a', encoding='utf-8') as f:
+                f.write("".join(f"{candidate_id}\n" for candidate_id in self.pending_removals))
+            
+            written = len(self.pending_removals)
+            self.pending_removals = []
+            return written
+            
+        except Exception as e:
+            raise Exception(f"Erro ao registar remoções: {e}")
     
     def remove_candidate(self, linkedin_url: str) -> bool:
         """
-        Remove candidato do índice
+        Remove candidato do índice (apenas o seu vetor, sem reconstruir)
+        
+        Para persistir a remoção sem reescrever o índice usar append_removals().
         
         Args:
             linkedin_url: URL do LinkedIn do candidato a remover
@@ -203,25 +1115,21 @@ class SemanticIndexer:
             True se removido
         """
         try:
-            # Encontrar candidato
-            candidate_to_remove = None
-            for i, candidate in enumerate(self.candidates_data):
-                if candidate.get('linkedin_url') == linkedin_url:
-                    candidate_to_remove = i
-                    break
-            
-            if candidate_to_remove is None:
+            candidate_id = self._candidate_id({'linkedin_url': linkedin_url})
+            
+            if candidate_id not in self.candidates_by_id:
                 return False
             
-            # Remover da lista
-            self.candidates_data.pop(candidate_to_remove)
+            self._remove_ids([candidate_id])
+            del self.candidates_by_id[candidate_id]
+            self.pending_removals.append(candidate_id)
+            self.lexical_index.remove(candidate_id)
+            self._index_changed()
             
-            # Reconstruir índice se necessário
-            if len(self.candidates_data) > 0:
-                return self.build(self.candidates_data)
-            else:
+            if not self.candidates_by_id:
                 self.clear()
-                return True
+            
+            return True
                 
         except Exception as e:
             raise Exception(f"Erro ao remover candidato: {e}")
@@ -0,0 +1,234 @@
+"""
+Módulo para indexação lexical (BM25) de candidatos
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, List, Dict, Hashable, Optional, Tuple
+
+from field_schema import FieldSchema
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Palavras muito frequentes em PT/ES/EN que não ajudam a distinguir candidatos
+STOPWORDS = frozenset({
+    'a', 'o', 'as', 'os', 'e', 'y', 'de', 'da', 'do', 'das', 'dos', 'del', 'la', 'las', 'el', 'los',
+    'en', 'em', 'no', 'na', 'nos', 'nas', 'un', 'una', 'um', 'uma', 'con', 'com', 'por', 'para',
+    'que', 'quem', 'quien', 'tem', 'tiene', 'the', 'and', 'of', 'in', 'at', 'for', 'with', 'to', 'an'
+})
+
+
+def fold_text(text: str) -> str:
+    """
+    Converte texto para minúsculas e remove acentos
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto normalizado (ex: "Magíster" -> "magister")
+    """
+    if text.isascii():
+        # Sem acentos a remover: evita a decomposição carácter a carácter
+        return text.lower()
+    
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide texto em tokens normalizados, sem stopwords
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Lista de tokens
+    """
+    return [_stem(token) for token in TOKEN_PATTERN.findall(fold_text(text)) if token not in STOPWORDS]
+
+
+def _stem(token: str) -> str:
+    """Remove o plural simples ("startups" -> "startup") para aproximar formas"""
+    if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+class BM25Index:
+    """Índice invertido com ranking BM25, sem dependências externas"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.doc_lengths: Dict[Hashable, int] = {}
+        self.doc_terms: Dict[Hashable, Tuple[str, ...]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: Hashable, text: str):
+        """
+        Adiciona (ou substitui) um documento
+
+        Args:
+            doc_id: Identificador do documento
+            text: Texto a indexar
+        """
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+
+        tokens = tokenize(text)
+        term_counts = Counter(tokens)
+
+        for term, freq in term_counts.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+
+        self.doc_terms[doc_id] = tuple(term_counts)
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """
+        Remove um documento
+
+        Args:
+            doc_id: Identificador do documento
+
+        Returns:
+            True se removido
+        """
+        if doc_id not in self.doc_lengths:
+            return False
+
+        # Percorrer apenas as listas dos termos do documento
+        for term in self.doc_terms.pop(doc_id):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        return True
+
+    def clear(self):
+        """Limpa o índice"""
+        self.postings = {}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Hashable, float]]:
+        """
+        Pesquisa documentos por BM25
+
+        Args:
+            query: Query de pesquisa
+            k: Número de resultados a retornar
+
+        Returns:
+            Lista de (doc_id, score) por ordem decrescente de score
+        """
+        n_docs = len(self.doc_lengths)
+        if n_docs == 0:
+            return []
+
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[Hashable, float] = {}
+
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+
+            idf = math.log((n_docs - len(docs) + 0.5) / (len(docs) + 0.5) + 1.0)
+
+            for doc_id, freq in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class FieldedTfidfIndex:
+    """Índice invertido TF-IDF sobre vários campos, com pesos por campo"""
+
+    def __init__(self, field_mappings: Dict[str, List[str]], field_weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            field_mappings: Categoria -> nomes de colunas alternativos (ex: 'headline': ['headline', 'Linkedin Headline'])
+            field_weights: Categoria -> peso (por defeito 1.0)
+        """
+        self.field_mappings = field_mappings
+        self.field_weights = field_weights or {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.n_docs = 0
+
+    def build(self, rows: List[Dict[str, Any]], schema: Optional[FieldSchema] = None) -> 'FieldedTfidfIndex':
+        """
+        Indexa as linhas; o ID de cada documento é a sua posição na lista
+
+        Args:
+            rows: Lista de candidatos
+            schema: Esquema já resolvido para estas linhas (None = resolver aqui)
+
+        Returns:
+            O próprio índice
+        """
+        self.postings = {}
+        self.n_docs = len(rows)
+
+        # Colunas de cada categoria que existem nestes dados, resolvidas uma só vez
+        if schema is None:
+            schema = FieldSchema.from_rows(rows)
+        categories = [
+            (field_names, self.field_weights.get(category, 1.0))
+            for category, field_names in schema.resolve(self.field_mappings).items()
+            if field_names
+        ]
+
+        for doc_id, row in enumerate(rows):
+            weights: Dict[str, float] = {}
+
+            for field_names, field_weight in categories:
+                values = [str(row[field]) for field in field_names if row.get(field)]
+                if not values:
+                    continue
+
+                for term, freq in Counter(tokenize(" ".join(values))).items():
+                    # TF sublinear para não favorecer campos repetitivos
+                    weights[term] = weights.get(term, 0.0) + field_weight * (1.0 + math.log(freq))
+
+            for term, weight in weights.items():
+                self.postings.setdefault(term, {})[doc_id] = weight
+
+        return self
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Pesquisa por TF-IDF, visitando apenas as listas dos termos da query
+
+        Args:
+            query: Query de pesquisa
+            limit: Número máximo de resultados (None = todos com score > 0)
+
+        Returns:
+            Lista de (posição do documento, score) por ordem decrescente
+        """
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+
+            idf = math.log(1.0 + self.n_docs / len(docs))
+            for doc_id, weight in docs.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weight
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked if limit is None else ranked[:limit]
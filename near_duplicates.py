@@ -0,0 +1,261 @@
+"""
+Deteção de candidatos quase duplicados com MinHash e LSH
+"""
+import hashlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from lexical_index import TOKEN_PATTERN, fold_text
+from profile_keys import profile_url
+
+# Campo lógico -> colunas alternativas (app, PhantomBuster, formato antigo)
+NEAR_DUPLICATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'name': ('name', 'Full Name', 'fullName', 'Scraper Full Name'),
+    'headline': ('headline', 'Linkedin Headline', 'jobTitle'),
+    'company': ('current_company', 'Company Name', 'Linkedin Company Name', 'company', 'companyName'),
+    'school': ('education', 'Linkedin School Name', 'school'),
+}
+
+# Pares (primeiro nome, apelido) usados quando não há nome completo
+NAME_PART_FIELDS = (('First Name', 'Last Name'), ('firstName', 'lastName'))
+
+# Limite de elementos por bloco no cálculo das assinaturas (num_perm x shingles)
+SIGNATURE_CHUNK_ELEMENTS = 8_000_000
+
+# Hashes de shingles guardados entre chamadas; o cache é esvaziado ao atingir o limite
+SHINGLE_CACHE_SIZE = 262144
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Escolhe (bandas, linhas por banda) com limiar (1/b)^(1/r) mais próximo do pedido
+
+    Args:
+        threshold: Similaridade de Jaccard a partir da qual os pares devem colidir
+        num_perm: Número de permutações da assinatura
+
+    Returns:
+        (bandas, linhas por banda)
+    """
+    best = (num_perm, 1)
+    best_error = float('inf')
+
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        # Em caso de empate, preferir o limiar abaixo do pedido (menos falsos negativos)
+        if error < best_error or (error == best_error and (1.0 / bands) ** (1.0 / rows) < threshold):
+            best, best_error = (bands, rows), error
+
+    return best
+
+
+class NearDuplicateDetector:
+    """Agrupa perfis quase iguais (nome, headline, empresa, escola) em tempo sub-quadrático"""
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 128, seed: int = 1,
+                 fields: Optional[Mapping[str, Sequence[str]]] = None):
+        """
+        Args:
+            threshold: Similaridade de Jaccard mínima entre os conjuntos de shingles
+            num_perm: Número de funções de hash da assinatura MinHash
+            seed: Semente das funções de hash (assinaturas reprodutíveis)
+            fields: Campo lógico -> colunas alternativas
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.fields = dict(fields or NEAR_DUPLICATE_FIELDS)
+        self.bands, self.rows_per_band = _lsh_params(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift: h(x) = ((a * x + b) mod 2^64) >> 32, com a ímpar
+        self._a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        # Combinação linear (mod 2^64) das linhas de cada banda numa chave de balde
+        self._band_mixers = rng.integers(1, 1 << 63, size=self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+        self._hash_cache: Dict[str, int] = {}
+
+    def _field_text(self, row: Mapping[str, Any], field: str) -> str:
+        for column in self.fields.get(field, ()):
+            value = row.get(column)
+            if isinstance(value, str) and value.strip():
+                return value
+
+        if field == 'name':
+            for first_field, last_field in NAME_PART_FIELDS:
+                parts = [row.get(first_field), row.get(last_field)]
+                parts = [part for part in parts if isinstance(part, str) and part.strip()]
+                if parts:
+                    return " ".join(parts)
+
+        return ""
+
+    def name_tokens(self, row: Mapping[str, Any]) -> Set[str]:
+        """Tokens normalizados do nome"""
+        return set(TOKEN_PATTERN.findall(fold_text(self._field_text(row, 'name'))))
+
+    def shingles(self, row: Mapping[str, Any]) -> Set[str]:
+        """
+        Conjunto de shingles de um perfil: tokens e pares de tokens de cada campo,
+        prefixados pelo campo (um apelido igual ao nome da empresa não conta)
+
+        Args:
+            row: Dados do candidato
+
+        Returns:
+            Conjunto de shingles (vazio se o perfil não tiver nenhum dos campos)
+        """
+        shingles = set()
+
+        for field in self.fields:
+            tokens = TOKEN_PATTERN.findall(fold_text(self._field_text(row, field)))
+            shingles.update(f"{field}:{token}" for token in tokens)
+            shingles.update(f"{field}:{first} {second}" for first, second in zip(tokens, tokens[1:]))
+
+        return shingles
+
+    def signatures(self, shingle_sets: Sequence[Set[str]]) -> np.ndarray:
+        """
+        Assinaturas MinHash de vários conjuntos, calculadas em bloco
+
+        Args:
+            shingle_sets: Conjuntos de shingles (não vazios)
+
+        Returns:
+            Matriz (n x num_perm) de uint64
+        """
+        signatures = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint64)
+        if not shingle_sets:
+            return signatures
+
+        cache = self._hash_cache
+        hashes = []
+        for shingles in shingle_sets:
+            for shingle in shingles:
+                value = cache.get(shingle)
+                if value is None:
+                    if len(cache) >= SHINGLE_CACHE_SIZE:
+                        cache.clear()
+                    value = cache[shingle] = _shingle_hash(shingle)
+                hashes.append(value)
+
+        values = np.array(hashes, dtype=np.uint64)
+        lengths = np.array([len(shingles) for shingles in shingle_sets], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+        # Blocos de linhas para limitar a matriz intermédia (num_perm x shingles)
+        max_shingles = max(1, SIGNATURE_CHUNK_ELEMENTS // self.num_perm)
+        start = 0
+        while start < len(shingle_sets):
+            end = start + 1
+            while end < len(shingle_sets) and offsets[end + 1] - offsets[start] <= max_shingles:
+                end += 1
+
+            block = values[offsets[start]:offsets[end]]
+            permuted = (self._a[:, None] * block[None, :] + self._b[:, None]) >> np.uint64(32)
+            starts = offsets[start:end] - offsets[start]
+            signatures[start:end] = np.minimum.reduceat(permuted, starts, axis=1).T
+            start = end
+
+        return signatures
+
+    def _is_match(self, first: Set[str], second: Set[str], first_name: Set[str], second_name: Set[str]) -> bool:
+        """Confirma um par candidato com o Jaccard exato; nomes conhecidos têm de partilhar um token"""
+        if first_name and second_name and not first_name & second_name:
+            return False
+
+        union = len(first | second)
+        return union > 0 and len(first & second) / union >= self.threshold
+
+    def find_clusters(self, rows: Sequence[Mapping[str, Any]]) -> List[List[int]]:
+        """
+        Encontra grupos de perfis quase duplicados
+
+        Args:
+            rows: Lista de candidatos
+
+        Returns:
+            Grupos de posições (pelo menos 2 por grupo), cada um por ordem crescente
+        """
+        shingle_sets = [self.shingles(row) for row in rows]
+        positions = [i for i, shingles in enumerate(shingle_sets) if shingles]
+        if len(positions) < 2:
+            return []
+
+        names = [self.name_tokens(rows[i]) for i in positions]
+        sets = [shingle_sets[i] for i in positions]
+        signatures = self.signatures(sets)
+
+        parent = list(range(len(positions)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            columns = slice(band * self.rows_per_band, (band + 1) * self.rows_per_band)
+            band_keys = (signatures[:, columns] * self._band_mixers).sum(axis=1, dtype=np.uint64)
+
+            # Agrupar por chave com uma ordenação estável (membros por ordem crescente)
+            order = np.argsort(band_keys, kind='stable')
+            boundaries = np.flatnonzero(np.diff(band_keys[order])) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+
+            for bucket in np.flatnonzero(ends - starts > 1):
+                members = order[starts[bucket]:ends[bucket]].tolist()
+
+                # Comparar cada perfil só com um representante de cada grupo já formado no balde
+                representatives: List[int] = []
+                for i in members:
+                    for other in representatives:
+                        root, other_root = find(i), find(other)
+                        if root != other_root and self._is_match(sets[i], sets[other], names[i], names[other]):
+                            parent[max(root, other_root)] = min(root, other_root)
+
+                    root = find(i)
+                    if all(find(other) != root for other in representatives):
+                        representatives.append(i)
+
+        groups: Dict[int, List[int]] = {}
+        for i, position in enumerate(positions):
+            groups.setdefault(find(i), []).append(position)
+
+        return sorted((group for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+
+def merge_rows(rows: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    Junta as linhas de um grupo: a primeira prevalece e os campos vazios
+    são preenchidos pelas seguintes, pela ordem
+
+    Args:
+        rows: Linhas do mesmo candidato
+
+    Returns:
+        Linha resultante (novo dicionário)
+    """
+    rows = list(rows)
+    merged = dict(rows[0])
+
+    for row in rows[1:]:
+        for key, value in row.items():
+            if key not in merged or merged[key] in (None, '', []):
+                merged[key] = value
+
+    return merged
+
+
+def describe_cluster(rows: Sequence[Mapping[str, Any]], cluster: Sequence[int]) -> Dict[str, Any]:
+    """Resumo de um grupo para relatórios (posições e URLs dos perfis)"""
+    return {
+        'positions': list(cluster),
+        'urls': [profile_url(rows[i]) for i in cluster],
+    }
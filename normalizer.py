@@ -1,14 +1,233 @@
 """
 Módulo para normalização, deduplicação e etiquetagem de dados
 """
+import hashlib
+import multiprocessing
+import os
 import re
-from typing import List, Dict, Any, Set
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import List, Dict, Any, Optional, Set, Iterable, Iterator, Tuple
 from datetime import datetime
+from near_duplicates import NearDuplicateDetector, describe_cluster, merge_rows
+from profile_keys import PROFILE_URL_FIELDS, profile_key
+from skill_tagger import SkillTagger
+
+# Abaixo disto o arranque dos processos custa mais do que a própria normalização
+PARALLEL_MIN_ROWS = 20000
+
+# Versão das regras de limpeza e resumo: incrementar ao alterá-las para que o
+# content_hash das linhas já normalizadas deixe de corresponder
+NORMALIZER_VERSION = 1
+
+# Campos derivados ou de controlo que não entram na impressão digital do conteúdo
+FINGERPRINT_EXCLUDED_FIELDS = frozenset({'content_hash', 'skills_tags', 'summary', 'ingested_at'})
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'([.!?]\s*)')
+
+# Valores distintos limpos guardados em memória (localizações, empresas, escolas repetem-se muito)
+CLEAN_CACHE_SIZE = 65536
+
+
+def capitalize_sentences(text: str) -> str:
+    """Capitaliza a primeira letra de cada frase (o resto da frase fica em minúsculas)"""
+    if '.' not in text and '!' not in text and '?' not in text:
+        return text.capitalize()
+    # Os separadores (pontuação + espaços) não mudam com capitalize()
+    return ''.join([part.capitalize() for part in SENTENCE_SPLIT_PATTERN.split(text)])
+
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def _clean_text_cached(value: str) -> str:
+    return capitalize_sentences(' '.join(value.split()))
+
+
+def clean_text(value: str) -> str:
+    """
+    Limpa um valor de texto: strip, espaços colapsados e frases capitalizadas
+
+    str.split() usa a mesma definição de espaço em branco que \\s, por isso
+    o resultado é igual ao de re.sub(r'\\s+', ' ', value.strip()).
+
+    Valores que já estão limpos e se reconhecem com métodos de str (células
+    vazias, números, uma palavra com maiúscula ASCII só no início) são
+    devolvidos sem passar pelo cache nem pelo pipeline. Para texto com espaços
+    ou pontuação a verificação custaria tanto como a própria limpeza.
+
+    Args:
+        value: Texto bruto
+
+    Returns:
+        Texto limpo
+    """
+    if not value or value.isdigit() or (value.isalnum() and 'A' <= value[:1] <= 'Z' and value[1:].islower()):
+        return value
+    return _clean_text_cached(value)
+
+
+def clear_clean_cache():
+    """Esvazia o cache de valores limpos (benchmarks com cache frio)"""
+    _clean_text_cached.cache_clear()
+
+
+def pipeline_version(taxonomy: Dict[str, List[str]]) -> str:
+    """
+    Versão do pipeline: NORMALIZER_VERSION mais um resumo da taxonomia de skills
+    
+    Args:
+        taxonomy: Categoria -> lista de palavras-chave
+        
+    Returns:
+        Texto que muda quando as regras ou a taxonomia mudam
+    """
+    digest = hashlib.blake2b(repr(sorted(taxonomy.items())).encode('utf-8'), digest_size=8).hexdigest()
+    return f"{NORMALIZER_VERSION}:{digest}"
+
+
+def content_fingerprint(row: Dict[str, Any], version: str = "") -> str:
+    """
+    Impressão digital do conteúdo de uma linha normalizada
+    
+    Usa a representação escrita na sheet (str(valor), vazio = ausente) e ignora a
+    ordem das colunas, por isso uma linha lida de volta sem alterações mantém a
+    impressão digital com que foi escrita.
+    
+    Args:
+        row: Dados do candidato
+        version: Versão do pipeline que normalizou a linha (ver pipeline_version)
+        
+    Returns:
+        Hash hexadecimal
+    """
+    parts = sorted(
+        f"{field}\x1e{value}"
+        for field, value in ((str(k), str(v)) for k, v in row.items() if k not in FINGERPRINT_EXCLUDED_FIELDS)
+        if value
+    )
+    parts.insert(0, version)
+    return hashlib.blake2b("\x1f".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def is_unchanged(row: Dict[str, Any], version: str = "") -> bool:
+    """Se a linha já foi normalizada por esta versão do pipeline e não mudou desde então"""
+    return bool(row.get('content_hash')) and row['content_hash'] == content_fingerprint(row, version)
+
+
+# Normalizador de cada processo do pool (enviado uma vez pelo initializer)
+_worker_normalizer = None
+
+
+def _init_worker(normalizer):
+    global _worker_normalizer
+    _worker_normalizer = normalizer
+
+
+def _normalize_shard(rows: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    # Os quase duplicados só podem ser agrupados depois de juntar todos os shards
+    return _worker_normalizer.normalize_all(rows, key, near_duplicates=False)
+
+
+def normalize_in_parallel(normalizer, rows: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                          key: Optional[str] = 'linkedin_url', min_rows: int = PARALLEL_MIN_ROWS,
+                          near_duplicates: bool = True) -> List[Dict[str, Any]]:
+    """
+    Normaliza shards contíguos das linhas num pool de processos
+    
+    Cada shard é deduplicado localmente; a deduplicação global (e a etapa de
+    quase duplicados, se ativa) é feita na junção, pela ordem dos shards, pelo
+    que o resultado é o mesmo de normalize_all.
+    
+    Args:
+        normalizer: DataNormalizer
+        rows: Iterável de dicionários com dados brutos
+        workers: Número de processos (None = todos os cores)
+        key: Chave para identificar duplicados (None = sem deduplicação)
+        min_rows: Abaixo deste número de linhas normaliza no processo atual
+        near_duplicates: Se aplica a etapa de quase duplicados (quando ativa no normalizador)
+        
+    Returns:
+        Lista completamente normalizada
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    workers = workers or os.cpu_count() or 1
+    
+    if workers <= 1 or len(rows) < min_rows:
+        return normalizer.normalize_all(rows, key, near_duplicates=near_duplicates)
+    
+    # Vários shards por processo para equilibrar a carga
+    shard_size = -(-len(rows) // (workers * 4))
+    shards = [rows[start:start + shard_size] for start in range(0, len(rows), shard_size)]
+    
+    seen = set()
+    normalized = []
+    
+    # spawn: fork a partir do processo multi-thread do Streamlit não é seguro
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(normalizer,)) as executor:
+        for shard in executor.map(_normalize_shard, shards, repeat(key)):
+            for row in shard:
+                if not DataNormalizer._is_duplicate(row, seen, key):
+                    normalized.append(row)
+    
+    return normalizer.merge_near_duplicates(normalized) if near_duplicates else normalized
+
+
+def normalize_incremental(normalizer, rows: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                          key: str = 'linkedin_url') -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Normaliza só as linhas novas ou alteradas desde a última normalização
+    
+    Linhas cujo content_hash corresponde ao conteúdo atual e à versão do
+    pipeline passam sem alterações (e continuam a contar para a deduplicação);
+    as restantes passam pelo pipeline completo, em paralelo se forem muitas.
+    Mudar as regras (NORMALIZER_VERSION) ou a taxonomia obriga a uma passagem
+    completa.
+    
+    Args:
+        normalizer: DataNormalizer
+        rows: Iterável de dicionários (ex: lidos da sheet)
+        workers: Número de processos para as linhas alteradas (None = todos os cores)
+        key: Chave para identificar duplicados
+        
+    Returns:
+        (lista normalizada, posições na lista das linhas novas ou alteradas)
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    unchanged = [is_unchanged(row, normalizer.pipeline_version) for row in rows]
+    changed_rows = [row for row, same in zip(rows, unchanged) if not same]
+    
+    # key=None: sem deduplicação, para manter a correspondência 1:1 com changed_rows;
+    # a deduplicação é feita a seguir, pela ordem original
+    normalized_changed = iter(normalize_in_parallel(normalizer, changed_rows, workers, key=None, near_duplicates=False))
+    
+    seen = set()
+    normalized = []
+    for row, same in zip(rows, unchanged):
+        if not same:
+            row = next(normalized_changed)
+        if not DataNormalizer._is_duplicate(row, seen, key):
+            normalized.append(row)
+    
+    normalized = normalizer.merge_near_duplicates(normalized)
+    
+    # Alteradas = tudo o que não é um dos dicionários de entrada inalterados
+    passed_through = {id(row) for row, same in zip(rows, unchanged) if same}
+    changed_positions = [i for i, row in enumerate(normalized) if id(row) not in passed_through]
+    
+    return normalized, changed_positions
+
 
 class DataNormalizer:
     """Classe para normalizar e processar dados de candidatos"""
     
-    def __init__(self):
+    def __init__(self, near_duplicates: bool = False, near_duplicate_threshold: float = 0.7):
+        """
+        Args:
+            near_duplicates: Se deve agrupar e juntar candidatos quase duplicados em normalize_all
+            near_duplicate_threshold: Similaridade mínima (Jaccard) entre perfis do mesmo grupo
+        """
         # Skills comuns para etiquetagem
         self.common_skills = {
             'finanças': ['finanças', 'finance', 'financial', 'contabilidade', 'accounting'],
@@ -22,52 +241,80 @@ class DataNormalizer:
             'comunicação': ['comunicação', 'communication', 'public relations', 'content'],
             'logística': ['logística', 'logistics', 'supply chain', 'operations']
         }
+        
+        # Taxonomia compilada uma vez num autómato (uma passagem linear por perfil)
+        self.skill_tagger = SkillTagger(self.common_skills)
+        self.pipeline_version = pipeline_version(self.common_skills)
+        
+        # Etapa opcional: o mesmo perfil com URLs diferentes (vanity vs ID, renomeado)
+        self.near_duplicate_detector = NearDuplicateDetector(near_duplicate_threshold) if near_duplicates else None
+        self.near_duplicate_report: List[Dict[str, Any]] = []
     
-    def clean(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _clean_row(self, row: Dict[str, Any], in_place: bool = False) -> Dict[str, Any]:
+        """Limpa uma linha, devolvendo um novo dicionário (ou a própria linha, se in_place)"""
+        if in_place:
+            cleaned_row = row
+            for key, value in row.items():
+                if isinstance(value, str):
+                    cleaned_value = clean_text(value)
+                    # Só escrever as células que mudam
+                    if cleaned_value != value:
+                        row[key] = cleaned_value
+        else:
+            cleaned_row = {
+                key: clean_text(value) if isinstance(value, str) else value
+                for key, value in row.items()
+            }
+        
+        # Adicionar campos obrigatórios se não existirem
+        if 'source' not in cleaned_row:
+            cleaned_row['source'] = 'phantombuster'
+        
+        if 'ingested_at' not in cleaned_row:
+            cleaned_row['ingested_at'] = datetime.now().isoformat()
+        
+        return cleaned_row
+    
+    def clean(self, rows: List[Dict[str, Any]], in_place: bool = False) -> List[Dict[str, Any]]:
         """
         Limpa dados básicos das linhas
         
         Args:
             rows: Lista de dicionários com dados brutos
+            in_place: Se deve alterar as próprias linhas em vez de criar cópias
             
         Returns:
             Lista de dicionários limpos
         """
-        cleaned_rows = []
+        return [self._clean_row(row, in_place) for row in rows]
+    
+    @staticmethod
+    def _dedupe_key(row: Dict[str, Any], key: str) -> Any:
+        """Chave de deduplicação; para URLs de perfil usa a chave canónica (e as variantes da coluna)"""
+        if key in PROFILE_URL_FIELDS:
+            return profile_key(row)
+        return row.get(key)
+    
+    @staticmethod
+    def _is_duplicate(row: Dict[str, Any], seen: Set[Any], key: str) -> bool:
+        """Verifica (e regista) a chave da linha; linhas sem chave nunca são duplicadas"""
+        dedupe_key = DataNormalizer._dedupe_key(row, key)
         
-        for row in rows:
-            cleaned_row = {}
-            
-            for key, value in row.items():
-                if isinstance(value, str):
-                    # Limpar espaços em branco
-                    cleaned_value = value.strip()
-                    
-                    # Remover caracteres especiais excessivos
-                    cleaned_value = re.sub(r'\s+', ' ', cleaned_value)
-                    
-                    # Capitalizar primeira letra de frases
-                    cleaned_value = self._capitalize_sentences(cleaned_value)
-                    
-                    cleaned_row[key] = cleaned_value
-                else:
-                    cleaned_row[key] = value
-            
-            # Adicionar campos obrigatórios se não existirem
-            if 'source' not in cleaned_row:
-                cleaned_row['source'] = 'phantombuster'
-            
-            if 'ingested_at' not in cleaned_row:
-                cleaned_row['ingested_at'] = datetime.now().isoformat()
-            
-            cleaned_rows.append(cleaned_row)
+        if dedupe_key:
+            if dedupe_key in seen:
+                return True
+            seen.add(dedupe_key)
         
-        return cleaned_rows
+        return False
     
     def dedupe(self, rows: List[Dict[str, Any]], key: str = 'linkedin_url') -> List[Dict[str, Any]]:
         """
         Remove duplicados baseado numa chave
         
+        URLs de perfil são comparados pela chave canónica (ver profile_keys), por
+        isso "https://www.linkedin.com/in/foo/" e "http://linkedin.com/in/foo"
+        contam como o mesmo candidato.
+        
         Args:
             rows: Lista de dicionários
             key: Chave para identificar duplicados
@@ -76,18 +323,28 @@ class DataNormalizer:
             Lista sem duplicados
         """
         seen = set()
-        unique_rows = []
         
-        for row in rows:
-            if key in row and row[key]:
-                if row[key] not in seen:
-                    seen.add(row[key])
-                    unique_rows.append(row)
-            else:
-                # Manter linhas sem a chave (podem ser válidas)
-                unique_rows.append(row)
+        # Manter linhas sem a chave (podem ser válidas)
+        return [row for row in rows if not self._is_duplicate(row, seen, key)]
+    
+    def _tag_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Adiciona skills_tags a uma linha (in place)"""
+        # Combinar texto para análise
+        text_to_analyze = ""
+        
+        if 'headline' in row:
+            text_to_analyze += f" {row['headline']}"
         
-        return unique_rows
+        if 'education' in row:
+            text_to_analyze += f" {row['education']}"
+        
+        if 'current_company' in row:
+            text_to_analyze += f" {row['current_company']}"
+        
+        # Encontrar skills (palavras inteiras, sem distinguir maiúsculas/acentos)
+        row['skills_tags'] = self.skill_tagger.tag(text_to_analyze)
+        
+        return row
     
     def tag_skills(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -99,37 +356,40 @@ class DataNormalizer:
         Returns:
             Lista com campo skills_tags adicionado
         """
-        tagged_rows = []
+        return [self._tag_row(row) for row in rows]
+    
+    def _summarise_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Adiciona summary a uma linha (in place)"""
+        summary_parts = []
         
-        for row in rows:
-            # Combinar texto para análise
-            text_to_analyze = ""
-            
-            if 'headline' in row:
-                text_to_analyze += f" {row['headline']}"
-            
-            if 'education' in row:
-                text_to_analyze += f" {row['education']}"
-            
-            if 'current_company' in row:
-                text_to_analyze += f" {row['current_company']}"
-            
-            # Converter para minúsculas para comparação
-            text_lower = text_to_analyze.lower()
-            
-            # Encontrar skills
-            found_skills = set()
-            for skill_category, skill_keywords in self.common_skills.items():
-                for keyword in skill_keywords:
-                    if keyword.lower() in text_lower:
-                        found_skills.add(skill_category)
-                        break
-            
-            # Adicionar skills encontradas
-            row['skills_tags'] = list(found_skills)
-            tagged_rows.append(row)
+        # Nome
+        if 'name' in row and row['name']:
+            summary_parts.append(f"Nome: {row['name']}")
+        
+        # Headline
+        if 'headline' in row and row['headline']:
+            headline = row['headline'][:100]  # Limitar tamanho
+            summary_parts.append(f"Perfil: {headline}")
+        
+        # Educação
+        if 'education' in row and row['education']:
+            education = row['education'][:80]  # Limitar tamanho
+            summary_parts.append(f"Educação: {education}")
+        
+        # Empresa atual
+        if 'current_company' in row and row['current_company']:
+            company = row['current_company'][:60]  # Limitar tamanho
+            summary_parts.append(f"Empresa: {company}")
         
-        return tagged_rows
+        # Skills
+        if 'skills_tags' in row and row['skills_tags']:
+            skills_str = ", ".join(row['skills_tags'][:3])  # Máximo 3 skills
+            summary_parts.append(f"Skills: {skills_str}")
+        
+        # Criar resumo
+        row['summary'] = " | ".join(summary_parts)
+        
+        return row
     
     def summarise(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -141,69 +401,121 @@ class DataNormalizer:
         Returns:
             Lista com campo summary adicionado
         """
-        summarised_rows = []
+        return [self._summarise_row(row) for row in rows]
+    
+    def _fingerprint_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Adiciona content_hash a uma linha normalizada (in place)"""
+        row['content_hash'] = content_fingerprint(row, self.pipeline_version)
+        return row
+    
+    def merge_near_duplicates(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Agrupa candidatos quase duplicados (MinHash/LSH sobre nome, headline,
+        empresa e escola) e junta cada grupo na sua primeira linha
         
-        for row in rows:
-            summary_parts = []
-            
-            # Nome
-            if 'name' in row and row['name']:
-                summary_parts.append(f"Nome: {row['name']}")
-            
-            # Headline
-            if 'headline' in row and row['headline']:
-                headline = row['headline'][:100]  # Limitar tamanho
-                summary_parts.append(f"Perfil: {headline}")
-            
-            # Educação
-            if 'education' in row and row['education']:
-                education = row['education'][:80]  # Limitar tamanho
-                summary_parts.append(f"Educação: {education}")
-            
-            # Empresa atual
-            if 'current_company' in row and row['current_company']:
-                company = row['current_company'][:60]  # Limitar tamanho
-                summary_parts.append(f"Empresa: {company}")
-            
-            # Skills
-            if 'skills_tags' in row and row['skills_tags']:
-                skills_str = ", ".join(row['skills_tags'][:3])  # Máximo 3 skills
-                summary_parts.append(f"Skills: {skills_str}")
+        Os grupos encontrados ficam em self.near_duplicate_report. Sem a etapa
+        ativa (near_duplicates=False) as linhas são devolvidas sem alterações.
+        
+        Args:
+            rows: Lista de candidatos normalizados
             
-            # Criar resumo
-            summary = " | ".join(summary_parts)
-            row['summary'] = summary
-            summarised_rows.append(row)
+        Returns:
+            Lista com uma linha por grupo, pela ordem original
+        """
+        if self.near_duplicate_detector is None:
+            return rows
+        
+        clusters = self.near_duplicate_detector.find_clusters(rows)
+        self.near_duplicate_report = [describe_cluster(rows, cluster) for cluster in clusters]
+        
+        if not clusters:
+            return rows
         
-        return summarised_rows
+        merged = {}
+        dropped = set()
+        for cluster in clusters:
+            # Campos preenchidos a partir das outras linhas mudam as skills e o resumo
+            merged[cluster[0]] = self._fingerprint_row(
+                self._summarise_row(self._tag_row(merge_rows(rows[i] for i in cluster)))
+            )
+            dropped.update(cluster[1:])
+        
+        return [merged.get(i, row) for i, row in enumerate(rows) if i not in dropped]
     
     def _capitalize_sentences(self, text: str) -> str:
         """Capitaliza primeira letra de cada frase"""
-        sentences = re.split(r'([.!?]\s*)', text)
-        capitalized = []
+        return capitalize_sentences(text)
+    
+    def normalize_stream(self, rows: Iterable[Dict[str, Any]], key: str = 'linkedin_url',
+                         in_place: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Aplica o pipeline de normalização linha a linha, de forma preguiçosa
         
-        for i, sentence in enumerate(sentences):
-            if sentence.strip():
-                capitalized.append(sentence.capitalize())
-            else:
-                capitalized.append(sentence)
+        Aceita qualquer iterável (ex: csv.DictReader sobre uma exportação grande)
+        e só mantém em memória o conjunto de chaves já vistas para a deduplicação.
+        Cada linha sai com content_hash (ver normalize_incremental).
         
-        return ''.join(capitalized)
+        Args:
+            rows: Iterável de dicionários com dados brutos
+            key: Chave para identificar duplicados (None = sem deduplicação)
+            in_place: Se deve normalizar as próprias linhas de entrada em vez de cópias
+            
+        Returns:
+            Gerador de linhas normalizadas, pela ordem de entrada
+        """
+        seen = set()
+        
+        for row in rows:
+            cleaned_row = self._clean_row(row, in_place)
+            
+            if self._is_duplicate(cleaned_row, seen, key):
+                continue
+            
+            yield self._fingerprint_row(self._summarise_row(self._tag_row(cleaned_row)))
     
-    def normalize_all(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def normalize_all(self, rows: List[Dict[str, Any]], key: str = 'linkedin_url',
+                      near_duplicates: bool = True, in_place: bool = False) -> List[Dict[str, Any]]:
         """
         Aplica todo o pipeline de normalização
         
         Args:
             rows: Lista de dicionários com dados brutos
+            key: Chave para identificar duplicados
+            near_duplicates: Se aplica a etapa de quase duplicados (quando ativa no normalizador)
+            in_place: Se deve normalizar as próprias linhas de entrada em vez de cópias
             
         Returns:
             Lista completamente normalizada
         """
-        # Pipeline de normalização
-        cleaned = self.clean(rows)
-        deduped = self.dedupe(cleaned)
-        tagged = self.tag_skills(deduped)
-        summarised = self.summarise(tagged)
+        normalized = list(self.normalize_stream(rows, key, in_place))
+        return self.merge_near_duplicates(normalized) if near_duplicates else normalized
+    
+    def normalize_parallel(self, rows: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                           key: str = 'linkedin_url') -> List[Dict[str, Any]]:
+        """
+        Igual a normalize_all, repartindo o trabalho por vários processos
         
-        return summarised
+        Args:
+            rows: Iterável de dicionários com dados brutos
+            workers: Número de processos (None = todos os cores)
+            key: Chave para identificar duplicados
+            
+        Returns:
+            Lista completamente normalizada
+        """
+        return normalize_in_parallel(self, rows, workers, key)
+    
+    def normalize_incremental(self, rows: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                              key: str = 'linkedin_url') -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Normaliza só as linhas novas ou alteradas (ver normalize_incremental)
+        
+        Args:
+            rows: Iterável de dicionários (ex: lidos da sheet)
+            workers: Número de processos para as linhas alteradas (None = todos os cores)
+            key: Chave para identificar duplicados
+            
+        Returns:
+            (lista normalizada, posições na lista das linhas novas ou alteradas)
+        """
+        return normalize_incremental(self, rows, workers, key)
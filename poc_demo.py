@@ -29,6 +29,13 @@ from google.oauth2.service_account import Credentials
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from lexical_index import FieldedTfidfIndex
+from field_schema import FIELD_ALIASES, FieldSchema
+from sheet_metadata import SpreadsheetMetadataCache
+from sheet_reader import iter_row_pages
+from sheets_executor import shared_executor
+from sheet_sync import sync_values
+from profile_keys import canonical_profile_key, profile_url
 
 # Setup Google credentials (works both locally and on Streamlit Cloud)
 def get_google_credentials():
@@ -142,6 +149,9 @@ if 'last_enriched_urls_hash' not in st.session_state:
     st.session_state.last_enriched_urls_hash = None
 if 'last_result_json_url' not in st.session_state:
     st.session_state.last_result_json_url = None
+if 'sheet_metadata' not in st.session_state:
+    # Worksheet titles -> sheetId/grid sizes, shared by every rerun of this session
+    st.session_state.sheet_metadata = SpreadsheetMetadataCache(SHEET_ID)
 
 # Title and description
 st.title("HR Recruitment Agent - PoC")
@@ -150,6 +160,10 @@ st.markdown("Upload contacts, enrich data, and search candidates using natural l
 # Warning banner
 st.warning("⚠️ **PROOF OF CONCEPT**: This is a demo to showcase the functionality. In production, data sources will be official and consented.")
 
+def get_sheet_metadata():
+    """Return this session's spreadsheet metadata cache"""
+    return st.session_state.sheet_metadata
+
 # Helper function to ensure data is always a list
 def ensure_list(data):
     """Ensure data is always a list, never a dict or other type"""
@@ -168,8 +182,9 @@ def create_urls_hash(urls_list):
     if not urls_list:
         return None
     
-    # Sort URLs to ensure consistent hashing even if order changes
-    sorted_urls = sorted([url.strip().lower() for url in urls_list if url])
+    # Canonical profile keys, so URL variants of the same profile hash the same,
+    # sorted to ensure consistent hashing even if order changes
+    sorted_urls = sorted({canonical_profile_key(url) for url in urls_list if url} - {None})
     
     # Create hash
     urls_string = "|".join(sorted_urls)
@@ -189,6 +204,69 @@ def check_cached_enrichment(current_urls_hash):
     
     return None, False
 
+# Relative weight of a term match in each canonical field searched by keywords
+KEYWORD_FIELD_WEIGHTS = {
+    'education': 2.0,
+    'headline': 2.0,
+    'skills': 2.0,
+    'job_title': 1.5,
+    'company': 1.0,
+    'description': 1.0,
+    'location': 0.5
+}
+
+# Columns of each keyword field come from the shared alias table (all export formats)
+KEYWORD_FIELD_MAPPINGS = {field: FIELD_ALIASES[field] for field in KEYWORD_FIELD_WEIGHTS}
+
+def get_keyword_index(candidates):
+    """Return the keyword index for this candidate list, building it once per data load"""
+    cached = st.session_state.get('keyword_index')
+    
+    # Keep a reference to the indexed list so identity checks stay valid
+    if cached and cached[0] is candidates and cached[1] == len(candidates):
+        return cached[2]
+    
+    # Same resolved schema as the prompt summaries and the sheet writer
+    keyword_index = FieldedTfidfIndex(KEYWORD_FIELD_MAPPINGS, KEYWORD_FIELD_WEIGHTS).build(
+        candidates, get_field_schema(candidates)
+    )
+    st.session_state.keyword_index = (candidates, len(candidates), keyword_index)
+    return keyword_index
+
+def get_field_schema(candidates):
+    """Return the canonical field -> column mapping for this candidate list, resolved once per data load"""
+    cached = st.session_state.get('field_schema')
+    
+    if cached and cached[0] is candidates and cached[1] == len(candidates):
+        return cached[2]
+    
+    schema = FieldSchema.from_rows(candidates)
+    st.session_state.field_schema = (candidates, len(candidates), schema)
+    return schema
+
+# Retrieval stage in front of the LLM: shortlist size and prompt budget
+AI_SHORTLIST_SIZE = 20
+AI_PROMPT_TOKEN_BUDGET = 6000
+
+def estimate_tokens(text):
+    """Rough token count for prompt budgeting (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+def shortlist_candidates(query, candidates, limit=AI_SHORTLIST_SIZE):
+    """Rank the whole candidate pool for the query and keep the top candidates for the LLM"""
+    ranked = [candidates[position] for position, _ in get_keyword_index(candidates).search(query, limit)]
+    
+    # Generic questions may match few terms; fill the shortlist in original order
+    if len(ranked) < limit:
+        selected = {id(candidate) for candidate in ranked}
+        for candidate in candidates:
+            if len(ranked) >= limit:
+                break
+            if id(candidate) not in selected:
+                ranked.append(candidate)
+    
+    return ranked
+
 # AI-Powered Search Function
 def ai_search_candidates(query, candidates):
     """Use OpenAI to intelligently search and analyze candidates"""
@@ -196,19 +274,31 @@ def ai_search_candidates(query, candidates):
         return None, None
     
     try:
-        # Prepare candidate summaries for AI
+        # Rank the full pool first so relevant candidates beyond row 20 can reach the LLM
+        shortlist = shortlist_candidates(query, candidates)
+        
+        # Prepare candidate summaries for AI, within the prompt token budget
+        schema = get_field_schema(candidates)
         candidate_summaries = []
-        for i, candidate in enumerate(candidates[:20]):  # Limit to 20 for token efficiency
+        used_tokens = 0
+        for i, candidate in enumerate(shortlist):
             summary = f"Candidate {i+1}:\n"
-            summary += f"  Name: {candidate.get('firstName', '')} {candidate.get('lastName', '')}\n"
-            summary += f"  Headline: {candidate.get('linkedinHeadline', candidate.get('headline', 'N/A'))}\n"
-            summary += f"  Company: {candidate.get('companyName', candidate.get('Company Name', 'N/A'))}\n"
-            summary += f"  Skills: {candidate.get('linkedinSkillsLabel', candidate.get('Linkedin Skills Label', 'N/A'))}\n"
-            summary += f"  Description: {candidate.get('linkedinDescription', candidate.get('Linkedin Description', 'N/A'))[:200]}...\n"
-            summary += f"  Education: {candidate.get('linkedinSchoolDegree', candidate.get('Linkedin School Degree', 'N/A'))}\n"
+            summary += f"  Name: {schema.get(candidate, 'first_name', '')} {schema.get(candidate, 'last_name', '')}\n"
+            summary += f"  Headline: {schema.get(candidate, 'headline', 'N/A')}\n"
+            summary += f"  Company: {schema.get(candidate, 'company', 'N/A')}\n"
+            summary += f"  Skills: {schema.get(candidate, 'skills', 'N/A')}\n"
+            summary += f"  Description: {str(schema.get(candidate, 'description', 'N/A'))[:200]}...\n"
+            summary += f"  Education: {schema.get(candidate, 'education', 'N/A')}\n"
             summary += "\n"
+            
+            summary_tokens = estimate_tokens(summary)
+            if candidate_summaries and used_tokens + summary_tokens > AI_PROMPT_TOKEN_BUDGET:
+                break
+            used_tokens += summary_tokens
             candidate_summaries.append((i, summary))
         
+        shortlist = shortlist[:len(candidate_summaries)]
+        
         # Create the prompt for OpenAI
         candidates_text = "\n".join([s[1] for s in candidate_summaries])
         
@@ -255,10 +345,10 @@ EXPLANATION: [your explanation in Spanish]
             # Extract candidate numbers
             import re
             numbers = re.findall(r'\d+', matches_part)
-            matches = [int(n) - 1 for n in numbers if 0 < int(n) <= len(candidates)]  # Convert to 0-indexed
+            matches = [int(n) - 1 for n in numbers if 0 < int(n) <= len(shortlist)]  # Convert to 0-indexed
         
-        # Get the matching candidates
-        matched_candidates = [candidates[i] for i in matches if i < len(candidates)]
+        # Get the matching candidates (numbers refer to positions in the shortlist)
+        matched_candidates = [shortlist[i] for i in matches]
         
         return matched_candidates, explanation
         
@@ -269,42 +359,28 @@ EXPLANATION: [your explanation in Spanish]
         # Return error details for debugging
         return None, f"Error: {str(e)}"
 
+# Rows fetched per request when loading the sheet
+SHEET_PAGE_SIZE = 5000
+
 # Functions to interact with Google Sheets
 def get_sheet_data():
     """Get data from Google Sheet"""
     try:
         # Setup credentials (works both locally and on Streamlit Cloud)
         credentials = get_google_credentials()
-        service = build('sheets', 'v4', credentials=credentials)
+        service = shared_executor().wrap(build('sheets', 'v4', credentials=credentials))
         
-        # Get data from sheet
-        sheet_range = "candidatos!A1:Z"
-        result = service.spreadsheets().values().get(
-            spreadsheetId=SHEET_ID,
-            range=sheet_range
-        ).execute()
-        
-        values = result.get('values', [])
+        # Stream the sheet in pages (all columns, rows built without padding loops)
+        properties = get_sheet_metadata().get(service, "candidatos")
+        row_count = properties['rowCount'] if properties else None
+        candidates = []
+        for page in iter_row_pages(service, SHEET_ID, "candidatos", page_size=SHEET_PAGE_SIZE, row_count=row_count):
+            candidates.extend(page)
         
-        if not values:
+        if not candidates:
             st.warning("No data found in sheet")
             return []
             
-        # Convert to list of dicts
-        headers = values[0]
-        candidates = []
-        
-        for row in values[1:]:
-            # Ensure row is same length as headers
-            while len(row) < len(headers):
-                row.append("")
-                
-            candidate = {}
-            for i, header in enumerate(headers):
-                candidate[header] = row[i]
-                
-            candidates.append(candidate)
-            
         st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         st.session_state.data_loaded = True
         return candidates
@@ -319,34 +395,13 @@ def clear_sheet():
     try:
         # Setup credentials (works both locally and on Streamlit Cloud)
         credentials = get_google_credentials()
-        service = build('sheets', 'v4', credentials=credentials)
+        service = shared_executor().wrap(build('sheets', 'v4', credentials=credentials))
         
-        # First check if the worksheet exists
+        # First check if the worksheet exists (cached metadata, no round trip in steady state)
         try:
-            # Get sheet metadata
-            sheet_metadata = service.spreadsheets().get(spreadsheetId=SHEET_ID).execute()
-            sheets = sheet_metadata.get('sheets', '')
+            _, created = get_sheet_metadata().ensure_worksheet(service, "candidatos")
             
-            # Check if "candidatos" worksheet exists
-            worksheet_exists = False
-            for sheet in sheets:
-                if sheet.get("properties", {}).get("title") == "candidatos":
-                    worksheet_exists = True
-                    break
-            
-            if not worksheet_exists:
-                # Create the worksheet if it doesn't exist
-                requests = [{
-                    'addSheet': {
-                        'properties': {
-                            'title': 'candidatos'
-                        }
-                    }
-                }]
-                service.spreadsheets().batchUpdate(
-                    spreadsheetId=SHEET_ID,
-                    body={'requests': requests}
-                ).execute()
+            if created:
                 st.info("Created 'candidatos' worksheet as it didn't exist")
                 return True  # No need to clear a newly created sheet
         
@@ -393,7 +448,8 @@ def validate_and_fix_linkedin_urls(data):
     fixed_data = []
     
     for row in data:
-        fixed_row = row.copy()
+        # Rows are shared, not copied; only rows whose URL changes get a copy
+        fixed_row = row
         
         # Check for LinkedIn URL in various possible column names
         profile_url = None
@@ -424,14 +480,16 @@ def validate_and_fix_linkedin_urls(data):
                 import re
                 url_name = re.sub(r'[^a-z0-9-]', '', url_name)
                 # Construct URL
+                fixed_row = dict(row)
                 fixed_row['Profile Url'] = f"https://www.linkedin.com/in/{url_name}/"
                 print(f"Fixed LinkedIn URL: {fixed_row['Profile Url']} (from {profile_url})")
             else:
                 # If we can't construct a URL, skip this row
                 print(f"Skipping row with invalid LinkedIn URL: {profile_url}")
                 continue
-        else:
+        elif row.get('Profile Url') != profile_url:
             # Make sure the URL is stored in the correct field for PhantomBuster
+            fixed_row = dict(row)
             fixed_row['Profile Url'] = profile_url
         
         fixed_data.append(fixed_row)
@@ -451,54 +509,18 @@ def write_to_sheet(data):
     try:
         # Setup credentials (works both locally and on Streamlit Cloud)
         credentials = get_google_credentials()
-        service = build('sheets', 'v4', credentials=credentials)
+        service = shared_executor().wrap(build('sheets', 'v4', credentials=credentials))
         
-        # First check if the worksheet exists
+        # First check if the worksheet exists (cached metadata, no round trip in steady state)
         try:
-            # Get sheet metadata
-            sheet_metadata = service.spreadsheets().get(spreadsheetId=SHEET_ID).execute()
-            sheets = sheet_metadata.get('sheets', '')
-            
-            # Check if "candidatos" worksheet exists
-            worksheet_exists = False
-            for sheet in sheets:
-                if sheet.get("properties", {}).get("title") == "candidatos":
-                    worksheet_exists = True
-                    break
+            _, created = get_sheet_metadata().ensure_worksheet(service, "candidatos")
             
-            if not worksheet_exists:
-                # Create the worksheet if it doesn't exist
-                requests = [{
-                    'addSheet': {
-                        'properties': {
-                            'title': 'candidatos'
-                        }
-                    }
-                }]
-                service.spreadsheets().batchUpdate(
-                    spreadsheetId=SHEET_ID,
-                    body={'requests': requests}
-                ).execute()
+            if created:
                 st.info("Created 'candidatos' worksheet as it didn't exist")
         except Exception as e:
             st.warning(f"Error checking/creating worksheet: {e}")
             # Continue anyway
         
-        # Clear the sheet
-        try:
-            clear_range = "candidatos!A1:ZZ1000"  # Broader range
-            result = service.spreadsheets().values().clear(
-                spreadsheetId=SHEET_ID,
-                range=clear_range,
-                body={}
-            ).execute()
-            
-            cleared_range = result.get('clearedRange', '')
-            st.info(f"Successfully cleared data from {cleared_range}")
-        except Exception as e:
-            st.warning(f"Error clearing sheet: {e}")
-            # Continue anyway
-        
         # Define the MINIMAL column set needed for PhantomBuster
         # Using just what we need for the LinkedIn Profile Scraper
         minimal_columns = ["Profile Url", "First Name", "Last Name"]
@@ -509,75 +531,30 @@ def write_to_sheet(data):
         # Debug log - print what we're about to write to the sheet
         print(f"Data to write to sheet: {data}")
         
+        # Resolve which physical columns hold each field once for the whole batch
+        schema = FieldSchema.from_rows(data)
+        
         for row in data:
-            # Create a row with the correct column mapping
-            mapped_row = []
+            # Map each row onto the minimal column set
+            url = schema.get(row, 'profile_url')
+            if not url:
+                # If we don't have a URL, skip this row
+                print(f"No valid LinkedIn URL found in row: {row}")
+                continue
             
-            # For each expected column, try to find the corresponding value in our data
-            for column in minimal_columns:
-                # Special handling for LinkedIn URL mapping
-                if column == "Profile Url":
-                    # Try multiple possible field names for LinkedIn URL
-                    if "Profile Url" in row and row["Profile Url"]:
-                        mapped_row.append(row.get("Profile Url", ""))
-                    elif "profileUrl" in row and row["profileUrl"]:
-                        mapped_row.append(row.get("profileUrl", ""))
-                    elif "linkedin_url" in row and row["linkedin_url"]:
-                        mapped_row.append(row.get("linkedin_url", ""))
-                    elif "url" in row and row["url"]:
-                        mapped_row.append(row.get("url", ""))
-                    else:
-                        # If we still don't have a URL, skip this row
-                        print(f"No valid LinkedIn URL found in row: {row}")
-                        continue
-                
-                # Special handling for name mapping
-                elif column == "First Name":
-                    if "First Name" in row and row["First Name"]:
-                        mapped_row.append(row.get("First Name", ""))
-                    elif "firstName" in row and row["firstName"]:
-                        mapped_row.append(row.get("firstName", ""))
-                    elif "fullName" in row and row["fullName"] and " " in row["fullName"]:
-                        # Split name into first and last
-                        name_parts = row["fullName"].split(" ", 1)
-                        mapped_row.append(name_parts[0])
-                    elif "name" in row and row["name"] and " " in row["name"]:
-                        # Split name into first and last
-                        name_parts = row["name"].split(" ", 1)
-                        mapped_row.append(name_parts[0])
-                    else:
-                        mapped_row.append("Unknown")
-                
-                # Special handling for last name
-                elif column == "Last Name":
-                    if "Last Name" in row and row["Last Name"]:
-                        mapped_row.append(row.get("Last Name", ""))
-                    elif "lastName" in row and row["lastName"]:
-                        mapped_row.append(row.get("lastName", ""))
-                    elif "fullName" in row and row["fullName"] and " " in row["fullName"]:
-                        # Split name into first and last
-                        name_parts = row["fullName"].split(" ", 1)
-                        if len(name_parts) > 1:
-                            mapped_row.append(name_parts[1])
-                        else:
-                            mapped_row.append("")
-                    elif "name" in row and row["name"] and " " in row["name"]:
-                        # Split name into first and last
-                        name_parts = row["name"].split(" ", 1)
-                        if len(name_parts) > 1:
-                            mapped_row.append(name_parts[1])
-                        else:
-                            mapped_row.append("")
-                    else:
-                        mapped_row.append("User")
-                
-                # Try to get the value directly if it exists
-                else:
-                    mapped_row.append(row.get(column, ""))
+            first_name = schema.get(row, 'first_name')
+            last_name = schema.get(row, 'last_name')
+            
+            if not (first_name and last_name):
+                # Split the full name into first and last
+                full_name = schema.get(row, 'full_name')
+                name_parts = full_name.split(" ", 1) if isinstance(full_name, str) and " " in full_name else None
+                if not first_name:
+                    first_name = name_parts[0] if name_parts else "Unknown"
+                if not last_name:
+                    last_name = name_parts[1] if name_parts else "User"
             
-            # Only add the row if we have all the required columns
-            if len(mapped_row) == len(minimal_columns):
-                values.append(mapped_row)
+            values.append([str(url), str(first_name), str(last_name)])
             
         # Debug log to show the data being written
         print(f"Values to write: {values}")
@@ -591,27 +568,15 @@ def write_to_sheet(data):
                 "User"
             ])
         
-        # Write headers and data
-        body = {'values': values}
-        result = service.spreadsheets().values().update(
-            spreadsheetId=SHEET_ID,
-            range="candidatos!A1",
-            valueInputOption='RAW',
-            body=body
-        ).execute()
+        # Write only the cells that differ from the current sheet, without clearing it first
+        # (leftover rows and columns from the previous data are blanked in the same request)
+        written_ranges = sync_values(service, SHEET_ID, "candidatos", values)
         
         # Debug info
-        print(f"Updated range: {result.get('updatedRange')}")
-        print(f"Updated rows: {result.get('updatedRows')}")
-        print(f"Updated cells: {result.get('updatedCells')}")
+        print(f"Updated ranges: {written_ranges}")
         
         # Calculate and store the hash of the LinkedIn URLs we just wrote
-        linkedin_urls = []
-        for row in data:
-            if 'Profile Url' in row and row['Profile Url']:
-                linkedin_urls.append(row['Profile Url'])
-            elif 'profileUrl' in row and row['profileUrl']:
-                linkedin_urls.append(row['profileUrl'])
+        linkedin_urls = [url for url in (profile_url(row) for row in data) if url]
         
         if linkedin_urls:
             urls_hash = create_urls_hash(linkedin_urls)
@@ -705,8 +670,9 @@ def launch_enricher_job(urls=None, query=None, limit=5):
         linkedin_urls_in_sheet = []
         if sheet_data:
             for row in sheet_data:
-                if 'Profile Url' in row and row['Profile Url'] and 'linkedin.com/in/' in row['Profile Url'].lower():
-                    linkedin_urls_in_sheet.append(row['Profile Url'])
+                url = profile_url(row)
+                if url and 'linkedin.com/in/' in url.lower():
+                    linkedin_urls_in_sheet.append(url)
         
         if len(linkedin_urls_in_sheet) == 0:
             st.error("❌ No valid LinkedIn URLs found in the spreadsheet. Please add valid LinkedIn URLs first.")
@@ -1089,7 +1055,7 @@ def get_enricher_results():
                                     # Store the hash of URLs that were just enriched for future caching
                                     sheet_data = get_sheet_data()
                                     if sheet_data:
-                                        enriched_urls = [row.get('Profile Url') for row in sheet_data if row.get('Profile Url')]
+                                        enriched_urls = [url for url in (profile_url(row) for row in sheet_data) if url]
                                         if enriched_urls:
                                             st.session_state.last_enriched_urls_hash = create_urls_hash(enriched_urls)
                                             print(f"✓ Stored hash for {len(enriched_urls)} enriched URLs for future caching")
@@ -2111,62 +2077,12 @@ with tab2:
                 if USE_AI_SEARCH:
                     st.info("Falling back to keyword search...")
                 
-                search_term_lower = search_term.lower()
-                
-                # Define field mappings for both old and new formats
-                field_mappings = {
-                    'education': ['education', 'Linkedin School Degree', 'Linkedin School Name'],
-                    'headline': ['headline', 'Linkedin Headline'],
-                    'skills': ['skills_tags', 'Linkedin Skills Label'],
-                    'company': ['current_company', 'company', 'Company Name', 'Linkedin Company Name'],
-                    'location': ['Location', 'Linkedin Job Location'],
-                    'description': ['summary', 'Linkedin Description', 'Linkedin Job Description'],
-                    'job_title': ['jobTitle', 'Linkedin Job Title']
-                }
-                
-                # Simple filtering logic based on the search term
-                for candidate in candidates:
-                    score = 0
-                    
-                    # Check all mapped fields for matches
-                    for field_category, field_names in field_mappings.items():
-                        for field in field_names:
-                            if field in candidate and candidate[field]:
-                                field_value = str(candidate[field]).lower()
-                                
-                                # Direct match with search term
-                                if search_term_lower in field_value:
-                                    score += 2
-                                
-                                # Check for specific terms
-                                if "magíster" in search_term_lower and "magíster" in field_value:
-                                    score += 3
-                                if "finanzas" in search_term_lower and "finanzas" in field_value:
-                                    score += 2
-                                if "marketing" in search_term_lower and "marketing" in field_value:
-                                    score += 2
-                                if "digital" in search_term_lower and "digital" in field_value:
-                                    score += 1
-                                if "minería" in search_term_lower and "minería" in field_value:
-                                    score += 2
-                                if "análisis" in search_term_lower and "análisis" in field_value:
-                                    score += 2
-                                if "riesgo" in search_term_lower and "riesgo" in field_value:
-                                    score += 1
-                                if "python" in search_term_lower and "python" in field_value:
-                                    score += 2
-                                if "data science" in search_term_lower and "data" in field_value:
-                                    score += 2
-                                if "startups" in search_term_lower and "startup" in field_value:
-                                    score += 2
-                                if "php" in search_term_lower and "php" in field_value:
-                                    score += 2
-                                if "drupal" in search_term_lower and "drupal" in field_value:
-                                    score += 2
-                    
-                    if score > 0:
-                        candidate['match_score'] = score
-                        filtered_candidates.append(candidate)
+                # Ranked lookup on the inverted index built for this data load
+                keyword_index = get_keyword_index(candidates)
+                for position, score in keyword_index.search(search_term):
+                    candidate = candidates[position]
+                    candidate['match_score'] = score
+                    filtered_candidates.append(candidate)
             
             # Sort by match score
             filtered_candidates.sort(key=lambda x: x.get('match_score', 0), reverse=True)
@@ -2338,14 +2254,14 @@ with tab3:
         # Create tabs for each category
         data_tabs = st.tabs(list(column_categories.keys()))
         
+        # Resolve the columns of each category that exist in the dataframe once
+        category_columns = FieldSchema(df.columns).resolve(column_categories)
+        
         # Display data in each tab
-        for i, (category, columns) in enumerate(column_categories.items()):
+        for i, (category, existing_columns) in enumerate(category_columns.items()):
             with data_tabs[i]:
-                # Filter columns that exist in the dataframe
-                existing_columns = [col for col in columns if col in df.columns]
-                
                 if existing_columns:
-                    st.dataframe(df[existing_columns], width='stretch')
+                    st.dataframe(df[list(existing_columns)], width='stretch')
                 else:
                     st.info(f"No {category.lower()} data available.")
         
@@ -0,0 +1,144 @@
+"""
+Chaves canónicas de perfis do LinkedIn para deduplicação e lookups
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+from urllib.parse import unquote, urlsplit
+
+# Colunas onde as várias fontes (app, PhantomBuster, uploads) guardam o URL do perfil
+PROFILE_URL_FIELDS = ('linkedin_url', 'Profile Url', 'profileUrl', 'profile_url', 'linkedinProfileUrl', 'url')
+
+# Colunas genéricas: só contam como URL do perfil se o valor for um perfil do LinkedIn
+# (uma coluna "url" pode ter o site da empresa ou o link de uma publicação)
+GENERIC_URL_FIELDS = frozenset({'url'})
+
+LINKEDIN_PROFILE_PREFIX = "linkedin.com/in/"
+
+DUPLICATE_SLASHES = re.compile(r'/{2,}')
+
+
+def canonical_profile_key(url: Any) -> Optional[str]:
+    """
+    Converte um URL de perfil numa chave canónica
+
+    Ignora esquema, subdomínio (www, cl, ...), query string, fragmento, barras
+    finais, maiúsculas e percent-encoding, por isso
+    "https://cl.linkedin.com/in/Foo/?trk=x" e "http://linkedin.com/in/foo"
+    dão ambos "linkedin.com/in/foo".
+
+    Args:
+        url: URL do perfil (valores que não são texto são convertidos)
+
+    Returns:
+        Chave canónica, ou None se o valor estiver vazio
+    """
+    if url is None:
+        return None
+
+    text = unicodedata.normalize('NFC', unquote(str(url)).strip().lower())
+    if not text:
+        return None
+
+    if '://' not in text:
+        text = f"https://{text}"
+
+    try:
+        parts = urlsplit(text)
+        host = parts.hostname or ''
+    except ValueError:
+        return text
+
+    path = DUPLICATE_SLASHES.sub('/', parts.path).rstrip('/')
+
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        segments = path.strip('/').split('/')
+        if len(segments) >= 2 and segments[0] == 'in':
+            # /in/<slug>[/en | /details/...] -> só o slug identifica o perfil
+            return f"linkedin.com/in/{segments[1]}"
+        return f"linkedin.com{path}"
+
+    if host.startswith('www.'):
+        host = host[4:]
+
+    return f"{host}{path}"
+
+
+def is_linkedin_profile_url(url: Any) -> bool:
+    """Verifica se o valor é o URL de um perfil do LinkedIn (linkedin.com/in/<slug>)"""
+    key = canonical_profile_key(url)
+    return bool(key) and key.startswith(LINKEDIN_PROFILE_PREFIX) and len(key) > len(LINKEDIN_PROFILE_PREFIX)
+
+
+def profile_url(row: Mapping[str, Any], fields: Sequence[str] = PROFILE_URL_FIELDS) -> Optional[str]:
+    """
+    Obtém o URL do perfil da primeira coluna preenchida
+
+    Colunas genéricas (GENERIC_URL_FIELDS) são ignoradas se o valor não for
+    o URL de um perfil do LinkedIn.
+    """
+    for field in fields:
+        value = row.get(field)
+        if isinstance(value, str) and value.strip():
+            if field in GENERIC_URL_FIELDS and not is_linkedin_profile_url(value):
+                continue
+            return value
+    return None
+
+
+def profile_key(row: Mapping[str, Any], fields: Sequence[str] = PROFILE_URL_FIELDS) -> Optional[str]:
+    """Chave canónica do perfil de uma linha (None se não tiver URL)"""
+    return canonical_profile_key(profile_url(row, fields))
+
+
+class ProfileKeyIndex:
+    """Índice em memória: chave canónica do perfil -> posições das linhas"""
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]] = (), fields: Sequence[str] = PROFILE_URL_FIELDS):
+        """
+        Args:
+            rows: Linhas a indexar (a posição é a ordem na sequência)
+            fields: Colunas onde procurar o URL
+        """
+        self.fields = fields
+        self._positions: Dict[str, List[int]] = {}
+
+        for position, row in enumerate(rows):
+            self.add(row, position)
+
+    def add(self, row: Mapping[str, Any], position: int) -> Optional[str]:
+        """
+        Indexa uma linha
+
+        Args:
+            row: Dados da linha
+            position: Posição da linha
+
+        Returns:
+            Chave canónica da linha, ou None se não tiver URL
+        """
+        key = profile_key(row, self.fields)
+        if key:
+            self._positions.setdefault(key, []).append(position)
+        return key
+
+    def positions(self, url: str) -> List[int]:
+        """Posições de todas as linhas do perfil, pela ordem de inserção"""
+        key = canonical_profile_key(url)
+        return list(self._positions.get(key, ())) if key else []
+
+    def first(self, url: str) -> Optional[int]:
+        """Posição da primeira linha do perfil"""
+        positions = self.positions(url)
+        return positions[0] if positions else None
+
+    def duplicates(self) -> Dict[str, List[int]]:
+        """Perfis com mais de uma linha"""
+        return {key: list(positions) for key, positions in self._positions.items() if len(positions) > 1}
+
+    def __contains__(self, url: str) -> bool:
+        key = canonical_profile_key(url)
+        return bool(key) and key in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
@@ -0,0 +1,146 @@
+"""
+Cache dos metadados de uma spreadsheet (worksheets, sheetId, dimensões da grelha)
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pedidos de batchUpdate que criam, removem ou renomeiam worksheets
+STRUCTURE_REQUESTS = frozenset({'addSheet', 'deleteSheet', 'duplicateSheet', 'updateSheetProperties'})
+
+# Só as propriedades usadas pelo cliente (a resposta completa inclui formatação, proteções, ...)
+METADATA_FIELDS = 'sheets.properties(sheetId,title,index,gridProperties(rowCount,columnCount))'
+
+DEFAULT_METADATA_TTL = 300.0
+
+
+def _worksheet_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    grid = properties.get('gridProperties', {})
+    return {
+        'sheetId': properties.get('sheetId'),
+        'index': properties.get('index'),
+        'rowCount': grid.get('rowCount'),
+        'columnCount': grid.get('columnCount'),
+    }
+
+
+class SpreadsheetMetadataCache:
+    """
+    Título da worksheet -> propriedades, com TTL
+
+    O serviço da API é passado em cada chamada para o cache poder ser partilhado
+    por clientes que criam o serviço de novo (ex: cada execução do Streamlit).
+    As dimensões da grelha são as da última leitura; mudanças de estrutura feitas
+    por batch_update invalidam o cache, alterações externas esperam pelo TTL.
+    """
+
+    def __init__(self, spreadsheet_id: str, ttl: float = DEFAULT_METADATA_TTL):
+        """
+        Args:
+            spreadsheet_id: ID da spreadsheet
+            ttl: Segundos até os metadados voltarem a ser pedidos (0 = sem cache)
+        """
+        self.spreadsheet_id = spreadsheet_id
+        self.ttl = ttl
+        self.fetches = 0
+        self._worksheets: Optional[Dict[str, Dict[str, Any]]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._worksheets is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def worksheets(self, service, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Propriedades de todas as worksheets
+
+        Args:
+            service: Serviço Google Sheets (googleapiclient)
+            refresh: Se deve ignorar o cache
+
+        Returns:
+            Título -> {'sheetId', 'index', 'rowCount', 'columnCount'}
+        """
+        with self._lock:
+            if refresh or not self._is_fresh():
+                spreadsheet = service.spreadsheets().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    fields=METADATA_FIELDS
+                ).execute()
+                self.fetches += 1
+
+                self._worksheets = {
+                    sheet.get('properties', {}).get('title'): _worksheet_properties(sheet.get('properties', {}))
+                    for sheet in spreadsheet.get('sheets', [])
+                }
+                self._fetched_at = time.monotonic()
+
+            return self._worksheets
+
+    def get(self, service, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Propriedades de uma worksheet
+
+        Um título em falta força uma nova leitura (pode ter sido criado noutro lado).
+
+        Args:
+            service: Serviço Google Sheets
+            title: Nome da worksheet
+
+        Returns:
+            Propriedades, ou None se a worksheet não existir
+        """
+        fetches = self.fetches
+        properties = self.worksheets(service).get(title)
+        if properties is None and self.fetches == fetches:
+            properties = self.worksheets(service, refresh=True).get(title)
+        return properties
+
+    def sheet_id(self, service, title: str) -> Optional[int]:
+        """ID interno da worksheet (None se não existir)"""
+        properties = self.get(service, title)
+        return properties['sheetId'] if properties else None
+
+    def ensure_worksheet(self, service, title: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Garante que a worksheet existe, criando-a se necessário
+
+        Args:
+            service: Serviço Google Sheets
+            title: Nome da worksheet
+
+        Returns:
+            (propriedades, True se foi criada agora)
+        """
+        properties = self.get(service, title)
+        if properties is not None:
+            return properties, False
+
+        response = self.batch_update(service, [{'addSheet': {'properties': {'title': title}}}])
+        return _worksheet_properties(response['replies'][0]['addSheet']['properties']), True
+
+    def batch_update(self, service, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        spreadsheets.batchUpdate que invalida o cache quando muda a estrutura
+
+        Args:
+            service: Serviço Google Sheets
+            requests: Pedidos do batchUpdate
+
+        Returns:
+            Resposta da API
+        """
+        try:
+            return service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'requests': requests}
+            ).execute()
+        finally:
+            if any(STRUCTURE_REQUESTS.intersection(request) for request in requests):
+                self.invalidate()
+
+    def invalidate(self):
+        """Descarta os metadados; a próxima consulta volta a pedi-los"""
+        with self._lock:
+            self._worksheets = None
+            self._fetched_at = 0.0
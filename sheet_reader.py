@@ -0,0 +1,110 @@
+"""
+Leitura de worksheets por páginas, só com as colunas pedidas
+"""
+from itertools import zip_longest
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sheet_sync import column_letter
+
+# Páginas vazias seguidas que terminam a leitura mesmo antes de row_count
+# (grelhas novas têm 1000 linhas, quase todas vazias)
+MAX_EMPTY_PAGES = 2
+
+
+def read_headers(service, spreadsheet_id: str, worksheet_name: str) -> List[str]:
+    """Linha de cabeçalho da worksheet (vazia se a worksheet não tiver dados)"""
+    rows = service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"{worksheet_name}!1:1"
+    ).execute().get('values', [])
+    return rows[0] if rows else []
+
+
+def _column_groups(positions: Sequence[int]) -> List[List[int]]:
+    """Posições de colunas agrupadas em sequências contíguas (um range por grupo)"""
+    groups: List[List[int]] = []
+    for position in sorted(set(positions)):
+        if groups and groups[-1][-1] == position - 1:
+            groups[-1].append(position)
+        else:
+            groups.append([position])
+    return groups
+
+
+def iter_row_pages(service, spreadsheet_id: str, worksheet_name: str,
+                   columns: Optional[Sequence[str]] = None, page_size: Optional[int] = None,
+                   row_count: Optional[int] = None,
+                   max_empty_pages: int = MAX_EMPTY_PAGES) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lê as linhas de dados (a partir da linha 2) em páginas de page_size linhas
+
+    Cada página é um values.batchGet com um range por grupo de colunas
+    contíguas, em majorDimension COLUMNS; as linhas são montadas com
+    zip_longest, que preenche com "" as células vazias no fim das colunas.
+
+    Args:
+        service: Serviço Google Sheets (googleapiclient)
+        spreadsheet_id: ID da spreadsheet
+        worksheet_name: Nome da worksheet
+        columns: Colunas a ler, pela ordem pretendida (None = todas; as inexistentes são ignoradas)
+        page_size: Linhas por página (None = tudo numa página)
+        row_count: Número de linhas da grelha; páginas vazias antes deste limite
+            não terminam a leitura (None = termina na primeira página vazia)
+        max_empty_pages: Páginas vazias seguidas que terminam a leitura antes de row_count
+
+    Returns:
+        Gerador de páginas (listas de dicionários coluna -> valor)
+    """
+    headers = read_headers(service, spreadsheet_id, worksheet_name)
+    if not headers:
+        return
+
+    if columns is None:
+        positions = list(range(len(headers)))
+    else:
+        available = {}
+        for position, header in enumerate(headers):
+            available.setdefault(header, position)
+        positions = [available[column] for column in columns if column in available]
+
+    names = [headers[position] for position in positions]
+    groups = _column_groups(positions)
+    if not groups:
+        return
+
+    start = 2
+    # Linhas vazias no fim de uma página só são emitidas se houver dados depois delas
+    pending_blank = 0
+    empty_pages = 0
+    while True:
+        end = start + page_size - 1 if page_size else ''
+        response = service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[f"{worksheet_name}!{column_letter(group[0])}{start}:{column_letter(group[-1])}{end}" for group in groups],
+            majorDimension='COLUMNS'
+        ).execute()
+
+        by_position: Dict[int, List[str]] = {}
+        for group, value_range in zip(groups, response.get('valueRanges', [])):
+            for offset, values in enumerate(value_range.get('values', [])):
+                by_position[group[0] + offset] = values
+
+        page = [
+            dict(zip(names, values))
+            for values in zip_longest(*(by_position.get(position, ()) for position in positions), fillvalue="")
+        ]
+        if page:
+            # Em COLUMNS as células vazias finais são cortadas: linhas em falta são vazias
+            trailing_blank = page_size - len(page) if page_size else 0
+            if pending_blank:
+                page[:0] = [dict.fromkeys(names, "") for _ in range(pending_blank)]
+            yield page
+            pending_blank = trailing_blank
+            empty_pages = 0
+        elif page_size:
+            pending_blank += page_size
+            empty_pages += 1
+
+        if not page_size or (not page and (row_count is None or end >= row_count or empty_pages >= max_empty_pages)):
+            return
+        start = end + 1
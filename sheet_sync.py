@@ -0,0 +1,110 @@
+"""
+Sincronização por diferenças: escreve numa worksheet só as células que mudam
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def column_letter(index: int) -> str:
+    """Letra da coluna em notação A1 (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def diff_ranges(worksheet_name: str, current: Sequence[Sequence[str]],
+                desired: Sequence[Sequence[str]]) -> List[Dict[str, Any]]:
+    """
+    Ranges a escrever para a worksheet passar de current a desired
+
+    A grelha desejada é a worksheet inteira: células que existem em current e
+    ficam fora de desired (linhas ou colunas a mais) são escritas vazias, em
+    vez de limpar a worksheet. Linhas alteradas consecutivas formam um só
+    range, limitado às colunas que mudam.
+
+    Args:
+        worksheet_name: Nome da worksheet
+        current: Valores atuais (linhas; as linhas podem vir sem as células vazias finais)
+        desired: Valores pretendidos, já convertidos em texto
+
+    Returns:
+        Entradas {'range', 'values'} para values.batchUpdate (vazio se nada mudar)
+    """
+    ranges: List[Dict[str, Any]] = []
+    block = None
+
+    for row_number in range(max(len(current), len(desired))):
+        current_row = current[row_number] if row_number < len(current) else ()
+        desired_row = desired[row_number] if row_number < len(desired) else ()
+        width = max(len(current_row), len(desired_row))
+
+        changed = [
+            column for column in range(width)
+            if (current_row[column] if column < len(current_row) else "")
+            != (desired_row[column] if column < len(desired_row) else "")
+        ]
+
+        if not changed:
+            block = None
+            continue
+
+        if block is None:
+            block = {'start': row_number, 'first': changed[0], 'last': changed[-1], 'rows': []}
+            ranges.append(block)
+        else:
+            block['first'] = min(block['first'], changed[0])
+            block['last'] = max(block['last'], changed[-1])
+        block['rows'].append(desired_row)
+
+    return [
+        {
+            'range': f"{worksheet_name}!{column_letter(block['first'])}{block['start'] + 1}",
+            'values': [
+                [row[column] if column < len(row) else "" for column in range(block['first'], block['last'] + 1)]
+                for row in block['rows']
+            ]
+        }
+        for block in ranges
+    ]
+
+
+def read_values(service, spreadsheet_id: str, worksheet_name: str) -> List[List[str]]:
+    """Todas as células preenchidas da worksheet, por linhas"""
+    return service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=worksheet_name
+    ).execute().get('values', [])
+
+
+def sync_values(service, spreadsheet_id: str, worksheet_name: str, desired: Sequence[Sequence[str]],
+                current: Optional[Sequence[Sequence[str]]] = None) -> int:
+    """
+    Lê a worksheet e aplica só as diferenças num único values.batchUpdate
+
+    A worksheet nunca fica vazia entre a leitura e a escrita: leitores
+    concorrentes veem a versão anterior ou a nova de cada range.
+
+    Args:
+        service: Serviço Google Sheets (googleapiclient)
+        spreadsheet_id: ID da spreadsheet
+        worksheet_name: Nome da worksheet
+        desired: Conteúdo pretendido (cabeçalho + linhas), em texto
+        current: Conteúdo atual, se o chamador já o leu (None = ler agora)
+
+    Returns:
+        Número de ranges escritos (0 se a worksheet já estava igual)
+    """
+    if current is None:
+        current = read_values(service, spreadsheet_id, worksheet_name)
+
+    data = diff_ranges(worksheet_name, current, desired)
+
+    if data:
+        service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'valueInputOption': 'RAW', 'data': data}
+        ).execute()
+
+    return len(data)
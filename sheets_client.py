@@ -2,23 +2,57 @@
 Cliente para integração com Google Sheets API
 """
 import json
-from typing import List, Dict, Any, Optional
+import time
+from itertools import chain, repeat
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple, Union
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from config import Config
+from profile_keys import PROFILE_URL_FIELDS, ProfileKeyIndex, profile_key
+from field_schema import FieldSchema
+from sheet_metadata import SpreadsheetMetadataCache
+from sheets_executor import INTERACTIVE, shared_executor
+from sheet_reader import iter_row_pages
+from sheet_sync import column_letter, read_values, sync_values
+
+
+def _row_blocks(rows_by_number: Dict[int, Dict[str, Any]], headers: List[str]) -> List[Dict[str, Any]]:
+    """Agrupa linhas consecutivas (número na sheet -> dados) em blocos {'start', 'end', 'values'}"""
+    blocks = []
+    
+    for row_number in sorted(rows_by_number):
+        values = [str(rows_by_number[row_number].get(header, "")) for header in headers]
+        
+        if blocks and blocks[-1]['end'] == row_number - 1:
+            blocks[-1]['values'].append(values)
+            blocks[-1]['end'] = row_number
+        else:
+            blocks.append({'start': row_number, 'end': row_number, 'values': [values]})
+    
+    return blocks
 
 class GoogleSheetsClient:
     """Cliente para interagir com Google Sheets API"""
     
-    def __init__(self):
+    def __init__(self, priority: int = INTERACTIVE):
+        """
+        Args:
+            priority: Prioridade dos pedidos deste cliente no executor partilhado
+                (INTERACTIVE, ou BACKGROUND para a auditoria)
+        """
         self.sheet_id = Config.GOOGLE_SHEETS_ID
         self.credentials_file = Config.GOOGLE_CREDENTIALS_FILE
         
         if not self.sheet_id or not self.credentials_file:
             raise ValueError("Google Sheets ID e credentials file são obrigatórios")
         
-        self.service = self._build_service()
+        # Todos os pedidos passam pelo executor partilhado (quotas, prioridade, retries)
+        self.executor = shared_executor()
+        self.service = self.executor.wrap(self._build_service(), priority)
+        self.metadata = SpreadsheetMetadataCache(self.sheet_id, Config.SHEETS_METADATA_TTL)
+        # Worksheet -> cabeçalho e URLs por linha (índice URL -> número da linha)
+        self._row_indexes: Dict[str, Dict[str, Any]] = {}
     
     def _build_service(self):
         """Constrói o serviço Google Sheets"""
@@ -31,26 +65,31 @@ class GoogleSheetsClient:
         except Exception as e:
             raise Exception(f"Erro ao construir serviço Google Sheets: {e}")
     
-    def read_rows(self, worksheet_name: str, range_name: str = None) -> List[Dict[str, Any]]:
+    def read_rows(self, worksheet_name: str, range_name: str = None, columns: Optional[Sequence[str]] = None,
+                  page_size: Optional[int] = None) -> Union[List[Dict[str, Any]], Iterator[List[Dict[str, Any]]]]:
         """
         Lê linhas de uma worksheet
         
         Args:
             worksheet_name: Nome da worksheet
-            range_name: Range específico (opcional)
+            range_name: Range específico (opcional; ignora columns e page_size)
+            columns: Colunas a ler (None = todas); só estas colunas são pedidas à API
+            page_size: Se indicado, devolve um gerador de páginas com este número de linhas
             
         Returns:
-            Lista de dicionários com os dados
+            Lista de dicionários com os dados, ou gerador de páginas (listas de dicionários)
         """
+        if page_size and not range_name:
+            return self._iter_pages(worksheet_name, columns, page_size)
+        
         try:
-            if range_name:
-                range_str = f"{worksheet_name}!{range_name}"
-            else:
-                range_str = f"{worksheet_name}!A:Z"
+            if not range_name:
+                return [row for page in iter_row_pages(self.service, self.sheet_id, worksheet_name, columns)
+                        for row in page]
             
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.sheet_id,
-                range=range_str
+                range=f"{worksheet_name}!{range_name}"
             ).execute()
             
             values = result.get('values', [])
@@ -58,22 +97,23 @@ class GoogleSheetsClient:
             if not values:
                 return []
             
-            # Primeira linha são os headers
+            # Primeira linha são os headers; células em falta no fim da linha ficam ""
             headers = values[0]
-            rows = []
-            
-            for row in values[1:]:
-                # Garantir que a linha tem o mesmo número de colunas que os headers
-                while len(row) < len(headers):
-                    row.append("")
-                
-                row_dict = dict(zip(headers, row))
-                rows.append(row_dict)
+            return [dict(zip(headers, chain(row, repeat("")))) for row in values[1:]]
             
-            return rows
+        except HttpError as e:
+            raise Exception(f"Erro ao ler dados da worksheet {worksheet_name}: {e}") from e
+    
+    def _iter_pages(self, worksheet_name: str, columns: Optional[Sequence[str]],
+                    page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Páginas de read_rows; o número de linhas da grelha vem do cache de metadados"""
+        try:
+            properties = self.metadata.get(self.service, worksheet_name)
+            row_count = properties['rowCount'] if properties else None
+            yield from iter_row_pages(self.service, self.sheet_id, worksheet_name, columns, page_size, row_count)
             
         except HttpError as e:
-            raise Exception(f"Erro ao ler dados da worksheet {worksheet_name}: {e}")
+            raise Exception(f"Erro ao ler dados da worksheet {worksheet_name}: {e}") from e
     
     def write_rows(self, worksheet_name: str, data: List[Dict[str, Any]], 
                    range_name: str = None, clear_first: bool = False) -> bool:
@@ -129,35 +169,267 @@ class GoogleSheetsClient:
                 body=body
             ).execute()
             
+            self._row_indexes.pop(worksheet_name, None)
+            
             return True
             
         except HttpError as e:
-            raise Exception(f"Erro ao escrever dados na worksheet {worksheet_name}: {e}")
+            self.metadata.invalidate()
+            self._row_indexes.pop(worksheet_name, None)
+            raise Exception(f"Erro ao escrever dados na worksheet {worksheet_name}: {e}") from e
     
-    def _ensure_worksheet_exists(self, worksheet_name: str):
-        """Garante que a worksheet existe, criando se necessário"""
+    def update_rows(self, worksheet_name: str, rows_by_number: Dict[int, Dict[str, Any]],
+                    headers: List[str]) -> bool:
+        """
+        Reescreve apenas as linhas indicadas, num único pedido values.batchUpdate
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            rows_by_number: Número da linha na sheet (o header é a linha 1) -> dados
+            headers: Ordem das colunas na worksheet
+            
+        Returns:
+            True se sucesso
+        """
         try:
-            # Verificar se a worksheet existe
-            spreadsheet = self.service.spreadsheets().get(
-                spreadsheetId=self.sheet_id
-            ).execute()
+            if not rows_by_number:
+                return True
             
-            existing_sheets = [sheet.get('properties', {}).get('title') for sheet in spreadsheet.get('sheets', [])]
+            # Agrupar linhas consecutivas num só range
+            self._write_blocks(worksheet_name, _row_blocks(rows_by_number, headers))
+            self._row_indexes.pop(worksheet_name, None)
+            
+            return True
+            
+        except HttpError as e:
+            raise Exception(f"Erro ao atualizar linhas da worksheet {worksheet_name}: {e}") from e
+    
+    def sync_rows(self, worksheet_name: str, data: List[Dict[str, Any]]) -> int:
+        """
+        Deixa a worksheet igual a data escrevendo só as células que mudam
+        
+        Alternativa a write_rows(clear_first=True): lê a worksheet, compara e envia
+        os ranges alterados num único values.batchUpdate, sem a limpar. A ordem das
+        colunas existentes mantém-se; colunas novas entram no fim, e linhas ou
+        colunas que deixam de existir ficam vazias.
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            data: Lista de dicionários com o conteúdo pretendido
+            
+        Returns:
+            Número de ranges escritos (0 se já estava igual)
+        """
+        try:
+            if not data:
+                return 0
+            
+            self._ensure_worksheet_exists(worksheet_name)
+            current = read_values(self.service, self.sheet_id, worksheet_name)
+            
+            # Colunas pretendidas, pela ordem atual da worksheet, e as novas no fim
+            columns = FieldSchema.from_rows(data, {}).columns
+            wanted = set(columns)
+            current_headers = current[0] if current else []
+            headers = [header for header in current_headers if header in wanted]
+            present = set(headers)
+            headers += [column for column in columns if column not in present]
+            
+            desired = [headers] + [[str(row.get(header, "")) for header in headers] for row in data]
+            written = sync_values(self.service, self.sheet_id, worksheet_name, desired, current)
+            
+            if written:
+                self._row_indexes.pop(worksheet_name, None)
+            
+            return written
+            
+        except HttpError as e:
+            self.metadata.invalidate()
+            self._row_indexes.pop(worksheet_name, None)
+            raise Exception(f"Erro ao sincronizar a worksheet {worksheet_name}: {e}") from e
+    
+    def _write_blocks(self, worksheet_name: str, blocks: List[Dict[str, Any]]):
+        """Escreve vários blocos de linhas num único pedido values.batchUpdate"""
+        self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.sheet_id,
+            body={
+                'valueInputOption': 'RAW',
+                'data': [
+                    {'range': f"{worksheet_name}!A{block['start']}", 'values': block['values']}
+                    for block in blocks
+                ]
+            }
+        ).execute()
+    
+    def _row_index(self, worksheet_name: str, key: str = 'linkedin_url', refresh: bool = False) -> Dict[str, Any]:
+        """
+        Cabeçalho e índice URL -> posição das linhas de uma worksheet
+        
+        Lê só a linha de cabeçalho e a coluna do URL, e fica em cache (até ao TTL
+        dos metadados ou à próxima escrita que mude as linhas).
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            key: Coluna preferida para o URL do perfil
+            refresh: Se deve ignorar o cache
             
-            if worksheet_name not in existing_sheets:
-                # Criar nova worksheet
-                self.service.spreadsheets().batchUpdate(
+        Returns:
+            {'headers', 'column', 'urls', 'index'}; a posição 0 é a linha 2 da sheet
+        """
+        cached = self._row_indexes.get(worksheet_name)
+        if cached and not refresh and cached['key'] == key and time.monotonic() - cached['loaded_at'] < Config.SHEETS_METADATA_TTL:
+            return cached
+        
+        values = self.service.spreadsheets().values()
+        header_rows = values.get(spreadsheetId=self.sheet_id, range=f"{worksheet_name}!1:1").execute().get('values', [])
+        headers = header_rows[0] if header_rows else []
+        
+        # Coluna do URL: a pedida ou uma das variantes conhecidas
+        candidates = (key,) + tuple(field for field in PROFILE_URL_FIELDS if field != key)
+        column = next((field for field in candidates if field in headers), None)
+        
+        urls: List[str] = []
+        if column is not None:
+            letter = column_letter(headers.index(column))
+            columns = values.get(
+                spreadsheetId=self.sheet_id,
+                range=f"{worksheet_name}!{letter}2:{letter}",
+                majorDimension='COLUMNS'
+            ).execute().get('values', [])
+            urls = columns[0] if columns else []
+        
+        cached = {'key': key, 'headers': headers, 'column': column, 'loaded_at': time.monotonic()}
+        self._set_row_urls(cached, urls)
+        self._row_indexes[worksheet_name] = cached
+        return cached
+    
+    def _verified_row_index(self, worksheet_name: str, key: str = 'linkedin_url') -> Dict[str, Any]:
+        """
+        Índice de linhas confirmado contra a sheet, para escritas por número de linha
+        
+        Outros escritores (poc_demo, importações do PhantomBuster, edições
+        manuais) não invalidam o cache, por isso antes de apagar ou reescrever
+        linhas por posição o cabeçalho e a coluna do URL são relidos num único
+        values.batchGet. Se o cabeçalho mudou o índice é reconstruído; se só as
+        linhas mudaram, as posições passam a ser as da coluna acabada de ler.
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            key: Coluna preferida para o URL do perfil
+            
+        Returns:
+            Índice como em _row_index, com as posições atuais
+        """
+        row_index = self._row_index(worksheet_name, key)
+        column = row_index['column']
+        if column is None:
+            return self._row_index(worksheet_name, key, refresh=True)
+        
+        letter = column_letter(row_index['headers'].index(column))
+        value_ranges = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.sheet_id,
+            ranges=[f"{worksheet_name}!1:1", f"{worksheet_name}!{letter}2:{letter}"],
+            majorDimension='COLUMNS'
+        ).execute().get('valueRanges', [])
+        header_columns = value_ranges[0].get('values', []) if value_ranges else []
+        url_columns = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
+        
+        # Em COLUMNS, cada célula do cabeçalho é uma coluna com um valor (vazia se não tiver)
+        headers = [values[0] if values else "" for values in header_columns]
+        if headers != row_index['headers']:
+            return self._row_index(worksheet_name, key, refresh=True)
+        
+        urls = url_columns[0] if url_columns else []
+        if urls != row_index['urls']:
+            self._set_row_urls(row_index, urls)
+        row_index['loaded_at'] = time.monotonic()
+        return row_index
+    
+    @staticmethod
+    def _set_row_urls(row_index: Dict[str, Any], urls: List[str]):
+        """Atualiza as URLs por linha e reconstrói o índice (sem pedidos à API)"""
+        column = row_index['column']
+        row_index['urls'] = urls
+        row_index['index'] = ProfileKeyIndex(({column: url} for url in urls), fields=(column,)) if column else ProfileKeyIndex()
+    
+    def upsert_rows(self, worksheet_name: str, rows: List[Dict[str, Any]], key: str = 'linkedin_url') -> Dict[str, int]:
+        """
+        Atualiza as linhas dos perfis já existentes e acrescenta as restantes
+        
+        As linhas existentes são encontradas pela chave canónica do perfil e
+        reescritas num único values.batchUpdate; as novas entram num único
+        values.append. Colunas novas são acrescentadas ao cabeçalho.
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            rows: Linhas completas a escrever
+            key: Coluna com o URL do perfil
+            
+        Returns:
+            {'updated': linhas reescritas, 'inserted': linhas acrescentadas}
+        """
+        try:
+            if not rows:
+                return {'updated': 0, 'inserted': 0}
+            
+            self._ensure_worksheet_exists(worksheet_name)
+            # As linhas a reescrever são localizadas na coluna do URL lida agora
+            row_index = self._verified_row_index(worksheet_name, key)
+            
+            headers = list(row_index['headers'])
+            known_columns = set(headers)
+            for row in rows:
+                for column in row:
+                    if column not in known_columns:
+                        known_columns.add(column)
+                        headers.append(column)
+            
+            updates: Dict[int, Dict[str, Any]] = {}
+            inserts: List[Dict[str, Any]] = []
+            pending: Dict[str, int] = {}
+            
+            for row in rows:
+                profile = profile_key(row, (key,) + PROFILE_URL_FIELDS)
+                position = row_index['index'].first(profile) if profile else None
+                
+                if position is not None:
+                    updates[position + 2] = row
+                elif profile in pending:
+                    # O mesmo perfil repetido no lote: prevalece a última versão
+                    inserts[pending[profile]] = row
+                else:
+                    if profile:
+                        pending[profile] = len(inserts)
+                    inserts.append(row)
+            
+            blocks = _row_blocks(updates, headers)
+            if headers != row_index['headers']:
+                blocks.insert(0, {'start': 1, 'end': 1, 'values': [headers]})
+            if blocks:
+                self._write_blocks(worksheet_name, blocks)
+            
+            if inserts:
+                self.service.spreadsheets().values().append(
                     spreadsheetId=self.sheet_id,
-                    body={
-                        'requests': [{
-                            'addSheet': {
-                                'properties': {
-                                    'title': worksheet_name
-                                }
-                            }
-                        }]
-                    }
+                    range=f"{worksheet_name}!A1",
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': [[str(row.get(header, "")) for header in headers] for row in inserts]}
                 ).execute()
+            
+            if inserts or headers != row_index['headers']:
+                self._row_indexes.pop(worksheet_name, None)
+            
+            return {'updated': len(updates), 'inserted': len(inserts)}
+            
+        except HttpError as e:
+            self._row_indexes.pop(worksheet_name, None)
+            raise Exception(f"Erro ao atualizar/inserir linhas na worksheet {worksheet_name}: {e}") from e
+    
+    def _ensure_worksheet_exists(self, worksheet_name: str):
+        """Garante que a worksheet existe, criando se necessário (metadados em cache)"""
+        try:
+            self.metadata.ensure_worksheet(self.service, worksheet_name)
                 
         except Exception as e:
             print(f"Aviso: Não foi possível verificar/criar worksheet {worksheet_name}: {e}")
@@ -195,10 +467,12 @@ class GoogleSheetsClient:
                 body=body
             ).execute()
             
+            self._row_indexes.pop(worksheet_name, None)
+            
             return True
             
         except HttpError as e:
-            raise Exception(f"Erro ao adicionar dados à worksheet {worksheet_name}: {e}")
+            raise Exception(f"Erro ao adicionar dados à worksheet {worksheet_name}: {e}") from e
     
     def delete_by_url(self, worksheet_name: str, linkedin_url: str) -> bool:
         """
@@ -211,57 +485,77 @@ class GoogleSheetsClient:
         Returns:
             True se removido com sucesso
         """
-        try:
-            # Ler dados atuais
-            rows = self.read_rows(worksheet_name)
-            
-            # Encontrar linha com o URL
-            row_to_delete = None
-            for i, row in enumerate(rows):
-                if row.get('linkedin_url') == linkedin_url:
-                    row_to_delete = i + 2  # +2 porque começamos em 1 e temos header
-                    break
-            
-            if row_to_delete is None:
-                return False
+        return self.delete_by_urls(worksheet_name, [linkedin_url]) > 0
+    
+    def delete_by_urls(self, worksheet_name: str, urls: List[str]) -> int:
+        """
+        Remove as linhas de vários perfis num único batchUpdate
+        
+        Linhas contíguas formam um só deleteDimension, e os intervalos são
+        removidos de baixo para cima para os índices dos seguintes não mudarem.
+        
+        Args:
+            worksheet_name: Nome da worksheet
+            urls: URLs dos perfis a remover (comparados pela chave canónica)
             
-            # Remover linha
-            self.service.spreadsheets().batchUpdate(
-                spreadsheetId=self.sheet_id,
-                body={
-                    'requests': [{
-                        'deleteDimension': {
-                            'range': {
-                                'sheetId': self._get_sheet_id(worksheet_name),
-                                'dimension': 'ROWS',
-                                'startIndex': row_to_delete - 1,
-                                'endIndex': row_to_delete
-                            }
+        Returns:
+            Número de linhas removidas
+        """
+        try:
+            # Posições da coluna do URL lida agora: o cache pode não refletir escritas de outros
+            row_index = self._verified_row_index(worksheet_name)
+            positions = sorted({position for url in urls for position in row_index['index'].positions(url)})
+            
+            if not positions:
+                return 0
+            
+            # Intervalos [início, fim] de posições consecutivas
+            ranges: List[Tuple[int, int]] = []
+            for position in positions:
+                if ranges and ranges[-1][1] == position - 1:
+                    ranges[-1] = (ranges[-1][0], position)
+                else:
+                    ranges.append((position, position))
+            
+            sheet_id = self._get_sheet_id(worksheet_name)
+            self.metadata.batch_update(self.service, [
+                {
+                    'deleteDimension': {
+                        'range': {
+                            'sheetId': sheet_id,
+                            'dimension': 'ROWS',
+                            # Posição 0 = linha 2 da sheet = índice 1 (base 0, com header)
+                            'startIndex': first + 1,
+                            'endIndex': last + 2
                         }
-                    }]
+                    }
                 }
-            ).execute()
+                for first, last in reversed(ranges)
+            ])
             
-            return True
+            removed = set(positions)
+            self._set_row_urls(row_index, [url for position, url in enumerate(row_index['urls']) if position not in removed])
+            
+            return len(positions)
             
         except HttpError as e:
-            raise Exception(f"Erro ao remover linha da worksheet {worksheet_name}: {e}")
+            # O sheetId ou as posições em cache podem estar desatualizados
+            self.metadata.invalidate()
+            self._row_indexes.pop(worksheet_name, None)
+            raise Exception(f"Erro ao remover linhas da worksheet {worksheet_name}: {e}") from e
     
     def _get_sheet_id(self, worksheet_name: str) -> int:
-        """Obtém o ID interno da worksheet"""
+        """Obtém o ID interno da worksheet (metadados em cache)"""
         try:
-            spreadsheet = self.service.spreadsheets().get(
-                spreadsheetId=self.sheet_id
-            ).execute()
+            sheet_id = self.metadata.sheet_id(self.service, worksheet_name)
             
-            for sheet in spreadsheet.get('sheets', []):
-                if sheet.get('properties', {}).get('title') == worksheet_name:
-                    return sheet.get('properties', {}).get('sheetId')
+            if sheet_id is None:
+                raise Exception(f"Worksheet '{worksheet_name}' não encontrada")
             
-            raise Exception(f"Worksheet '{worksheet_name}' não encontrada")
+            return sheet_id
             
         except HttpError as e:
-            raise Exception(f"Erro ao obter ID da worksheet {worksheet_name}: {e}")
+            raise Exception(f"Erro ao obter ID da worksheet {worksheet_name}: {e}") from e
     
     def get_row_count(self, worksheet_name: str) -> int:
         """
@@ -284,4 +578,4 @@ class GoogleSheetsClient:
             return len(values) - 1 if values else 0  # -1 para excluir header
             
         except HttpError as e:
-            raise Exception(f"Erro ao contar linhas da worksheet {worksheet_name}: {e}")
+            raise Exception(f"Erro ao contar linhas da worksheet {worksheet_name}: {e}") from e
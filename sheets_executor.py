@@ -0,0 +1,278 @@
+"""
+Executor central dos pedidos à Google Sheets API: quotas, prioridades e retries
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from config import Config
+
+# Prioridades (menor = primeiro): leituras/escritas do utilizador antes da auditoria
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Erros temporários: quota excedida e falhas do lado da Google
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Métodos que contam para a quota de leitura (os restantes contam como escrita)
+READ_METHODS = frozenset({'get', 'batchGet', 'batchGetByDataFilter', 'getByDataFilter'})
+
+
+def is_idempotent(method: str, kwargs: Dict[str, Any]) -> bool:
+    """
+    Se repetir o pedido depois de uma resposta perdida não altera o resultado
+
+    values.append (acrescenta linhas de novo) e spreadsheets.batchUpdate com
+    pedidos de estrutura (deleteDimension, addSheet, ...) não são idempotentes;
+    leituras, values.update, values.batchUpdate e values.clear são.
+    """
+    if method == 'append':
+        return False
+    if method == 'batchUpdate':
+        return 'requests' not in (kwargs.get('body') or {})
+    return True
+
+
+def retry_after(error: HttpError) -> Optional[float]:
+    """Segundos indicados pelo header Retry-After de uma resposta de erro (None se não existir)"""
+    value = getattr(error, 'resp', None) and error.resp.get('retry-after')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket com reposição contínua ao ritmo da quota por minuto
+
+    Não é thread-safe: o executor usa-o sempre dentro do seu lock.
+    """
+
+    def __init__(self, per_minute: int, capacity: Optional[int] = None):
+        """
+        Args:
+            per_minute: Pedidos permitidos por minuto
+            capacity: Rajada máxima (None = um quarto da quota por minuto)
+        """
+        self.rate = max(per_minute, 1) / 60.0
+        self.capacity = float(capacity or max(1, per_minute // 4))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.pause_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """Segundos até haver um token disponível (0 = já existe)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if now < self.pause_until:
+            return self.pause_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Suspende a emissão de tokens durante o tempo indicado (após um 429)"""
+        self.pause_until = max(self.pause_until, time.monotonic() + seconds)
+
+
+class SheetsRequestExecutor:
+    """
+    Executa pedidos da API respeitando as quotas de leitura e de escrita
+
+    Cada tipo de pedido tem um token bucket e uma fila por prioridade: só o
+    primeiro da fila pode levar o próximo token, por isso pedidos interativos
+    passam à frente da auditoria em segundo plano. Erros 429/5xx e falhas de
+    ligação são repetidos com backoff exponencial com jitter; um 429 suspende
+    também o bucket, para os outros pedidos do mesmo tipo não insistirem.
+    Pedidos não idempotentes só são repetidos após um 429 (rejeitado antes de
+    ser aplicado): depois de um 5xx ou de uma ligação perdida o pedido pode
+    já ter sido aplicado, e repeti-lo duplicaria linhas ou apagaria outras.
+    """
+
+    def __init__(self, reads_per_minute: int = 60, writes_per_minute: int = 60,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 64.0):
+        """
+        Args:
+            reads_per_minute: Quota de pedidos de leitura por minuto
+            writes_per_minute: Quota de pedidos de escrita por minuto
+            max_retries: Tentativas adicionais para erros temporários
+            base_delay: Espera da primeira repetição (segundos), duplicada a cada tentativa
+            max_delay: Espera máxima entre tentativas (segundos)
+        """
+        self.buckets = {'read': TokenBucket(reads_per_minute), 'write': TokenBucket(writes_per_minute)}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {
+            'requests': 0, 'reads': 0, 'writes': 0,
+            'throttled': 0, 'throttle_seconds': 0.0,
+            'rate_limited': 0, 'server_errors': 0, 'connection_errors': 0,
+            'retries': 0, 'failures': 0,
+        }
+        self._queues: Dict[str, list] = {'read': [], 'write': []}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _count(self, **deltas):
+        with self._condition:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+
+    def _acquire(self, kind: str, priority: int):
+        """Espera pela vez deste pedido na fila e por um token do bucket"""
+        bucket = self.buckets[kind]
+        queue = self._queues[kind]
+        ticket = (priority, next(self._sequence))
+        started = time.monotonic()
+        waited = False
+
+        with self._condition:
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    wait = None  # fora da cabeça da fila: espera que alguém saia
+                    if queue[0] == ticket:
+                        wait = bucket.wait_time(time.monotonic())
+                        if wait <= 0:
+                            bucket.take()
+                            break
+                    waited = True
+                    self._condition.wait(wait)
+            finally:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._condition.notify_all()
+
+            if waited:
+                self.stats['throttled'] += 1
+                self.stats['throttle_seconds'] += time.monotonic() - started
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera exponencial com jitter (entre metade e a totalidade do intervalo)"""
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def execute(self, request, kind: str = 'read', priority: int = INTERACTIVE, idempotent: bool = True) -> Any:
+        """
+        Executa um pedido da API (HttpRequest do googleapiclient)
+
+        Args:
+            request: Pedido com método execute()
+            kind: 'read' ou 'write' (quota a consumir)
+            priority: INTERACTIVE ou BACKGROUND
+            idempotent: Se o pedido pode ser repetido após 5xx ou falha de ligação
+
+        Returns:
+            Resposta da API
+        """
+        for attempt in range(self.max_retries + 1):
+            self._acquire(kind, priority)
+
+            try:
+                response = request.execute()
+                self._count(requests=1, **{kind + 's': 1})
+                return response
+
+            except HttpError as e:
+                status = getattr(e.resp, 'status', None)
+                retryable = status == 429 or (idempotent and status in RETRYABLE_STATUSES)
+                if not retryable or attempt == self.max_retries:
+                    self._count(failures=1)
+                    raise
+
+                delay = max(retry_after(e) or 0.0, self._backoff(attempt))
+                if status == 429:
+                    self._count(rate_limited=1, retries=1)
+                    with self._condition:
+                        self.buckets[kind].pause(delay)
+                        self._condition.notify_all()
+                    continue
+
+                self._count(server_errors=1, retries=1)
+                time.sleep(delay)
+
+            except (ConnectionError, TimeoutError):
+                if not idempotent or attempt == self.max_retries:
+                    self._count(failures=1)
+                    raise
+                self._count(connection_errors=1, retries=1)
+                time.sleep(self._backoff(attempt))
+
+        raise RuntimeError("Número máximo de tentativas da Google Sheets API excedido")
+
+    def wrap(self, service, priority: int = INTERACTIVE) -> 'ScheduledService':
+        """Serviço googleapiclient cujos pedidos passam por este executor"""
+        return ScheduledService(service, self, priority)
+
+
+class ScheduledRequest:
+    """Pedido da API cujo execute() passa pelo executor"""
+
+    def __init__(self, request, executor: SheetsRequestExecutor, kind: str, priority: int, idempotent: bool = True):
+        self._request = request
+        self._executor = executor
+        self._kind = kind
+        self._priority = priority
+        self._idempotent = idempotent
+
+    def execute(self) -> Any:
+        return self._executor.execute(self._request, self._kind, self._priority, self._idempotent)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._request, name)
+
+
+class ScheduledService:
+    """
+    Envolve um recurso do googleapiclient (serviço, spreadsheets(), values())
+
+    Os módulos que recebem o serviço (metadados, leitura, sincronização) ficam
+    sujeitos às quotas sem mudar: cada pedido criado é devolvido como
+    ScheduledRequest, classificado como leitura ou escrita (e idempotente ou
+    não) pelo nome do método e pelo corpo do pedido.
+    """
+
+    def __init__(self, resource, executor: SheetsRequestExecutor, priority: int = INTERACTIVE):
+        self._resource = resource
+        self._executor = executor
+        self._priority = priority
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._resource, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            if hasattr(result, 'execute'):
+                kind = 'read' if name in READ_METHODS else 'write'
+                return ScheduledRequest(result, self._executor, kind, self._priority, is_idempotent(name, kwargs))
+            return ScheduledService(result, self._executor, self._priority)
+
+        return call
+
+
+_shared_executor: Optional[SheetsRequestExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def shared_executor() -> SheetsRequestExecutor:
+    """Executor único do processo: todos os clientes partilham a mesma quota"""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = SheetsRequestExecutor(
+                reads_per_minute=Config.SHEETS_READS_PER_MINUTE,
+                writes_per_minute=Config.SHEETS_WRITES_PER_MINUTE,
+                max_retries=Config.SHEETS_MAX_RETRIES
+            )
+        return _shared_executor
@@ -0,0 +1,109 @@
+"""
+Etiquetagem de skills numa única passagem (autómato Aho-Corasick)
+"""
+from collections import deque
+from typing import Dict, List, Set, Tuple
+from lexical_index import fold_text
+
+
+class SkillTagger:
+    """Compila a taxonomia de skills num autómato Aho-Corasick"""
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        """
+        Args:
+            taxonomy: Categoria -> lista de palavras-chave
+        """
+        self.categories = list(taxonomy)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Por estado: (comprimento da palavra-chave, índice da categoria)
+        self._outputs: List[List[Tuple[int, int]]] = [[]]
+
+        for category_index, keywords in enumerate(taxonomy.values()):
+            for keyword in keywords:
+                folded = fold_text(keyword).strip()
+                if folded:
+                    self._insert(folded, category_index)
+
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, category_index: int):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(keyword), category_index))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+
+                # Herdar as palavras-chave que terminam no estado de falha
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def tag(self, text: str) -> List[str]:
+        """
+        Encontra as categorias de skills presentes no texto
+
+        A comparação ignora maiúsculas e acentos e só aceita palavras inteiras
+        (ex: "ui" não corresponde a "Guillermo").
+
+        Args:
+            text: Texto a analisar
+
+        Returns:
+            Categorias encontradas, pela ordem da taxonomia
+        """
+        return self.tag_folded(fold_text(text))
+
+    def tag_folded(self, folded: str) -> List[str]:
+        """
+        Igual a tag(), para texto já passado por fold_text
+
+        Args:
+            folded: Texto normalizado (minúsculas, sem acentos)
+
+        Returns:
+            Categorias encontradas, pela ordem da taxonomia
+        """
+        length = len(folded)
+        found: Set[int] = set()
+        state = 0
+
+        for position, char in enumerate(folded):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            if not self._outputs[state]:
+                continue
+
+            # Fronteira de palavra à direita
+            if position + 1 < length and folded[position + 1].isalnum():
+                continue
+
+            for keyword_length, category_index in self._outputs[state]:
+                start = position - keyword_length + 1
+                if start == 0 or not folded[start - 1].isalnum():
+                    found.add(category_index)
+
+            if len(found) == len(self.categories):
+                break
+
+        return [self.categories[index] for index in sorted(found)]
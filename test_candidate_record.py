@@ -0,0 +1,151 @@
+"""
+Teste do registo compacto de candidato (interface de dicionário)
+"""
+import json
+import os
+import pickle
+import sys
+from collections.abc import Mapping
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_record import CandidateRecord, RecordSchema, to_plain
+
+SAMPLE_CANDIDATE = {
+    'linkedin_url': 'https://www.linkedin.com/in/joao-silva',
+    'name': 'João Silva',
+    'headline': 'Senior Financial Analyst',
+    'skills_tags': ['finanças'],
+    'location': ''
+}
+
+
+def test_mapping_interface():
+    """Testa se o registo se comporta como o dicionário de origem"""
+    print("Testando interface de Mapping...")
+
+    try:
+        record = CandidateRecord.from_mapping(SAMPLE_CANDIDATE)
+
+        assert isinstance(record, Mapping)
+        assert dict(record) == SAMPLE_CANDIDATE
+        assert record == SAMPLE_CANDIDATE, "igualdade com o dicionário falhou"
+        assert list(record) == list(SAMPLE_CANDIDATE), list(record)
+        assert len(record) == len(SAMPLE_CANDIDATE)
+        assert record['name'] == 'João Silva'
+        assert record.get('location') == '' and record.get('phone') is None
+        assert record.get('phone', 'n/a') == 'n/a'
+        assert 'headline' in record and 'phone' not in record
+        assert list(record.items()) == list(SAMPLE_CANDIDATE.items())
+        print("OK - get, in, len, itens e ordem iguais aos do dicionario")
+
+        try:
+            record['phone']
+            raise AssertionError("campo inexistente não levantou KeyError")
+        except KeyError:
+            pass
+        print("OK - Campo inexistente levanta KeyError")
+
+        assert CandidateRecord.from_mapping(record) is record
+        assert CandidateRecord.from_mapping(dict(SAMPLE_CANDIDATE))._schema is record._schema
+        print("OK - Esquema partilhado entre registos com as mesmas colunas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na interface de Mapping: {e}")
+        return False
+
+
+def test_extras_and_copy():
+    """Testa atribuições (extras) e cópias"""
+    print("\nTestando extras e copy()...")
+
+    try:
+        record = CandidateRecord.from_mapping(SAMPLE_CANDIDATE)
+        record['score'] = 0.9
+        record['location'] = 'Lisboa'
+
+        assert record['score'] == 0.9 and record.get('score') == 0.9
+        assert record['location'] == 'Lisboa'
+        assert list(record) == list(SAMPLE_CANDIDATE) + ['score'], list(record)
+        assert len(record) == len(SAMPLE_CANDIDATE) + 1
+        print("OK - Extras novos no fim e campos substituidos no lugar")
+
+        clone = record.copy()
+        clone['score'] = 0.1
+        clone['rank'] = 1
+        assert record['score'] == 0.9 and 'rank' not in record
+        assert clone['score'] == 0.1 and clone['name'] == 'João Silva'
+        assert CandidateRecord.from_mapping(SAMPLE_CANDIDATE).copy().get('score') is None
+        print("OK - Copias independentes do original")
+
+        data = record.to_dict()
+        assert isinstance(data, dict) and data['score'] == 0.9 and data['location'] == 'Lisboa'
+        data['name'] = 'Outro'
+        assert record['name'] == 'João Silva'
+        print("OK - to_dict devolve um dicionario independente")
+
+        assert record.view(('name', 'score', 'phone')) == ('João Silva', 0.9, None)
+        print("OK - view devolve os campos pedidos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nos extras: {e}")
+        return False
+
+
+def test_serialization():
+    """Testa pickle (multiprocessing) e JSON"""
+    print("\nTestando serializacao...")
+
+    try:
+        record = CandidateRecord.from_mapping(SAMPLE_CANDIDATE)
+        record['score'] = 0.5
+
+        restored = pickle.loads(pickle.dumps(record))
+        assert isinstance(restored, CandidateRecord)
+        assert restored == record and list(restored) == list(record)
+        assert restored._schema is RecordSchema.for_fields(tuple(SAMPLE_CANDIDATE))
+        print("OK - Pickle preserva valores, extras e esquema partilhado")
+
+        text = json.dumps({'candidates': [record], 'when': object()}, default=to_plain, ensure_ascii=False)
+        loaded = json.loads(text)
+        assert loaded['candidates'][0] == record.to_dict()
+        assert isinstance(loaded['when'], str)
+        print("OK - to_plain serializa registos como dicionarios")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na serializacao: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes do CandidateRecord...")
+    print("=" * 50)
+
+    tests = [
+        test_mapping_interface,
+        test_extras_and_copy,
+        test_serialization
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
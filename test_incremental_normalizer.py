@@ -0,0 +1,150 @@
+"""
+Teste da normalização incremental (content_hash e versão do pipeline)
+"""
+import os
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import normalizer as normalizer_module
+from normalizer import DataNormalizer, content_fingerprint, is_unchanged
+
+RAW_ROWS = [
+    {'linkedin_url': 'https://www.linkedin.com/in/ana', 'name': '  ana   costa ',
+     'headline': 'Financial analyst', 'current_company': 'Banco XYZ'},
+    {'linkedin_url': 'https://www.linkedin.com/in/rui', 'name': 'Rui Silva',
+     'headline': 'Kotlin developer', 'current_company': 'Startup ABC'},
+    {'linkedin_url': 'https://www.linkedin.com/in/eva', 'name': 'Eva Mendes',
+     'headline': 'HR business partner', 'current_company': 'Empresa'},
+]
+
+
+def as_read_from_sheet(rows):
+    """Linhas como voltam da sheet: todos os valores em texto"""
+    return [{key: ", ".join(value) if isinstance(value, list) else str(value) for key, value in row.items()}
+            for row in rows]
+
+
+def test_unchanged_rows_skipped():
+    """Testa se linhas já normalizadas passam sem alterações"""
+    print("Testando linhas inalteradas...")
+
+    try:
+        normalizer = DataNormalizer()
+        first, changed = normalizer.normalize_incremental([dict(row) for row in RAW_ROWS], workers=1)
+        assert changed == [0, 1, 2], changed
+        assert all(row['content_hash'] for row in first)
+        print("OK - Primeira passagem normaliza todas as linhas")
+
+        stored = as_read_from_sheet(first)
+        assert all(is_unchanged(row, normalizer.pipeline_version) for row in stored)
+        second, changed = normalizer.normalize_incremental(stored, workers=1)
+        assert changed == [], changed
+        assert all(out is row for out, row in zip(second, stored)), "linhas inalteradas foram copiadas"
+        print("OK - Linhas lidas de volta da sheet nao sao normalizadas outra vez")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas linhas inalteradas: {e}")
+        return False
+
+
+def test_changed_rows_reprocessed():
+    """Testa se linhas novas ou editadas voltam a passar pelo pipeline"""
+    print("\nTestando linhas alteradas...")
+
+    try:
+        normalizer = DataNormalizer()
+        stored = as_read_from_sheet(normalizer.normalize_incremental([dict(row) for row in RAW_ROWS], workers=1)[0])
+
+        stored[1]['headline'] = 'python   developer'
+        stored.append({'linkedin_url': 'https://www.linkedin.com/in/novo', 'name': 'novo candidato'})
+        stored.append(dict(stored[0]))
+
+        result, changed = normalizer.normalize_incremental(stored, workers=1)
+        assert changed == [1, 3], changed
+        assert len(result) == 4, "duplicado de uma linha inalterada nao foi removido"
+        assert result[1]['headline'] == 'Python developer', result[1]['headline']
+        assert result[1]['skills_tags'] == ['tecnologia'], result[1]['skills_tags']
+        assert is_unchanged(result[1], normalizer.pipeline_version)
+        assert result[3]['name'] == 'Novo candidato' and result[3]['content_hash']
+        print("OK - Linhas editadas e novas normalizadas, com novo content_hash")
+        print("OK - Linhas inalteradas continuam a contar para a deduplicacao")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas linhas alteradas: {e}")
+        return False
+
+
+def test_version_bump_forces_full_pass():
+    """Testa se mudar as regras ou a taxonomia invalida os content_hash"""
+    print("\nTestando mudanca de versao...")
+
+    original_version = normalizer_module.NORMALIZER_VERSION
+    try:
+        normalizer = DataNormalizer()
+        stored = as_read_from_sheet(normalizer.normalize_incremental([dict(row) for row in RAW_ROWS], workers=1)[0])
+        assert content_fingerprint(stored[0]) != stored[0]['content_hash'], "versao nao entra no hash"
+
+        normalizer_module.NORMALIZER_VERSION = original_version + 1
+        bumped = DataNormalizer()
+        assert bumped.pipeline_version != normalizer.pipeline_version
+        _, changed = bumped.normalize_incremental(stored, workers=1)
+        assert changed == [0, 1, 2], changed
+        print("OK - NORMALIZER_VERSION novo obriga a normalizar todas as linhas")
+        normalizer_module.NORMALIZER_VERSION = original_version
+
+        # Taxonomia maior: "kotlin" passa a ser uma skill de tecnologia
+        class GrownNormalizer(DataNormalizer):
+            def __init__(self):
+                super().__init__()
+                self.common_skills['tecnologia'] = self.common_skills['tecnologia'] + ['kotlin']
+                self.skill_tagger = normalizer_module.SkillTagger(self.common_skills)
+                self.pipeline_version = normalizer_module.pipeline_version(self.common_skills)
+
+        grown = GrownNormalizer()
+        assert grown.pipeline_version != normalizer.pipeline_version
+        result, changed = grown.normalize_incremental(stored, workers=1)
+        assert changed == [0, 1, 2], changed
+        assert result[1]['skills_tags'] == ['tecnologia'], result[1]['skills_tags']
+        print("OK - Taxonomia alterada volta a etiquetar as linhas inalteradas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na mudanca de versao: {e}")
+        return False
+
+    finally:
+        normalizer_module.NORMALIZER_VERSION = original_version
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes da normalizacao incremental...")
+    print("=" * 50)
+
+    tests = [
+        test_unchanged_rows_skipped,
+        test_changed_rows_reprocessed,
+        test_version_bump_forces_full_pass
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Teste da deteção e junção de candidatos quase duplicados
+"""
+import os
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import near_duplicates
+from near_duplicates import NearDuplicateDetector, merge_rows
+from normalizer import DataNormalizer
+from profile_keys import profile_key
+
+SAMPLE_ROWS = [
+    {
+        'linkedin_url': 'https://www.linkedin.com/in/joao-silva',
+        'name': 'João Silva',
+        'headline': 'Senior Financial Analyst at Banco Exemplo',
+        'current_company': 'Banco Exemplo',
+        'education': 'Universidade de Lisboa',
+        'location': ''
+    },
+    {
+        'linkedin_url': 'https://www.linkedin.com/in/ACoAAB12345',
+        'name': 'Joao Silva',
+        'headline': 'Senior Financial Analyst at Banco Exemplo',
+        'current_company': 'Banco Exemplo',
+        'education': 'Universidade de Lisboa',
+        'location': 'Lisboa, Portugal'
+    },
+    {
+        'linkedin_url': 'https://www.linkedin.com/in/maria-santos',
+        'name': 'Maria Santos',
+        'headline': 'Marketing Manager at Empresa Digital',
+        'current_company': 'Empresa Digital',
+        'education': 'Universidade do Porto',
+        'location': 'Porto, Portugal'
+    },
+    {
+        # Mesmo cargo, empresa e escola do primeiro, mas outra pessoa
+        'linkedin_url': 'https://www.linkedin.com/in/pedro-costa',
+        'name': 'Pedro Costa',
+        'headline': 'Senior Financial Analyst at Banco Exemplo',
+        'current_company': 'Banco Exemplo',
+        'education': 'Universidade de Lisboa',
+        'location': 'Lisboa, Portugal'
+    },
+]
+
+
+def test_find_clusters():
+    """Testa o agrupamento de perfis quase iguais"""
+    print("Testando NearDuplicateDetector.find_clusters...")
+
+    try:
+        detector = NearDuplicateDetector(threshold=0.7)
+        clusters = detector.find_clusters(SAMPLE_ROWS)
+        assert clusters == [[0, 1]], f"grupos: {clusters}"
+        print("OK - Mesmo perfil com URLs diferentes agrupado (acentos ignorados)")
+        print("OK - Nomes sem tokens em comum nunca sao agrupados")
+
+        assert detector.find_clusters(SAMPLE_ROWS[:1]) == []
+        assert detector.find_clusters([{'linkedin_url': 'a'}, {'linkedin_url': 'b'}]) == []
+        print("OK - Menos de dois perfis com campos nao dao grupos")
+
+        # Pela ordem inversa o mesmo grupo fica nas posições 2 e 3
+        again = NearDuplicateDetector(threshold=0.7).find_clusters(list(reversed(SAMPLE_ROWS)))
+        assert again == [[2, 3]], f"grupos (ordem inversa): {again}"
+        print("OK - Grupos por ordem crescente de posicao")
+
+        original_size = near_duplicates.SHINGLE_CACHE_SIZE
+        try:
+            near_duplicates.SHINGLE_CACHE_SIZE = 20
+            bounded = NearDuplicateDetector(threshold=0.7)
+            assert bounded.find_clusters(SAMPLE_ROWS) == [[0, 1]]
+            assert 0 < len(bounded._hash_cache) <= 20, len(bounded._hash_cache)
+        finally:
+            near_duplicates.SHINGLE_CACHE_SIZE = original_size
+        print("OK - Cache de hashes limitado a SHINGLE_CACHE_SIZE sem mudar os grupos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no agrupamento: {e}")
+        return False
+
+
+def test_name_parts():
+    """Testa perfis só com primeiro nome e apelido (formato PhantomBuster)"""
+    print("\nTestando nomes em partes...")
+
+    try:
+        rows = [
+            {'First Name': 'Ana', 'Last Name': 'Costa', 'Linkedin Headline': 'Product Designer at Studio',
+             'Company Name': 'Studio'},
+            {'fullName': 'Ana Costa', 'jobTitle': 'Product Designer at Studio', 'companyName': 'Studio'},
+        ]
+        clusters = NearDuplicateDetector(threshold=0.7).find_clusters(rows)
+        assert clusters == [[0, 1]], f"grupos: {clusters}"
+        print("OK - Colunas alternativas e nome em partes resolvidos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nos nomes em partes: {e}")
+        return False
+
+
+def test_merge_rows():
+    """Testa a junção das linhas de um grupo"""
+    print("\nTestando merge_rows...")
+
+    try:
+        rows = [
+            {'name': 'João Silva', 'location': '', 'skills_tags': [], 'headline': 'Analyst'},
+            {'name': 'Joao Silva', 'location': 'Lisboa', 'skills_tags': ['finanças'], 'headline': 'Other'},
+            {'location': 'Porto', 'phone': '123'},
+        ]
+        merged = merge_rows(rows)
+
+        assert merged['name'] == 'João Silva' and merged['headline'] == 'Analyst', merged
+        assert merged['location'] == 'Lisboa', merged
+        assert merged['skills_tags'] == ['finanças'], merged
+        assert merged['phone'] == '123', merged
+        assert rows[0]['location'] == '', "a primeira linha foi alterada"
+        print("OK - Primeira linha prevalece e campos vazios preenchidos por ordem")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no merge_rows: {e}")
+        return False
+
+
+def test_normalizer_stage():
+    """Testa a etapa de quase duplicados do DataNormalizer"""
+    print("\nTestando DataNormalizer(near_duplicates=True)...")
+
+    try:
+        rows = [dict(row) for row in SAMPLE_ROWS]
+
+        normalizer = DataNormalizer(near_duplicates=True)
+        normalized = normalizer.normalize_all(rows)
+        assert len(normalized) == 3, f"linhas: {len(normalized)}"
+        # A limpeza muda maiúsculas: comparar pela chave do perfil
+        assert profile_key(normalized[0]) == profile_key(SAMPLE_ROWS[0]), normalized[0]
+        assert normalized[0]['location'].lower() == 'lisboa, portugal', normalized[0]
+        assert len(normalizer.near_duplicate_report) == 1
+        assert normalizer.near_duplicate_report[0]['positions'] == [0, 1]
+        print("OK - Grupo junto na primeira linha e registado no relatorio")
+
+        assert len(DataNormalizer().normalize_all([dict(row) for row in SAMPLE_ROWS])) == 4
+        print("OK - Sem a etapa ativa nada e juntado")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na etapa do normalizador: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes de quase duplicados...")
+    print("=" * 50)
+
+    tests = [
+        test_find_clusters,
+        test_name_parts,
+        test_merge_rows,
+        test_normalizer_stage
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
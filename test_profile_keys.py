@@ -0,0 +1,150 @@
+"""
+Teste das chaves canónicas de perfis do LinkedIn
+"""
+import os
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from profile_keys import ProfileKeyIndex, canonical_profile_key, profile_key
+
+
+def test_canonical_variants():
+    """Testa se as variantes do mesmo URL dão a mesma chave"""
+    print("Testando variantes de URL...")
+
+    try:
+        variants = [
+            "https://cl.linkedin.com/in/Foo/?trk=x",
+            "http://linkedin.com/in/foo",
+            "linkedin.com/in/foo",
+            "https://www.linkedin.com/in/foo/",
+            "https://www.linkedin.com//in/foo#about",
+            "  HTTPS://WWW.LINKEDIN.COM/IN/FOO  ",
+            "https://www.linkedin.com/in/foo/en",
+            "https://www.linkedin.com/in/foo/details/experience/",
+        ]
+        keys = {canonical_profile_key(url) for url in variants}
+        assert keys == {"linkedin.com/in/foo"}, f"chaves diferentes: {keys}"
+        print("OK - Variantes de esquema, subdominio, query e sufixos dao a mesma chave")
+
+        encoded = canonical_profile_key("https://www.linkedin.com/in/jos%C3%A9-silva")
+        assert encoded == canonical_profile_key("linkedin.com/in/josé-silva"), encoded
+        print("OK - Percent-encoding ignorado")
+
+        assert canonical_profile_key("linkedin.com/in/foo") != canonical_profile_key("linkedin.com/in/foo-bar")
+        assert canonical_profile_key("linkedin.com/company/foo") == "linkedin.com/company/foo"
+        print("OK - Perfis e paginas diferentes dao chaves diferentes")
+
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas variantes de URL: {e}")
+        return False
+
+
+def test_empty_values():
+    """Testa valores vazios e que não são texto"""
+    print("\nTestando valores vazios...")
+
+    try:
+        assert canonical_profile_key(None) is None
+        assert canonical_profile_key("") is None
+        assert canonical_profile_key("   ") is None
+        assert profile_key({'name': 'Sem URL'}) is None
+        assert profile_key({'linkedin_url': '', 'Profile Url': '  '}) is None
+        print("OK - Valores vazios nao dao chave")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nos valores vazios: {e}")
+        return False
+
+
+def test_profile_key_fields():
+    """Testa a escolha da coluna do URL"""
+    print("\nTestando colunas do URL...")
+
+    try:
+        assert profile_key({'linkedin_url': '', 'profileUrl': 'https://linkedin.com/in/Foo'}) == "linkedin.com/in/foo"
+        assert profile_key({'linkedin_url': 'linkedin.com/in/a', 'profileUrl': 'linkedin.com/in/b'}) == "linkedin.com/in/a"
+        assert profile_key({'url': 'linkedin.com/in/a'}, fields=('linkedin_url',)) is None
+        print("OK - Primeira coluna preenchida prevalece")
+
+        assert profile_key({'url': 'https://www.linkedin.com/in/Foo/'}) == "linkedin.com/in/foo"
+        assert profile_key({'url': 'https://empresa.pt/equipa'}) is None
+        assert profile_key({'url': 'https://www.linkedin.com/company/empresa'}) is None
+        assert profile_key({'url': 'https://www.linkedin.com/in/'}) is None
+        assert profile_key({'url': 'https://empresa.pt', 'profileUrl': 'linkedin.com/in/a'}) == "linkedin.com/in/a"
+        assert profile_key({'url': 'https://empresa.pt'}, fields=('url',)) is None
+        print("OK - Coluna generica 'url' so conta com URLs de perfis do LinkedIn")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas colunas do URL: {e}")
+        return False
+
+
+def test_profile_key_index():
+    """Testa o índice de posições por perfil"""
+    print("\nTestando ProfileKeyIndex...")
+
+    try:
+        rows = [
+            {'linkedin_url': 'https://www.linkedin.com/in/ana/'},
+            {'linkedin_url': 'https://www.linkedin.com/in/rui'},
+            {'name': 'Sem URL'},
+            {'Profile Url': 'http://pt.linkedin.com/in/Ana?trk=x'},
+        ]
+        index = ProfileKeyIndex(rows)
+
+        assert len(index) == 2, f"perfis: {len(index)}"
+        assert index.positions('linkedin.com/in/ana') == [0, 3]
+        assert index.first('https://linkedin.com/in/RUI/') == 1
+        assert index.first('linkedin.com/in/ze') is None
+        assert 'linkedin.com/in/ana' in index and 'linkedin.com/in/ze' not in index
+        assert '' not in index
+        assert index.duplicates() == {'linkedin.com/in/ana': [0, 3]}
+        print("OK - Posicoes, duplicados e pertenca corretos")
+
+        assert index.add({'linkedin_url': 'linkedin.com/in/ze'}, 4) == 'linkedin.com/in/ze'
+        assert index.add({'name': 'Sem URL'}, 5) is None
+        assert index.first('linkedin.com/in/ze') == 4
+        print("OK - Linhas adicionadas depois ficam indexadas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no ProfileKeyIndex: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes das chaves de perfil...")
+    print("=" * 50)
+
+    tests = [
+        test_canonical_variants,
+        test_empty_values,
+        test_profile_key_fields,
+        test_profile_key_index
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Teste da leitura por páginas (sheet_reader)
+"""
+import os
+import re
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sheet_reader import MAX_EMPTY_PAGES, iter_row_pages, read_headers
+
+HEADERS = ['url', 'name', 'headline', 'location']
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _trim(values):
+    values = list(values)
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+class ColumnsService:
+    """
+    Serviço mínimo com a worksheet em memória
+
+    Como a API em majorDimension COLUMNS, corta as células vazias no fim de
+    cada coluna e omite as colunas vazias no fim do range.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.batch_gets = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId=None, range=None):
+        assert range == 'ws!1:1', range
+        self._response = {'values': [self.grid[0]]} if self.grid else {}
+        return self
+
+    def batchGet(self, spreadsheetId=None, ranges=(), majorDimension='ROWS'):
+        assert majorDimension == 'COLUMNS'
+        self.batch_gets.append(list(ranges))
+        self._response = {'valueRanges': [self._read(value_range) for value_range in ranges]}
+        return self
+
+    def _read(self, value_range):
+        first, start, last, end = re.fullmatch(r'ws!([A-Z]+)(\d+):([A-Z]+)(\d*)', value_range).groups()
+        rows = self.grid[int(start) - 1:int(end) if end else len(self.grid)]
+        columns = [
+            _trim(row[column] if column < len(row) else "" for row in rows)
+            for column in range(_column_index(first), _column_index(last) + 1)
+        ]
+        while columns and not columns[-1]:
+            columns.pop()
+        return {'range': value_range, 'values': columns} if columns else {'range': value_range}
+
+    def execute(self):
+        return self._response
+
+
+def _expected(grid, names):
+    """Linhas de dados até à última não vazia, só com as colunas pedidas"""
+    rows = [dict(zip(HEADERS, row + [""] * (len(HEADERS) - len(row)))) for row in grid[1:]]
+    while rows and not any(rows[-1].values()):
+        rows.pop()
+    return [{name: row[name] for name in names} for row in rows]
+
+
+def _read_all(service, **kwargs):
+    pages = list(iter_row_pages(service, 'sheet', 'ws', **kwargs))
+    return pages, [row for page in pages for row in page]
+
+
+def test_single_page():
+    """Testa a leitura sem paginação"""
+    print("Testando leitura numa pagina...")
+
+    try:
+        grid = [HEADERS, ['a', 'Ana', 'Dev', ''], ['b', '', '', ''], ['c', 'Eva', '', 'Porto']]
+        service = ColumnsService(grid)
+
+        assert read_headers(service, 'sheet', 'ws') == HEADERS
+        pages, rows = _read_all(service)
+        assert len(pages) == 1 and rows == _expected(grid, HEADERS), rows
+        assert service.batch_gets == [['ws!A2:D']], service.batch_gets
+        print("OK - Celulas vazias no fim das colunas preenchidas com ''")
+
+        assert _read_all(ColumnsService([]))[0] == []
+        assert _read_all(ColumnsService([HEADERS]))[0] == []
+        print("OK - Worksheet vazia ou so com cabecalho nao da paginas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na leitura numa pagina: {e}")
+        return False
+
+
+def test_blank_rows_between_pages():
+    """Testa se as linhas vazias entre páginas mantêm o alinhamento (pending_blank)"""
+    print("\nTestando linhas vazias entre paginas...")
+
+    try:
+        blank = ['', '', '', '']
+        grid = [HEADERS,
+                ['a', 'Ana', '', ''], blank, blank,     # página 1: linhas 2-4
+                blank, blank, blank,                    # página 2: vazia
+                blank, ['d', 'Rui', 'PM', ''], blank,   # página 3
+                ['e', '', '', 'Lisboa']]                # página 4
+        service = ColumnsService(grid)
+
+        pages, rows = _read_all(service, page_size=3, row_count=len(grid))
+        assert rows == _expected(grid, HEADERS), rows
+        assert len(rows) == 10 and rows[7]['url'] == 'd' and rows[9]['url'] == 'e', rows
+        assert [len(page) for page in pages] == [1, 7, 2], [len(page) for page in pages]
+        print("OK - Linhas vazias no fim de uma pagina emitidas antes dos dados seguintes")
+        print("OK - Pagina vazia antes de row_count nao termina a leitura")
+
+        pages, rows = _read_all(service, page_size=3)
+        assert rows == _expected(grid[:2], HEADERS), rows
+        print("OK - Sem row_count a leitura termina na primeira pagina vazia")
+
+        service = ColumnsService(grid[:3])
+        pages, rows = _read_all(service, page_size=3, row_count=1000)
+        assert rows == [dict(zip(HEADERS, grid[1]))], rows
+        print("OK - Linhas vazias no fim da worksheet nao sao emitidas")
+        assert len(service.batch_gets) == 1 + MAX_EMPTY_PAGES, len(service.batch_gets)
+        print("OK - Grelha de 1000 linhas quase vazia lida em poucos batchGet")
+
+        gap = [blank] * (3 * MAX_EMPTY_PAGES)
+        pages, rows = _read_all(ColumnsService(grid[:2] + [blank, blank] + gap + [grid[8]]), page_size=3, row_count=1000)
+        assert rows == [dict(zip(HEADERS, grid[1]))], rows
+        print("OK - MAX_EMPTY_PAGES paginas vazias seguidas terminam a leitura")
+
+        grid = [HEADERS] + [[str(i), '', '', ''] for i in range(7)]
+        pages, rows = _read_all(ColumnsService(grid), page_size=2, row_count=len(grid))
+        assert [row['url'] for row in rows] == [str(i) for i in range(7)], rows
+        print("OK - Paginas cheias sem linhas vazias")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas linhas vazias entre paginas: {e}")
+        return False
+
+
+def test_column_projection():
+    """Testa a leitura só de algumas colunas"""
+    print("\nTestando projecao de colunas...")
+
+    try:
+        grid = [HEADERS, ['a', 'Ana', 'Dev', 'Porto'], ['b', 'Rui', '', ''], ['', '', '', 'Faro']]
+        service = ColumnsService(grid)
+
+        pages, rows = _read_all(service, columns=['location', 'url', 'missing'], page_size=2, row_count=len(grid))
+        assert rows == _expected(grid, ['location', 'url']), rows
+        assert list(rows[0]) == ['location', 'url']
+        assert service.batch_gets[0] == ['ws!A2:A3', 'ws!D2:D3'], service.batch_gets
+        print("OK - Colunas pela ordem pedida, inexistentes ignoradas")
+        print("OK - Um range por grupo de colunas contiguas")
+
+        assert _read_all(service, columns=['missing'])[0] == []
+        print("OK - Nenhuma coluna existente nao da paginas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na projecao de colunas: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes da leitura por paginas...")
+    print("=" * 50)
+
+    tests = [
+        test_single_page,
+        test_blank_rows_between_pages,
+        test_column_projection
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Teste da sincronização por diferenças (sheet_sync)
+"""
+import os
+import re
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sheet_sync import column_letter, diff_ranges, sync_values
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _apply(grid, data):
+    """Aplica as entradas de diff_ranges a uma grelha (como o values.batchUpdate)"""
+    grid = [list(row) for row in grid]
+    for entry in data:
+        letters, row_number = re.fullmatch(r'[^!]+!([A-Z]+)(\d+)', entry['range']).groups()
+        first_column, first_row = _column_index(letters), int(row_number) - 1
+        for offset, values in enumerate(entry['values']):
+            while len(grid) <= first_row + offset:
+                grid.append([])
+            row = grid[first_row + offset]
+            while len(row) < first_column + len(values):
+                row.append("")
+            row[first_column:first_column + len(values)] = values
+    # A API devolve as linhas sem as células vazias finais e sem linhas vazias no fim
+    grid = [row[:max((i + 1 for i, value in enumerate(row) if value), default=0)] for row in grid]
+    while grid and not grid[-1]:
+        grid.pop()
+    return grid
+
+
+class RecordingService:
+    """Serviço mínimo que guarda a worksheet em memória e regista os pedidos"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.calls = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId=None, range=None):
+        self.calls.append('get')
+        self._response = {'values': self.grid} if self.grid else {}
+        return self
+
+    def batchUpdate(self, spreadsheetId=None, body=None):
+        self.calls.append('batchUpdate')
+        self.grid = _apply(self.grid, body['data'])
+        self._response = {}
+        return self
+
+    def execute(self):
+        return self._response
+
+
+def test_column_letter():
+    """Testa a conversão de índices em letras de coluna"""
+    print("Testando column_letter...")
+
+    try:
+        cases = {0: 'A', 1: 'B', 25: 'Z', 26: 'AA', 27: 'AB', 51: 'AZ', 52: 'BA', 701: 'ZZ', 702: 'AAA', 18277: 'ZZZ'}
+        for index, expected in cases.items():
+            assert column_letter(index) == expected, f"{index} -> {column_letter(index)} (esperado {expected})"
+        assert all(_column_index(column_letter(i)) == i for i in range(2000))
+        print("OK - Letras corretas nas mudancas de 1, 2 e 3 letras")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no column_letter: {e}")
+        return False
+
+
+def test_diff_ranges():
+    """Testa os ranges calculados entre duas grelhas"""
+    print("\nTestando diff_ranges...")
+
+    try:
+        current = [['url', 'name', 'headline'], ['a', 'Ana', 'Dev'], ['b', 'Rui', 'PM'], ['c', 'Eva', 'QA']]
+
+        assert diff_ranges('ws', current, [list(row) for row in current]) == []
+        assert diff_ranges('ws', [['a', 'b']], [['a', 'b', '']]) == []
+        print("OK - Grelhas iguais (incluindo celulas vazias finais) nao geram escritas")
+
+        desired = [list(row) for row in current]
+        desired[2][2] = 'Lead'
+        assert diff_ranges('ws', current, desired) == [{'range': 'ws!C3', 'values': [['Lead']]}]
+        print("OK - Uma celula alterada gera um range so com essa celula")
+
+        desired = [list(row) for row in current]
+        desired[1][1] = 'Ana M'
+        desired[2][2] = 'Lead'
+        assert diff_ranges('ws', current, desired) == [{'range': 'ws!B2', 'values': [['Ana M', 'Dev'], ['Rui', 'Lead']]}]
+        print("OK - Linhas consecutivas juntas num range limitado as colunas alteradas")
+
+        desired = [list(row) for row in current]
+        desired[1][0] = 'a2'
+        desired[3][0] = 'c2'
+        data = diff_ranges('ws', current, desired)
+        assert [entry['range'] for entry in data] == ['ws!A2', 'ws!A4'], data
+        print("OK - Linhas nao consecutivas em ranges separados")
+
+        desired = [['url', 'name'], ['a', 'Ana']]
+        data = diff_ranges('ws', current, desired)
+        assert _apply(current, data) == desired, _apply(current, data)
+        # Linhas 1-4 mudam (coluna C e linhas 3-4): um só range de A1 a C4
+        assert data == [{'range': 'ws!A1', 'values': [['url', 'name', ''], ['a', 'Ana', ''], ['', '', ''], ['', '', '']]}], data
+        print("OK - Linhas e colunas a mais escritas vazias ao encolher")
+
+        desired = current + [['d', 'Rita', 'Ops', 'extra']]
+        data = diff_ranges('ws', current, desired)
+        assert data == [{'range': 'ws!A5', 'values': [['d', 'Rita', 'Ops', 'extra']]}], data
+        assert _apply([], diff_ranges('ws', [], current)) == current
+        print("OK - Linhas novas acrescentadas no fim")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no diff_ranges: {e}")
+        return False
+
+
+def test_sync_values():
+    """Testa a sincronização completa com um serviço em memória"""
+    print("\nTestando sync_values...")
+
+    try:
+        service = RecordingService([['url', 'name'], ['a', 'Ana'], ['b', 'Rui']])
+        desired = [['url', 'name'], ['a', 'Ana'], ['b', 'Rui Costa'], ['c', 'Eva']]
+
+        assert sync_values(service, 'sheet', 'ws', desired) == 1
+        assert service.grid == desired and service.calls == ['get', 'batchUpdate'], service.calls
+        print("OK - Diferencas aplicadas num unico batchUpdate")
+
+        service.calls.clear()
+        assert sync_values(service, 'sheet', 'ws', desired) == 0
+        assert service.calls == ['get'], service.calls
+        print("OK - Worksheet igual nao gera escrita")
+
+        service.calls.clear()
+        assert sync_values(service, 'sheet', 'ws', desired[:2], current=desired) == 1
+        assert service.grid == desired[:2] and service.calls == ['batchUpdate'], service.calls
+        print("OK - Conteudo atual passado pelo chamador nao e relido")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no sync_values: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes da sincronizacao por diferencas...")
+    print("=" * 50)
+
+    tests = [
+        test_column_letter,
+        test_diff_ranges,
+        test_sync_values
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Teste do upsert_rows e delete_by_urls do GoogleSheetsClient com um serviço em memória
+"""
+import os
+import re
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from sheets_client import GoogleSheetsClient
+
+HEADERS = ['linkedin_url', 'name', 'headline']
+SHEET_ID = 7
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _trim(values):
+    values = list(values)
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+class SheetsService:
+    """
+    Serviço mínimo com as worksheets em memória
+
+    Como a API, corta células vazias no fim de linhas e colunas, e regista
+    os pedidos feitos (métodos e pedidos de estrutura do batchUpdate).
+    """
+
+    def __init__(self, worksheets):
+        self.worksheets = {title: [list(row) for row in grid] for title, grid in worksheets.items()}
+        self.sheet_ids = {title: SHEET_ID + offset for offset, title in enumerate(self.worksheets)}
+        self.calls = []
+        self.structure = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId=None, range=None, fields=None, majorDimension='ROWS'):
+        self.calls.append('get')
+        if range is None:
+            self._response = {'sheets': [
+                {'properties': {'title': title, 'sheetId': self.sheet_ids[title], 'index': index,
+                                'gridProperties': {'rowCount': 1000, 'columnCount': 26}}}
+                for index, title in enumerate(self.worksheets)
+            ]}
+        else:
+            self._response = self._read(range, majorDimension)
+        return self
+
+    def batchGet(self, spreadsheetId=None, ranges=(), majorDimension='ROWS'):
+        self.calls.append('batchGet')
+        self._response = {'valueRanges': [dict(self._read(value_range, majorDimension), range=value_range)
+                                          for value_range in ranges]}
+        return self
+
+    def batchUpdate(self, spreadsheetId=None, body=None):
+        self.calls.append('batchUpdate')
+        if 'data' in body:
+            for entry in body['data']:
+                self._write(entry['range'], entry['values'])
+            self._response = {}
+            return self
+
+        self.structure.append(body['requests'])
+        replies = []
+        for request in body['requests']:
+            if 'addSheet' in request:
+                title = request['addSheet']['properties']['title']
+                self.worksheets[title] = []
+                self.sheet_ids[title] = SHEET_ID + len(self.sheet_ids)
+                replies.append({'addSheet': {'properties': {'title': title, 'sheetId': self.sheet_ids[title]}}})
+            elif 'deleteDimension' in request:
+                dimension_range = request['deleteDimension']['range']
+                title = next(title for title, sheet_id in self.sheet_ids.items() if sheet_id == dimension_range['sheetId'])
+                del self.worksheets[title][dimension_range['startIndex']:dimension_range['endIndex']]
+                replies.append({})
+        self._response = {'replies': replies}
+        return self
+
+    def append(self, spreadsheetId=None, range=None, valueInputOption=None, insertDataOption=None, body=None):
+        self.calls.append('append')
+        title = range.partition('!')[0]
+        self._write(f"{title}!A{len(self.rows(title)) + 1}", body['values'])
+        self._response = {}
+        return self
+
+    def execute(self):
+        return self._response
+
+    def rows(self, title='ws'):
+        """Conteúdo da worksheet como devolvido pela API (sem células nem linhas vazias no fim)"""
+        rows = [_trim(row) for row in self.worksheets[title]]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def _parse(self, value_range):
+        title, _, a1 = value_range.partition('!')
+        if title not in self.worksheets:
+            raise AssertionError(f"worksheet inexistente: {title}")
+        first, start, last, end = re.fullmatch(r'([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?', a1).groups()
+        return title, first, start, last, end
+
+    def _read(self, value_range, major_dimension):
+        title, first, start, last, end = self._parse(value_range)
+        rows = self.worksheets[title][int(start or 1) - 1:int(end) if end else None]
+        width = max((len(row) for row in rows), default=0)
+        columns = range(_column_index(first) if first else 0, _column_index(last) + 1 if last else width)
+
+        if major_dimension == 'COLUMNS':
+            values = [_trim(row[column] if column < len(row) else "" for row in rows) for column in columns]
+        else:
+            values = [_trim(row[column] if column < len(row) else "" for column in columns) for row in rows]
+        while values and not values[-1]:
+            values.pop()
+        return {'values': values} if values else {}
+
+    def _write(self, value_range, values):
+        title, first, start, _, _ = self._parse(value_range)
+        grid = self.worksheets[title]
+        first_row, first_column = int(start or 1) - 1, _column_index(first or 'A')
+        for offset, row_values in enumerate(values):
+            while len(grid) <= first_row + offset:
+                grid.append([])
+            row = grid[first_row + offset]
+            while len(row) < first_column + len(row_values):
+                row.append("")
+            row[first_column:first_column + len(row_values)] = row_values
+
+
+def make_client(worksheets):
+    """Cliente ligado a um SheetsService (sem credenciais nem quotas reais)"""
+    Config.GOOGLE_SHEETS_ID = Config.GOOGLE_SHEETS_ID or 'sheet'
+    Config.GOOGLE_CREDENTIALS_FILE = Config.GOOGLE_CREDENTIALS_FILE or 'credentials.json'
+    Config.SHEETS_READS_PER_MINUTE = Config.SHEETS_WRITES_PER_MINUTE = 6000
+
+    service = SheetsService(worksheets)
+    original = GoogleSheetsClient._build_service
+    GoogleSheetsClient._build_service = lambda self: service
+    try:
+        return GoogleSheetsClient(), service
+    finally:
+        GoogleSheetsClient._build_service = original
+
+
+def _profile(name):
+    return f"https://www.linkedin.com/in/{name}"
+
+
+def _grid(*names):
+    return [HEADERS] + [[_profile(name), name.capitalize(), f"{name} headline"] for name in names]
+
+
+def test_delete_grouped_ranges():
+    """Testa os deleteDimension agrupados e por ordem decrescente"""
+    print("Testando delete_by_urls...")
+
+    try:
+        client, service = make_client({'ws': _grid('ana', 'rui', 'eva', 'tio', 'ze', 'bia', 'lu')})
+
+        # Posições 0-1 contíguas, 3 e 5 isoladas; variantes do URL apontam para o mesmo perfil
+        removed = client.delete_by_urls('ws', [_profile('ana'), _profile('RUI') + '/', _profile('tio'),
+                                               _profile('bia') + '?trk=x', _profile('ninguem')])
+        assert removed == 4, removed
+        assert len(service.structure) == 1, service.structure
+        ranges = [(request['deleteDimension']['range']['startIndex'], request['deleteDimension']['range']['endIndex'])
+                  for request in service.structure[0]]
+        assert ranges == [(6, 7), (4, 5), (1, 3)], ranges
+        assert all(request['deleteDimension']['range']['sheetId'] == SHEET_ID for request in service.structure[0])
+        print("OK - Linhas contiguas num so deleteDimension, de baixo para cima")
+
+        assert service.rows() == _grid('eva', 'ze', 'lu'), service.rows()
+        print("OK - Restantes linhas intactas depois de aplicar os pedidos por ordem")
+
+        service.calls.clear()
+        assert client.delete_by_urls('ws', [_profile('ninguem')]) == 0
+        assert 'batchUpdate' not in service.calls, service.calls
+        print("OK - URLs inexistentes nao geram batchUpdate")
+
+        # Outro escritor acrescenta uma linha no topo: as posições em cache ficam erradas
+        service.worksheets['ws'].insert(1, [_profile('novo'), 'Novo', ''])
+        assert client.delete_by_urls('ws', [_profile('ze')]) == 1
+        assert service.rows() == [HEADERS, [_profile('novo'), 'Novo'], *_grid('eva', 'lu')[1:]], service.rows()
+        print("OK - Posicoes confirmadas contra a sheet antes de apagar")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no delete_by_urls: {e}")
+        return False
+
+
+def test_empty_worksheets():
+    """Testa worksheets só com cabeçalho, vazias e inexistentes"""
+    print("\nTestando worksheets vazias...")
+
+    try:
+        client, service = make_client({'ws': [HEADERS]})
+        assert client.delete_by_urls('ws', [_profile('ana')]) == 0
+        assert service.structure == []
+        result = client.upsert_rows('ws', [{'linkedin_url': _profile('ana'), 'name': 'Ana', 'headline': 'Dev'}])
+        assert result == {'updated': 0, 'inserted': 1}, result
+        assert service.rows() == _grid('ana')[:1] + [[_profile('ana'), 'Ana', 'Dev']], service.rows()
+        print("OK - Worksheet so com cabecalho: nada a apagar, upsert acrescenta")
+
+        client, service = make_client({'ws': []})
+        assert client.delete_by_urls('ws', [_profile('ana')]) == 0
+        result = client.upsert_rows('ws', [{'linkedin_url': _profile('ana'), 'name': 'Ana'}])
+        assert result == {'updated': 0, 'inserted': 1}, result
+        assert service.rows() == [['linkedin_url', 'name'], [_profile('ana'), 'Ana']], service.rows()
+        print("OK - Worksheet vazia: cabecalho escrito a partir das linhas")
+
+        client, service = make_client({})
+        result = client.upsert_rows('ws', [{'linkedin_url': _profile('ana'), 'name': 'Ana'}])
+        assert result == {'updated': 0, 'inserted': 1}, result
+        assert [list(request[0]) for request in service.structure] == [['addSheet']], service.structure
+        assert service.rows() == [['linkedin_url', 'name'], [_profile('ana'), 'Ana']], service.rows()
+        print("OK - Worksheet inexistente criada antes de escrever")
+
+        assert client.upsert_rows('ws', []) == {'updated': 0, 'inserted': 0}
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas worksheets vazias: {e}")
+        return False
+
+
+def test_upsert_duplicates_last_wins():
+    """Testa perfis repetidos no mesmo lote"""
+    print("\nTestando perfis repetidos no upsert...")
+
+    try:
+        client, service = make_client({'ws': _grid('ana', 'rui')})
+        rows = [
+            {'linkedin_url': _profile('rui'), 'name': 'Rui', 'headline': 'v1'},
+            {'linkedin_url': _profile('eva'), 'name': 'Eva', 'headline': 'v1'},
+            {'linkedin_url': _profile('RUI') + '/', 'name': 'Rui', 'headline': 'v2'},
+            {'linkedin_url': 'http://linkedin.com/in/eva/', 'name': 'Eva', 'headline': 'v2'},
+        ]
+        result = client.upsert_rows('ws', rows)
+        assert result == {'updated': 1, 'inserted': 1}, result
+        assert service.rows() == [
+            HEADERS,
+            [_profile('ana'), 'Ana', 'ana headline'],
+            [_profile('RUI') + '/', 'Rui', 'v2'],
+            ['http://linkedin.com/in/eva/', 'Eva', 'v2'],
+        ], service.rows()
+        assert service.calls.count('append') == 1 and service.calls.count('batchUpdate') == 1, service.calls
+        print("OK - Perfil existente repetido: uma so reescrita com a ultima versao")
+        print("OK - Perfil novo repetido: um so insert com a ultima versao")
+
+        result = client.upsert_rows('ws', [{'linkedin_url': _profile('eva'), 'name': 'Eva', 'headline': 'v3'}])
+        assert result == {'updated': 1, 'inserted': 0}, result
+        assert service.rows()[3] == [_profile('eva'), 'Eva', 'v3'], service.rows()
+        print("OK - Linha inserida encontrada no upsert seguinte")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nos perfis repetidos: {e}")
+        return False
+
+
+def test_upsert_new_columns():
+    """Testa colunas novas acrescentadas ao cabeçalho"""
+    print("\nTestando colunas novas no upsert...")
+
+    try:
+        client, service = make_client({'ws': _grid('ana', 'rui')})
+        rows = [
+            {'linkedin_url': _profile('rui'), 'name': 'Rui', 'headline': 'PM', 'email': 'rui@x.pt'},
+            {'linkedin_url': _profile('eva'), 'location': 'Porto', 'name': 'Eva'},
+        ]
+        result = client.upsert_rows('ws', rows)
+        assert result == {'updated': 1, 'inserted': 1}, result
+
+        headers = HEADERS + ['email', 'location']
+        assert service.rows() == [
+            headers,
+            [_profile('ana'), 'Ana', 'ana headline'],
+            [_profile('rui'), 'Rui', 'PM', 'rui@x.pt'],
+            [_profile('eva'), 'Eva', '', '', 'Porto'],
+        ], service.rows()
+        print("OK - Colunas novas acrescentadas ao fim do cabecalho, pela ordem em que aparecem")
+        print("OK - Linhas reescritas e inseridas alinhadas com o novo cabecalho")
+
+        assert client._row_index('ws')['headers'] == headers
+        assert client.delete_by_urls('ws', [_profile('eva')]) == 1
+        assert service.rows() == [headers, [_profile('ana'), 'Ana', 'ana headline'],
+                                  [_profile('rui'), 'Rui', 'PM', 'rui@x.pt']], service.rows()
+        print("OK - Indice de linhas relido depois da mudanca de cabecalho")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas colunas novas: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes do GoogleSheetsClient...")
+    print("=" * 50)
+
+    tests = [
+        test_delete_grouped_ranges,
+        test_empty_worksheets,
+        test_upsert_duplicates_last_wins,
+        test_upsert_new_columns
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
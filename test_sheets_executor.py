@@ -0,0 +1,242 @@
+"""
+Teste do executor de pedidos da Google Sheets API (quotas e retries)
+"""
+import os
+import sys
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sheets_executor import BACKGROUND, INTERACTIVE, SheetsRequestExecutor, is_idempotent, retry_after
+
+
+def http_error(status: int, headers=None) -> HttpError:
+    """HttpError como os devolvidos pelo googleapiclient"""
+    response = httplib2.Response(dict(headers or {}, status=status))
+    return HttpError(response, b'{}', uri='https://sheets.googleapis.com/v4/spreadsheets/sheet')
+
+
+class FlakyRequest:
+    """Pedido que falha com os erros indicados antes de responder"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'ok': True}
+
+
+class RecordingResource:
+    """Recurso mínimo do googleapiclient (spreadsheets() / values())"""
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, **kwargs):
+        return FlakyRequest()
+
+    def append(self, **kwargs):
+        return FlakyRequest()
+
+    def update(self, **kwargs):
+        return FlakyRequest()
+
+    def batchUpdate(self, **kwargs):
+        return FlakyRequest()
+
+
+def make_executor(max_retries: int = 3) -> SheetsRequestExecutor:
+    """Executor com quotas altas e esperas curtas (o teste não fica à espera)"""
+    return SheetsRequestExecutor(reads_per_minute=6000, writes_per_minute=6000,
+                                 max_retries=max_retries, base_delay=0.001, max_delay=0.01)
+
+
+def test_is_idempotent():
+    """Testa a classificação dos pedidos por método e corpo"""
+    print("Testando is_idempotent...")
+
+    try:
+        assert is_idempotent('get', {}) and is_idempotent('batchGet', {})
+        assert is_idempotent('update', {'body': {'values': [['a']]}})
+        assert is_idempotent('clear', {})
+        assert is_idempotent('batchUpdate', {'body': {'valueInputOption': 'RAW', 'data': []}})
+        print("OK - Leituras, update, clear e values.batchUpdate sao idempotentes")
+
+        assert not is_idempotent('append', {'body': {'values': [['a']]}})
+        assert not is_idempotent('batchUpdate', {'body': {'requests': [{'deleteDimension': {}}]}})
+        print("OK - append e batchUpdate de estrutura nao sao idempotentes")
+
+        assert retry_after(http_error(429, {'retry-after': '7'})) == 7.0
+        assert retry_after(http_error(429)) is None
+        assert retry_after(http_error(503, {'retry-after': 'Wed, 21 Oct 2026 07:28:00 GMT'})) is None
+        print("OK - Retry-After lido quando e um numero de segundos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no is_idempotent: {e}")
+        return False
+
+
+def test_server_errors():
+    """Testa a repetição após erros 5xx"""
+    print("\nTestando erros 5xx...")
+
+    try:
+        executor = make_executor()
+        request = FlakyRequest(http_error(503), http_error(500))
+        assert executor.execute(request, 'read') == {'ok': True}
+        assert request.calls == 3, request.calls
+        assert executor.stats['server_errors'] == 2 and executor.stats['retries'] == 2, executor.stats
+        print("OK - Pedido idempotente repetido apos 5xx")
+
+        request = FlakyRequest(http_error(503))
+        try:
+            executor.execute(request, 'write', idempotent=False)
+            raise AssertionError("5xx de um pedido nao idempotente nao foi propagado")
+        except HttpError as e:
+            assert e.resp.status == 503
+        assert request.calls == 1, request.calls
+        assert executor.stats['failures'] == 1, executor.stats
+        print("OK - Pedido nao idempotente nao e repetido apos 5xx")
+
+        request = FlakyRequest(*(http_error(502) for _ in range(10)))
+        try:
+            make_executor(max_retries=2).execute(request, 'read')
+            raise AssertionError("erro persistente nao foi propagado")
+        except HttpError:
+            pass
+        assert request.calls == 3, request.calls
+        print("OK - Desiste apos max_retries tentativas adicionais")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nos erros 5xx: {e}")
+        return False
+
+
+def test_rate_limit_and_client_errors():
+    """Testa 429 (sempre repetido) e 4xx (nunca repetido)"""
+    print("\nTestando 429 e 4xx...")
+
+    try:
+        executor = make_executor()
+        request = FlakyRequest(http_error(429))
+        assert executor.execute(request, 'write', idempotent=False) == {'ok': True}
+        assert request.calls == 2, request.calls
+        assert executor.stats['rate_limited'] == 1, executor.stats
+        assert executor.buckets['write'].pause_until > 0
+        print("OK - 429 repetido mesmo em pedidos nao idempotentes e suspende o bucket")
+
+        for status in (400, 403, 404):
+            request = FlakyRequest(http_error(status))
+            try:
+                executor.execute(request, 'read')
+                raise AssertionError(f"{status} nao foi propagado")
+            except HttpError as e:
+                assert e.resp.status == status
+            assert request.calls == 1, (status, request.calls)
+        print("OK - Erros 4xx (exceto 429) nunca sao repetidos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO em 429 e 4xx: {e}")
+        return False
+
+
+def test_connection_errors():
+    """Testa a repetição após falhas de ligação"""
+    print("\nTestando falhas de ligacao...")
+
+    try:
+        executor = make_executor()
+        request = FlakyRequest(ConnectionResetError(), TimeoutError())
+        assert executor.execute(request, 'read') == {'ok': True}
+        assert request.calls == 3 and executor.stats['connection_errors'] == 2, executor.stats
+        print("OK - Pedido idempotente repetido apos falha de ligacao")
+
+        request = FlakyRequest(ConnectionResetError())
+        try:
+            executor.execute(request, 'write', idempotent=False)
+            raise AssertionError("falha de ligacao de um pedido nao idempotente nao foi propagada")
+        except ConnectionError:
+            pass
+        assert request.calls == 1, request.calls
+        print("OK - Pedido nao idempotente nao e repetido apos falha de ligacao")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas falhas de ligacao: {e}")
+        return False
+
+
+def test_wrapped_service():
+    """Testa a classificação feita pelo serviço envolvido"""
+    print("\nTestando ScheduledService...")
+
+    try:
+        executor = make_executor()
+        values = executor.wrap(RecordingResource(), priority=BACKGROUND).spreadsheets().values()
+
+        cases = [
+            (values.get(spreadsheetId='s', range='ws'), 'read', True),
+            (values.update(spreadsheetId='s', range='ws!A1', body={'values': []}), 'write', True),
+            (values.append(spreadsheetId='s', range='ws', body={'values': []}), 'write', False),
+            (values.batchUpdate(spreadsheetId='s', body={'requests': []}), 'write', False),
+            (values.batchUpdate(spreadsheetId='s', body={'data': []}), 'write', True),
+        ]
+        for request, kind, idempotent in cases:
+            assert (request._kind, request._idempotent, request._priority) == (kind, idempotent, BACKGROUND), \
+                (request._kind, request._idempotent, request._priority)
+        print("OK - Pedidos classificados por metodo e corpo, com a prioridade do servico")
+
+        assert cases[0][0].execute() == {'ok': True}
+        assert executor.stats['reads'] == 1 and executor.stats['writes'] == 0, executor.stats
+        assert executor.wrap(RecordingResource()).values().get()._priority == INTERACTIVE
+        print("OK - execute() passa pelo executor e conta na quota certa")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO no ScheduledService: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes do executor da Sheets API...")
+    print("=" * 50)
+
+    tests = [
+        test_is_idempotent,
+        test_server_errors,
+        test_rate_limit_and_client_errors,
+        test_connection_errors,
+        test_wrapped_service
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Teste da etiquetagem de skills (autómato Aho-Corasick)
+"""
+import os
+import sys
+
+# Adicionar diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from lexical_index import fold_text
+from normalizer import DataNormalizer
+from skill_tagger import SkillTagger
+
+
+def test_word_boundaries():
+    """Testa se só palavras inteiras contam"""
+    print("Testando fronteiras de palavra...")
+
+    try:
+        tagger = SkillTagger({'design': ['ui', 'ux'], 'recursos humanos': ['rh', 'hr'], 'tecnologia': ['java']})
+
+        assert tagger.tag("Guillermo Ruiz") == [], tagger.tag("Guillermo Ruiz")
+        assert tagger.tag("Chris Thrasher, JavaScript developer") == []
+        assert tagger.tag("Senior UI/UX designer") == ['design']
+        assert tagger.tag("ui") == ['design']
+        assert tagger.tag("Java, Spring") == ['tecnologia']
+        assert tagger.tag("Gestor de RH") == ['recursos humanos']
+        print("OK - 'ui' nao corresponde a 'Guillermo' nem 'java' a 'JavaScript'")
+        print("OK - Palavras no inicio, no fim e junto a pontuacao encontradas")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas fronteiras de palavra: {e}")
+        return False
+
+
+def test_folding():
+    """Testa se maiúsculas e acentos são ignorados"""
+    print("\nTestando maiusculas e acentos...")
+
+    try:
+        tagger = SkillTagger({'finanças': ['finanças'], 'gestão': ['gestão'], 'logística': ['logistica']})
+
+        assert tagger.tag("Diretor de FINANCAS") == ['finanças']
+        assert tagger.tag("Gestao de equipas") == ['gestão']
+        assert tagger.tag("Logística e transportes") == ['logística']
+        assert tagger.tag_folded(fold_text("FINANÇAS")) == ['finanças']
+        print("OK - Texto e palavras-chave comparados sem maiusculas nem acentos")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO em maiusculas e acentos: {e}")
+        return False
+
+
+def test_multiword_and_order():
+    """Testa palavras-chave com várias palavras e a ordem das categorias"""
+    print("\nTestando palavras-chave compostas...")
+
+    try:
+        tagger = SkillTagger({
+            'tecnologia': ['node.js', 'data science'],
+            'marketing': ['digital marketing', 'social media'],
+            'análise': ['analytics'],
+        })
+
+        assert tagger.tag("Data Science lead") == ['tecnologia']
+        assert tagger.tag("data and science") == []
+        assert tagger.tag("Backend em Node.js") == ['tecnologia']
+        assert tagger.tag("Social Media, analytics e data science") == ['tecnologia', 'marketing', 'análise']
+        assert tagger.tag("") == []
+        print("OK - Palavras-chave compostas e com pontuacao encontradas")
+        print("OK - Categorias pela ordem da taxonomia")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO nas palavras-chave compostas: {e}")
+        return False
+
+
+def test_normalizer_taxonomy():
+    """Testa a taxonomia do DataNormalizer"""
+    print("\nTestando taxonomia do DataNormalizer...")
+
+    try:
+        normalizer = DataNormalizer()
+        tags = normalizer.skill_tagger.tag("Guillermo | Financial analyst, Python e SQL")
+        assert tags == ['finanças', 'tecnologia'], tags
+
+        row = normalizer.normalize_all([{
+            'linkedin_url': 'https://www.linkedin.com/in/ana',
+            'name': 'Ana',
+            'headline': 'Digital Marketing e Business Intelligence',
+            'current_company': 'Empresa',
+            'education': 'ISCTE'
+        }])[0]
+        assert row['skills_tags'] == ['marketing', 'análise'], row['skills_tags']
+        print("OK - skills_tags das linhas normalizadas seguem a taxonomia")
+        return True
+
+    except AssertionError as e:
+        print(f"ERRO na taxonomia do DataNormalizer: {e}")
+        return False
+
+
+def main():
+    """Executa todos os testes"""
+    print("Iniciando testes do skill tagger...")
+    print("=" * 50)
+
+    tests = [
+        test_word_boundaries,
+        test_folding,
+        test_multiword_and_order,
+        test_normalizer_taxonomy
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"ERRO inesperado em {test.__name__}: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"Resultados: {passed}/{total} testes passaram")
+    sys.exit(0 if passed == total else 1)
+
+
+if __name__ == "__main__":
+    main()